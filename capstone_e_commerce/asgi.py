@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'capstone_e_commerce.settings')
+# Serve the catalog reads as async views (common.asyncviews). Queries then
+# run in per-request threads, where persistent connections are never
+# reused, so connections come from a pool and are handed back after every
+# request unless the environment says otherwise.
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
+os.environ.setdefault('DATABASE_POOL', 'True')
 
 application = get_asgi_application()
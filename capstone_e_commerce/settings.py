@@ -12,11 +12,12 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
-import dj_database_url
+from decouple import Csv, config
 import os
 from django.contrib.auth import get_user_model
 
+from common.db import build_databases, replica_aliases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -55,7 +56,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'common.middleware.ReadReplicaMiddleware',
+    'common.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,20 +84,117 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'capstone_e_commerce.wsgi.application'
+# Mount the async catalog views (common.asyncviews); capstone_e_commerce.asgi
+# turns this on, under WSGI they would only add overhead.
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    # 'default': dj_database_url.parse(config("DATABASE_URL"))
-    # Dev settings
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_URL picks the primary (SQLite in BASE_DIR by default) and
+# DATABASE_REPLICA_URLS, comma separated, adds read replicas, routed by
+# common.routers.ReplicaRouter. Tests get an in-memory SQLite replica (see
+# capstone_e_commerce.test_settings).
+# Connections persist for DATABASE_CONN_MAX_AGE seconds and are health
+# checked before reuse; DATABASE_POOL=True swaps that for a psycopg 3
+# connection pool per process on PostgreSQL. Under ASGI (opt-in in
+# gunicorn.conf.py) queries run in per-request threads, so the ASGI entry
+# point defaults to the pool with DATABASE_CONN_MAX_AGE=0 instead.
+
+DATABASES = build_databases(
+    config("DATABASE_URL", default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+    replica_urls=config("DATABASE_REPLICA_URLS", default="", cast=Csv()),
+    conn_max_age=config("DATABASE_CONN_MAX_AGE", default=60, cast=int),
+    pool={
+        "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+        "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+        "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=int),
+    } if config("DATABASE_POOL", default=False, cast=bool) else None,
+)
+
+# Views with read_from_replica = True read from a replica on safe
+# requests (see common.middleware); outside requests, reads of the
+# REPLICA_APPS inside common.routers.replica_reads() do. A client that
+# writes reads from the primary for the next DATABASE_REPLICA_LAG seconds,
+# which should cover replication lag.
+# Signed-in clients are pinned by user in the DATABASE_PIN_CACHE_URL cache,
+# which must be shared (redis) when running several server processes.
+
+REPLICA_APPS = config("REPLICA_APPS", default="products", cast=Csv())
+DATABASE_REPLICA_LAG = config("DATABASE_REPLICA_LAG", default=5, cast=int)
+DATABASE_ROUTERS = ["common.routers.ReplicaRouter"] if replica_aliases(DATABASES) else []
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CATALOG_CACHE_URL picks the catalog cache backend: locmem:// (default),
+# file:///path/to/dir or redis://host:6379/0, and GUEST_CART_CACHE_URL the
+# one holding guest carts. Guest carts expire GUEST_CART_TTL seconds after
+# their last change and hold at most GUEST_CART_MAX_LINES products. Use a
+# shared backend (redis, or file on a shared volume) when running several
+# servers, since locmem carts are only visible to the process that made
+# them.
+
+def cache_from_url(url, timeout, max_entries):
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": url, "TIMEOUT": timeout}
+    if url.startswith("file://"):
+        return {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": url[len("file://"):],
+            "TIMEOUT": timeout,
+            "OPTIONS": {"MAX_ENTRIES": max_entries},
+        }
+    return {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": url[len("locmem://"):] or "catalog",
+        "TIMEOUT": timeout,
+        "OPTIONS": {"MAX_ENTRIES": max_entries},
     }
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": cache_from_url(
+        config("CATALOG_CACHE_URL", default="locmem://"),
+        timeout=config("CATALOG_CACHE_TTL", default=300, cast=int),
+        max_entries=config("CATALOG_CACHE_MAX_ENTRIES", default=10000, cast=int),
+    ),
+    "carts": cache_from_url(
+        config("GUEST_CART_CACHE_URL", default="locmem://carts"),
+        timeout=config("GUEST_CART_TTL", default=7 * 24 * 3600, cast=int),
+        max_entries=config("GUEST_CART_MAX_ENTRIES", default=100_000, cast=int),
+    ),
+    "pins": cache_from_url(
+        config("DATABASE_PIN_CACHE_URL", default="locmem://pins"),
+        timeout=DATABASE_REPLICA_LAG,
+        max_entries=config("DATABASE_PIN_CACHE_MAX_ENTRIES", default=100_000, cast=int),
+    ),
 }
 
+CATALOG_CACHE_ALIAS = "catalog"
+GUEST_CART_CACHE_ALIAS = "carts"
+DATABASE_PIN_CACHE_ALIAS = "pins"
+GUEST_CART_TTL = CACHES["carts"]["TIMEOUT"]
+GUEST_CART_MAX_LINES = config("GUEST_CART_MAX_LINES", default=100, cast=int)
+
+# Background jobs (orders.jobs), run by `manage.py run_workers`. A failing
+# job is retried up to JOB_MAX_ATTEMPTS times in all, waiting
+# JOB_RETRY_BACKOFF seconds doubled per attempt and capped at
+# JOB_RETRY_BACKOFF_MAX. A job held by a worker for longer than JOB_LEASE
+# seconds is presumed abandoned by a dead worker and runs again; the lease
+# is renewed as each job starts, so it must cover the longest single job.
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", default=8, cast=int)
+JOB_RETRY_BACKOFF = config("JOB_RETRY_BACKOFF", default=10, cast=int)
+JOB_RETRY_BACKOFF_MAX = config("JOB_RETRY_BACKOFF_MAX", default=3600, cast=int)
+JOB_LEASE = config("JOB_LEASE", default=300, cast=int)
+
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend")
+DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="orders@localhost")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -116,6 +215,31 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new passwords: pbkdf2 (default),
+# argon2 (needs argon2-cffi) or bcrypt (needs bcrypt). The others stay
+# listed so existing hashes still verify, and are upgraded on next login.
+# Hashing runs in a pool of PASSWORD_HASH_WORKERS processes per server
+# process (0 hashes in the request worker); see users.hashing. Every web
+# worker gets its own pool, so keep it small.
+
+PASSWORD_HASHER_CLASSES = {
+    "pbkdf2": "users.hashing.PBKDF2PasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "bcrypt": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+}
+PASSWORD_HASHER = config("PASSWORD_HASHER", default="pbkdf2")
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+PASSWORD_PBKDF2_ITERATIONS = config("PASSWORD_PBKDF2_ITERATIONS", default=1_000_000, cast=int)
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+PASSWORD_HASH_MAX_PENDING = config("PASSWORD_HASH_MAX_PENDING", default=64, cast=int)
+PASSWORD_HASH_TIMEOUT = config("PASSWORD_HASH_TIMEOUT", default=10, cast=int)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -144,12 +268,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Rest framework defaults
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # DRF's JSON output, encoded with orjson
+    "DEFAULT_RENDERER_CLASSES": (
+        "common.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -162,8 +291,21 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "users.serializers.TokenBlacklistSerializer",
 }
 
+# How often each process syncs its copy of the token blacklist for access
+# token checks, in seconds (refresh and logout always sync first), and how
+# many blacklisted tokens its Bloom filter is initially sized for. Role
+# claims in access tokens are re-read from the user on login and on every
+# refresh, so a role change or deactivation takes effect within the access
+# token lifetime. Run `manage.py purge_tokens` periodically to delete expired
+# tokens.
+JWT_REVOCATION_SYNC_INTERVAL = config("JWT_REVOCATION_SYNC_INTERVAL", default=5, cast=int)
+JWT_REVOCATION_CAPACITY = config("JWT_REVOCATION_CAPACITY", default=100_000, cast=int)
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'BEARER': {
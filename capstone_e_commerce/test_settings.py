@@ -0,0 +1,18 @@
+"""
+Settings for the test suite (see pytest.ini): the project settings plus an
+in-memory SQLite replica for the routing tests, the async catalog views,
+and fast, insecure password hashing done inline.
+"""
+from common.db import REPLICA_ALIAS_PREFIX, database_from_url, replica_aliases
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, PASSWORD_HASHERS
+
+if not replica_aliases(DATABASES):
+    DATABASES[f"{REPLICA_ALIAS_PREFIX}_1"] = database_from_url("sqlite://:memory:")
+    DATABASE_ROUTERS = ["common.routers.ReplicaRouter"]
+
+ASYNC_VIEWS = True
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher", *PASSWORD_HASHERS]
+PASSWORD_HASH_WORKERS = 0
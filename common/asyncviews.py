@@ -0,0 +1,92 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    Serve a DRF generic view's reads as a native async view.
+
+    ``as_async_view()`` returns an async Django view for the URLconf when
+    ``ASYNC_VIEWS`` is on (the ASGI entry point turns it on), and the plain
+    synchronous view otherwise, since under WSGI an async view only adds an
+    event loop per request. GET and HEAD run on the event loop through ``alist`` or ``aretrieve``, which
+    fetch rows with the ORM's async API, so a worker keeps serving other
+    requests while one waits on the database or on a slow client. Every
+    other method runs the regular synchronous view in a thread.
+
+    Mixins that wrap ``list``/``retrieve`` provide ``alist``/``aretrieve``
+    counterparts in the same order. Filter backends may query (to validate
+    a choice or to search) so they run in a thread; serializers must not
+    touch unloaded relations, which the async ORM would refuse to load.
+    """
+
+    async_actions = {}  # HTTP method -> async action, e.g. {"get": "alist"}
+
+    @classmethod
+    def as_async_view(cls, **initkwargs):
+        sync_view = cls.as_view(**initkwargs)
+        if not settings.ASYNC_VIEWS:
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            method = request.method.lower()
+            action = cls.async_actions.get("get" if method == "head" else method)
+            if action is None:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            return await self.async_dispatch(request, getattr(self, action), *args, **kwargs)
+
+        # Read by DRF's schema generators and by middleware such as ReadReplicaMiddleware
+        view.cls = view.view_class = cls
+        view.initkwargs = view.view_initkwargs = initkwargs
+        view.__doc__ = cls.__doc__
+        view.__module__ = cls.__module__
+        return csrf_exempt(view)
+
+    async def async_dispatch(self, request, handler, *args, **kwargs):
+        """``APIView.dispatch`` for an async handler."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            if request.META.get("HTTP_AUTHORIZATION"):
+                # Authenticating a token may sync the revocation list from the database
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            else:
+                self.initial(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self, queryset):
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@contextmanager
+def benchmark_database(using=DEFAULT_DB_ALIAS, verbosity=0):
+    """
+    Run the body against a freshly migrated, throwaway copy of a database.
+
+    Benchmarks seed a lot of rows, so they never touch the real database.
+    SQLite copies live in a temporary file rather than in memory so that
+    benchmark threads each get their own connection with real file locking,
+    and transactions take the write lock up front instead of deadlocking on
+    a lock upgrade.
+    """
+    connection = connections[using]
+    settings_dict = connection.settings_dict
+    old_name = settings_dict["NAME"]
+    old_test_name = settings_dict["TEST"].get("NAME")
+    old_options = dict(settings_dict["OPTIONS"])
+    tmpdir = None
+
+    if connection.vendor == "sqlite":
+        tmpdir = tempfile.mkdtemp(prefix="bench-")
+        settings_dict["TEST"]["NAME"] = os.path.join(tmpdir, "bench.sqlite3")
+        settings_dict["OPTIONS"].setdefault("transaction_mode", "IMMEDIATE")
+        settings_dict["OPTIONS"].setdefault("timeout", 30)
+
+    connection.close()
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        settings_dict["TEST"]["NAME"] = old_test_name
+        settings_dict["OPTIONS"] = old_options
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples):
+    """p50/p99/mean of a list of durations in seconds, reported in milliseconds."""
+    return {
+        "n": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": (statistics.fmean(samples) if samples else 0.0) * 1000,
+    }
+
+
+def timed(func, repeat):
+    """Call ``func`` ``repeat`` times and return the individual durations."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
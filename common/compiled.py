@@ -0,0 +1,255 @@
+import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (fields.IntegerField, fields.CharField, fields.SlugField, fields.ReadOnlyField)
+
+
+class CompiledSerializer:
+    """
+    Read-only fast path for a ``ModelSerializer``.
+
+    Rows are fetched with ``values_list()`` instead of as model instances,
+    and each one is turned into output by a function generated once per
+    serializer class: a single dict display indexing the row tuple, calling
+    a field's ``to_representation()`` only where it changes the value
+    (decimals, datetimes, choices). Nested serializers of forward relations
+    read joined columns of the same row; a nested ``many=True`` serializer of
+    a reverse foreign key is filled from one extra query for all rows,
+    honouring a ``Prefetch`` queryset on the original queryset. The output is
+    the same as the serializer's.
+
+    Serializers with custom ``to_representation()``, method fields or sources
+    that are not model columns cannot be compiled and raise
+    ``ImproperlyConfigured``.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.columns = []
+        self.related = []  # (field name, child CompiledSerializer, child key index, parent key index)
+        self.namespace = {}
+        body = self._compile(serializer_class(), prefix="")
+        source = f"def render(row, tz):\n    return {body}\n"
+        exec(compile(source, f"<compiled {serializer_class.__qualname__}>", "exec"), self.namespace)
+        self.render = self.namespace["render"]
+
+    def column(self, path):
+        """Index of ``path`` in the fetched rows, adding the column if needed."""
+        if path not in self.columns:
+            self.columns.append(path)
+        return self.columns.index(path)
+
+    def _compile(self, serializer, prefix):
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise ImproperlyConfigured(f"{type(serializer).__name__} overrides to_representation()")
+        model = serializer.Meta.model
+        items = []
+        for field in serializer._readable_fields:
+            if isinstance(field, serializers.ListSerializer):
+                if prefix:
+                    raise ImproperlyConfigured(f"Nested many=True field {field.field_name!r} below the top level")
+                items.append(f"{field.field_name!r}: None")  # filled in by attach()
+                self.related.append(self._compile_many(field, model))
+                continue
+
+            path, model_field = self._resolve(model, field, prefix)
+            index = self.column(path)
+            if isinstance(field, serializers.ModelSerializer):
+                if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                    raise ImproperlyConfigured(f"{field.field_name!r} is not a forward relation")
+                value = self._compile(field, prefix=f"{path}__")
+                if model_field.null:
+                    value = f"({value} if row[{index}] is not None else None)"
+            elif isinstance(field, serializers.RelatedField):
+                if not isinstance(field, serializers.PrimaryKeyRelatedField):
+                    raise ImproperlyConfigured(f"Cannot compile {type(field).__name__} {field.field_name!r}")
+                # The row holds the foreign key, which is what the field renders
+                value = self._convert(index, field.pk_field)
+            elif type(field) in PASSTHROUGH_FIELDS:
+                value = f"row[{index}]"
+            else:
+                value = self._convert(index, field)
+            items.append(f"{field.field_name!r}: {value}")
+        return "{" + ", ".join(items) + "}"
+
+    def _convert(self, index, field):
+        if field is None:
+            return f"row[{index}]"
+        name = f"f{len(self.namespace)}"
+        if is_iso_datetime(field):
+            self.namespace[name] = iso_datetime(field)
+            return f"(None if row[{index}] is None else {name}(row[{index}], tz))"
+        self.namespace[name] = field.to_representation
+        return f"(None if row[{index}] is None else {name}(row[{index}]))"
+
+    def _resolve(self, model, field, prefix):
+        """The ``values()`` path and model field behind a serializer field's source."""
+        if field.source == "*":
+            raise ImproperlyConfigured(f"Cannot compile {field.field_name!r} with source='*'")
+        model_field = None
+        for attr in field.source_attrs:
+            if model_field is not None:
+                if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                    raise ImproperlyConfigured(f"Cannot follow {model_field.name!r} in {field.source!r}")
+                model = model_field.related_model
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"{field.source!r} is not a column of {model.__name__}")
+        if not model_field.concrete:
+            raise ImproperlyConfigured(f"{field.source!r} is not a column of {model.__name__}")
+        return prefix + "__".join(field.source_attrs), model_field
+
+    def _compile_many(self, field, model):
+        try:
+            relation = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            relation = None
+        if relation is None or not relation.one_to_many:
+            raise ImproperlyConfigured(f"{field.field_name!r} is not a reverse foreign key")
+        child = CompiledSerializer(type(field.child))
+        foreign_key = relation.field
+        return (
+            field.field_name,
+            child,
+            child.column(foreign_key.name),
+            self.column(foreign_key.target_field.name),
+        )
+
+    def values(self, queryset, *extra):
+        """
+        ``queryset`` as rows of the columns this serializer reads plus
+        ``extra`` ones (e.g. what a paginator sorts on), as named tuples.
+        """
+        names = self.columns + [path for path in dict.fromkeys(extra) if path not in self.columns]
+        return queryset.prefetch_related(None).values_list(*names, named=True)
+
+    def to_representation(self, rows, queryset):
+        """Render ``rows`` fetched by ``values(queryset)``."""
+        rows = list(rows)
+        tz = output_timezone()
+        data = [self.render(row, tz) for row in rows]
+        for related in self.related:
+            children = self.children(related, rows, queryset)
+            child_rows = list(children)
+            self.attach(related, rows, data, child_rows, related[1].to_representation(child_rows, children))
+        return data
+
+    async def ato_representation(self, rows, queryset):
+        """``to_representation`` for async views; ``rows`` may be an unevaluated queryset."""
+        if hasattr(rows, "__aiter__"):
+            rows = [row async for row in rows]
+        tz = output_timezone()
+        data = [self.render(row, tz) for row in rows]
+        for related in self.related:
+            children = self.children(related, rows, queryset)
+            child_rows = [row async for row in children]
+            self.attach(
+                related, rows, data, child_rows, await related[1].ato_representation(child_rows, children)
+            )
+        return data
+
+    def children(self, related, rows, queryset):
+        """The child rows of ``rows``, from the queryset ``queryset`` would prefetch them with."""
+        name, child, _, parent_index = related
+        foreign_key = child.model._meta.get_field(child.columns[related[2]])
+        children = child.model._default_manager.all()
+        for lookup in queryset._prefetch_related_lookups:
+            if isinstance(lookup, Prefetch) and lookup.prefetch_to == name and lookup.queryset is not None:
+                children = lookup.queryset
+        keys = {row[parent_index] for row in rows}
+        return child.values(children.filter(**{f"{foreign_key.name}__in": keys}) if keys else children.none())
+
+    @staticmethod
+    def attach(related, rows, data, child_rows, child_data):
+        name, _, child_index, parent_index = related
+        groups = {}
+        for row, item in zip(child_rows, child_data):
+            groups.setdefault(row[child_index], []).append(item)
+        for row, item in zip(rows, data):
+            item[name] = groups.get(row[parent_index], [])
+
+
+def output_timezone():
+    """The timezone ``DateTimeField`` renders in unless given one, looked up once per batch."""
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def is_iso_datetime(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    return (
+        type(field) is fields.DateTimeField
+        and not hasattr(field, "timezone")
+        and output_format is not None
+        and output_format.lower() == ISO_8601
+    )
+
+
+def iso_datetime(field):
+    """
+    ``field.to_representation`` for aware datetimes, given the output
+    timezone instead of looking it up for every value.
+    """
+    def convert(value, tz):
+        if tz is not None and isinstance(value, datetime.datetime) and value.utcoffset() is not None:
+            try:
+                text = value.astimezone(tz).isoformat()
+            except OverflowError:
+                return field.to_representation(value)
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+        return field.to_representation(value)
+    return convert
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """The ``CompiledSerializer`` of ``serializer_class``, compiled on first use."""
+    return CompiledSerializer(serializer_class)
+
+
+class CompiledReadMixin:
+    """
+    Serve a generic list view's rows through ``compile_serializer``.
+
+    The response data is the same as ``ListModelMixin.list()`` builds, only
+    without model instances or per-field serializer calls. Put the mixin
+    after ones that wrap ``list`` (conditional GET, caching) so that they
+    still run; ``alist`` does the same for ``AsyncReadMixin`` views.
+    """
+
+    def get_sort_fields(self, queryset):
+        """Columns the paginator reads from each row to build its cursors."""
+        ordering = [name for name in queryset.query.order_by if isinstance(name, str)]
+        if not ordering:
+            ordering = getattr(self.paginator, "ordering", None) or ()
+            ordering = [ordering] if isinstance(ordering, str) else list(ordering)
+        return [name.lstrip("-") for name in ordering if name != "?"] + ["id"]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        compiled = compile_serializer(self.get_serializer_class())
+        rows = compiled.values(queryset, *self.get_sort_fields(queryset))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page, queryset))
+        return Response(compiled.to_representation(rows, queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        compiled = compile_serializer(self.get_serializer_class())
+        rows = compiled.values(queryset, *self.get_sort_fields(queryset))
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(rows, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(await compiled.ato_representation(page, queryset))
+        return Response(await compiled.ato_representation(rows, queryset))
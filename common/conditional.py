@@ -0,0 +1,110 @@
+import hashlib
+from calendar import timegm
+from functools import partial
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for list and retrieve views.
+
+    Validators come from one cheap query: ``max(updated_at)`` plus the row
+    count of the filtered queryset for lists (the count catches deletions),
+    or the row's ``updated_at`` for detail views, along with the
+    ``related_modified_fields`` of related rows the response embeds. The
+    list's filtered queryset is reused for the response. A matching
+    ``If-None-Match`` or ``If-Modified-Since`` gets a 304 before anything is
+    serialized. ETags are weak since the same data may be rendered as JSON
+    or as the browsable API. ``alist`` and ``aretrieve`` do the same for
+    async views.
+    """
+
+    modified_field = "updated_at"
+    related_modified_fields = ()
+    filtered_queryset = None
+
+    def filter_queryset(self, queryset):
+        # Filtering may query a search index; list() does it once
+        if self.filtered_queryset is not None:
+            return self.filtered_queryset
+        return super().filter_queryset(queryset)
+
+    def modified_aggregates(self):
+        fields = (self.modified_field, *self.related_modified_fields)
+        return {f"modified_{i}": Max(field) for i, field in enumerate(fields)}
+
+    @staticmethod
+    def latest(timestamps):
+        return max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+
+    def list(self, request, *args, **kwargs):
+        self.filtered_queryset = self.filter_queryset(self.get_queryset())
+        stats = self.filtered_queryset.order_by().aggregate(count=Count("pk"), **self.modified_aggregates())
+        last_modified = self.latest(value for name, value in stats.items() if name != "count")
+        return self.conditional_response(
+            request, last_modified, stats["count"], partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        row = self.get_last_modified_queryset().first()
+        if row is None:
+            # Missing row: let retrieve() produce its usual 404
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request, self.latest(row), 1, partial(super().retrieve, request, *args, **kwargs)
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        self.filtered_queryset = await self.afilter_queryset(self.get_queryset())
+        stats = await self.filtered_queryset.order_by().aaggregate(count=Count("pk"), **self.modified_aggregates())
+        last_modified = self.latest(value for name, value in stats.items() if name != "count")
+        return await self.aconditional_response(
+            request, last_modified, stats["count"], partial(super().alist, request, *args, **kwargs)
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        row = await self.get_last_modified_queryset().afirst()
+        if row is None:
+            return await super().aretrieve(request, *args, **kwargs)
+        return await self.aconditional_response(
+            request, self.latest(row), 1, partial(super().aretrieve, request, *args, **kwargs)
+        )
+
+    def get_last_modified_queryset(self):
+        """The modified fields of the object a detail view looks up."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list(self.modified_field, *self.related_modified_fields)
+        )
+
+    def conditional_response(self, request, last_modified, count, compute):
+        etag, timestamp = self.validators(request, last_modified, count)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = compute()
+        return self.add_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, request, last_modified, count, compute):
+        etag, timestamp = self.validators(request, last_modified, count)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await compute()
+        return self.add_validators(response, etag, timestamp)
+
+    def validators(self, request, last_modified, count):
+        params = sorted((name, tuple(values)) for name, values in request.query_params.lists())
+        digest = hashlib.sha1(repr((request.path, params, last_modified, count)).encode()).hexdigest()
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        return "W/" + quote_etag(digest), timestamp
+
+    def add_validators(self, response, etag, timestamp):
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
@@ -0,0 +1,39 @@
+import dj_database_url
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS_PREFIX = "replica"
+
+
+def database_from_url(url, conn_max_age=0, health_checks=True, pool=None):
+    """
+    One ``DATABASES`` entry from a ``DATABASE_URL``-style URL.
+
+    Connections are kept open for ``conn_max_age`` seconds and checked before
+    reuse when ``health_checks`` is on. ``pool`` is a dict of psycopg pool
+    options (``min_size``, ``max_size``, ``timeout``) and only applies to
+    PostgreSQL; Django's pool needs psycopg 3 and replaces persistent
+    connections, so ``conn_max_age`` is ignored when pooling.
+    """
+    database = dj_database_url.parse(url, conn_max_age=conn_max_age, conn_health_checks=health_checks)
+    if pool and database["ENGINE"] == "django.db.backends.postgresql":
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = dict(pool)
+    return database
+
+
+def build_databases(url, replica_urls=(), **options):
+    """
+    ``DATABASES`` for a primary at ``url`` and read replicas at ``replica_urls``.
+
+    Replicas are named ``replica_1``, ``replica_2``, ... and get their own
+    test databases, so routing tests can tell which alias served a read.
+    ``options`` are passed to ``database_from_url`` for every alias.
+    """
+    databases = {DEFAULT_DB_ALIAS: database_from_url(url, **options)}
+    for number, replica_url in enumerate(filter(None, replica_urls), start=1):
+        databases[f"{REPLICA_ALIAS_PREFIX}_{number}"] = database_from_url(replica_url, **options)
+    return databases
+
+
+def replica_aliases(databases):
+    return [alias for alias in databases if alias.startswith(f"{REPLICA_ALIAS_PREFIX}_")]
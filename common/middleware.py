@@ -0,0 +1,126 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from .routers import current_routing, request_routing
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadReplicaMiddleware:
+    """
+    Route a request's reads for ``common.routers.ReplicaRouter``.
+
+    Views opt in to replica reads with a ``read_from_replica = True`` class
+    attribute; only their safe-method requests use replicas. A request that
+    writes pins the client to the primary for ``DATABASE_REPLICA_LAG``
+    seconds, so its next reads see the write even if the replicas have not
+    caught up. Authenticated users are pinned by user id in the
+    ``DATABASE_PIN_CACHE_ALIAS`` cache, since API clients send a bearer
+    token but no cookies back; anonymous clients get a cookie.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = "db_pinned"
+    key_prefix = "db_pinned"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django runs a synchronous process_view in a thread under ASGI
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.routing(request) as routing:
+            response = self.get_response(request)
+        return self.pin(request, routing, response)
+
+    async def __acall__(self, request):
+        with self.routing(request) as routing:
+            response = await self.get_response(request)
+        return self.pin(request, routing, response)
+
+    @property
+    def pins(self):
+        return caches[getattr(settings, "DATABASE_PIN_CACHE_ALIAS", "default")]
+
+    def routing(self, request):
+        return request_routing(
+            pinned=self.cookie_name in request.COOKIES, pin_check=lambda: self.user_pinned(request)
+        )
+
+    @staticmethod
+    def known_user(request):
+        """
+        The user DRF authenticated the request as, or None before it has:
+        until then ``request.user`` is Django's lazy session user, which is
+        left unevaluated.
+        """
+        user = getattr(request, "user", None)
+        return None if isinstance(user, SimpleLazyObject) else user
+
+    def user_pinned(self, request):
+        user = self.known_user(request)
+        if user is None:
+            return None
+        return user.is_authenticated and self.pins.get(f"{self.key_prefix}:{user.pk}") is not None
+
+    def pin(self, request, routing, response):
+        if routing.wrote:
+            user = self.known_user(request)
+            if user is not None and user.is_authenticated:
+                self.pins.set(f"{self.key_prefix}:{user.pk}", 1, settings.DATABASE_REPLICA_LAG)
+            else:
+                response.set_cookie(
+                    self.cookie_name, "1", max_age=settings.DATABASE_REPLICA_LAG, httponly=True, samesite="Lax"
+                )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+        current_routing().use_replica = (
+            request.method in SAFE_METHODS and getattr(view, "read_from_replica", False)
+        )
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        ReadReplicaMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI.
+
+    WhiteNoise's middleware is synchronous only, and one synchronous
+    middleware makes Django run the rest of every ASGI request through a
+    thread. Here only static files are served in a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,236 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination on a composite key such as ``(created_at, id)``.
+
+    Pages are fetched with ``WHERE (created_at, id) < (:created_at, :id)``
+    (expanded into ORs so that mixed sort directions work) instead of an
+    ``OFFSET``, so a deep page costs the same as the first one. The key is the
+    queryset's ordering, e.g. one applied by ``OrderingFilter``, or ``ordering``
+    when the queryset is unordered, always ending in ``id`` so it is unique.
+    Cursors are opaque, and the total count is only computed when the client
+    asks for it with ``?count=true``.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    count_query_param = "count"
+    count_query_description = "Include the total number of results (costs an extra COUNT query)."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        self.count = queryset.count() if self.wants_count(request) else None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views."""
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        self.count = await queryset.acount() if self.wants_count(request) else None
+        return self.set_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """The unevaluated query for the requested page plus one row, or None when not paginating."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.model = queryset.model
+        self.keys = self.get_keys(queryset)
+
+        self.position, self.backwards = self.decode_cursor(request)
+        if self.position is not None:
+            queryset = queryset.filter(self.after(self.position, reverse=self.backwards))
+
+        ordering = [
+            ("-" if descending != self.backwards else "") + name
+            for name, descending in self.keys
+        ]
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        self.page = rows
+        return rows
+
+    def get_keys(self, queryset):
+        """``(name, descending)`` pairs for the sort key, ending in ``id``."""
+        ordering = [
+            field for field in queryset.query.order_by
+            if isinstance(field, str) and field != "?"
+        ] or list(self.ordering)
+        keys = [(field.lstrip("-"), field.startswith("-")) for field in ordering]
+        if not any(name in ("id", "pk") for name, _ in keys):
+            keys.append(("id", keys[-1][1]))
+        return keys
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, "").lower() in ("1", "true", "yes")
+
+    def after(self, position, reverse=False):
+        """Rows strictly past ``position`` in sort order (before it when ``reverse``)."""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.keys):
+            lookup = "lt" if descending != reverse else "gt"
+            clause = Q(**{f"{name}__{lookup}": position[index]})
+            for equal_index, (equal_name, _) in enumerate(self.keys[:index]):
+                clause &= Q(**{equal_name: position[equal_index]})
+            condition |= clause
+        # The redundant bound on the leading key lets the database turn the
+        # OR chain into an index range scan instead of filtering every row.
+        name, descending = self.keys[0]
+        bound = "lte" if descending != reverse else "gte"
+        return Q(**{f"{name}__{bound}": position[0]}) & condition
+
+    def get_position(self, row):
+        values = []
+        for name, _ in self.keys:
+            if isinstance(row, dict):
+                value = row[name]
+            elif isinstance(row, tuple):
+                # values_list(named=True) rows name related columns in full
+                value = getattr(row, name)
+            else:
+                value = row
+                for attr in name.split("__"):
+                    value = getattr(value, attr)
+            values.append(value)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), backwards=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), backwards=True)
+
+    def encode_cursor(self, position, backwards):
+        payload = {"p": [_encode_value(value) for value in position]}
+        if backwards:
+            payload["b"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, base64.urlsafe_b64encode(raw).decode()
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload["p"]
+            if len(values) != len(self.keys):
+                raise ValueError("Cursor does not match the current ordering")
+            position = [
+                _decode_value(self.model, name, value) for (name, _), value in zip(self.keys, values)
+            ]
+        except (binascii.Error, TypeError, KeyError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get("b"))
+
+    def get_paginated_response(self, data):
+        response = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count is not None:
+            response = {"count": self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {
+            "count": {"type": "integer", "example": 123},
+            **response_schema["properties"],
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.count_query_description,
+                "schema": {"type": "boolean"},
+            }
+        ]
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """DRF's page number pagination, which async views can also await."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Fill the paginator's cached count so that page() doesn't query
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        # isoformat() keeps microseconds, unlike DjangoJSONEncoder
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(model, name, value):
+    try:
+        opts = model._meta
+        for part in name.split("__"):
+            field = opts.pk if part == "pk" else opts.get_field(part)
+            if field.is_relation and field.related_model is not None:
+                opts = field.related_model._meta
+    except FieldDoesNotExist:
+        # Annotations such as a search rank are stored as plain JSON values
+        return value
+    return field.to_python(value)
@@ -0,0 +1,8 @@
+from rest_framework import permissions
+
+
+class IsSeller(permissions.BasePermission):
+    """Only authenticated sellers may use the view, whatever the method."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and getattr(request.user, "is_seller", False)
@@ -0,0 +1,37 @@
+import orjson
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+# DRF's conversions for what orjson is told to pass through, and for lazy strings
+encode_default = encoders.JSONEncoder().default
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    DRF's JSON renderer, encoding with orjson.
+
+    The bytes are the same as DRF's for compact, non-ASCII-escaped output
+    (the defaults): datetimes and anything else orjson doesn't know are
+    converted by DRF's encoder, and U+2028/U+2029 are escaped as DRF does.
+    Indented output, other JSON settings and data orjson refuses (integers
+    beyond 64 bits, non-string keys) go through DRF's renderer. Floats are
+    the exception: orjson writes exponents as ``1e-5`` where DRF writes
+    ``1e-05``, so views rendering floats that small or large should keep
+    DRF's renderer.
+    """
+
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is None and self.compact and not self.ensure_ascii:
+            try:
+                ret = orjson.dumps(data, default=encode_default, option=self.options)
+            except TypeError:
+                pass
+            else:
+                # Unescaped, these line separators break JavaScript, as in DRF's renderer
+                return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,114 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .db import replica_aliases
+
+
+class RequestRouting:
+    """
+    Where the current request reads from.
+
+    ``use_replica`` is decided per view by ``ReadReplicaMiddleware``;
+    ``pinned`` sends every read to the primary, either because the client
+    wrote recently or because this request has written. ``pin_check``, if
+    given, is asked on the first read that could go to a replica whether
+    the client is pinned after all; it returns None while it cannot tell
+    yet (before the request is authenticated) and is asked again next time.
+    """
+
+    def __init__(self, pinned=False, pin_check=None):
+        self.use_replica = False
+        self.pinned = pinned
+        self.pin_check = pin_check
+        self.wrote = False
+
+    @property
+    def reads_from_replica(self):
+        if not self.use_replica or self.pinned:
+            return False
+        if self.pin_check is not None:
+            pinned = self.pin_check()
+            if pinned is not None:
+                self.pinned, self.pin_check = pinned, None
+        return not self.pinned
+
+
+_request_routing = ContextVar("request_routing", default=None)
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def current_routing():
+    """The ``RequestRouting`` of the request being handled, or None outside one."""
+    return _request_routing.get()
+
+
+@contextmanager
+def request_routing(pinned=False, pin_check=None):
+    """Route the reads made in the body as one request's."""
+    token = _request_routing.set(RequestRouting(pinned=pinned, pin_check=pin_check))
+    try:
+        yield _request_routing.get()
+    finally:
+        _request_routing.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Outside requests, let the reads made in the body of the apps in
+    ``settings.REPLICA_APPS`` go to replicas. Only for read-only work
+    (reports, exports, benchmarks): nothing read there may feed a write.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica when it is safe to.
+
+    Inside a request the view decides: only safe requests to views that set
+    ``read_from_replica`` read from replicas, and a request stops doing so
+    as soon as it writes. Outside requests (management commands, shells),
+    reads stay on the primary, except reads of the apps in
+    ``settings.REPLICA_APPS`` inside ``replica_reads()``, so a command that
+    writes never checks its input against lagging data.
+
+    Writes, locking reads (``select_for_update``) and anything read while
+    the primary is inside a transaction stay on the primary, so a write is
+    never validated against lagging data.
+    """
+
+    def __init__(self):
+        self.replicas = replica_aliases(settings.DATABASES)
+        self.apps = set(getattr(settings, "REPLICA_APPS", ()))
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas:
+            return None
+        routing = current_routing()
+        if routing is None:
+            eligible = _replica_reads.get() and model._meta.app_label in self.apps
+        else:
+            eligible = routing.reads_from_replica
+        if not eligible or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing()
+        if routing is not None:
+            # Read your writes: the rest of the request sees them
+            routing.pinned = routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data, so objects read from any of them relate
+        return True
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+class QueryScalingMixin:
+    """
+    Test-case mixin asserting that a list endpoint's query count does not
+    grow with the page size, which is how N+1 serialization shows up.
+    """
+
+    page_sizes = (10, 500)
+
+    def count_list_queries(self, url, page_size, **params):
+        # Measure a cold request, not one answered from a response cache
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        pagination_class = resolve(url).func.view_class.pagination_class
+        with mock.patch.object(pagination_class, "page_size", page_size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(queries)
+
+    def assertQueriesConstant(self, url, **params):
+        counts = {size: self.count_list_queries(url, size, **params) for size in self.page_sizes}
+        self.assertEqual(len(set(counts.values())), 1, f"Query count grows with page size: {counts}")
+        return counts
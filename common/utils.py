@@ -0,0 +1,59 @@
+import codecs
+import csv
+import json
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryCounter:
+    """
+    Count the SQL statements issued on a database connection.
+
+    Unlike ``CaptureQueriesContext`` this does not force a debug cursor or keep
+    the SQL around, so it is cheap enough to leave on in request code paths.
+
+        with QueryCounter() as queries:
+            ...
+        queries.count
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.connection = connections[using]
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._wrapper.__exit__(exc_type, exc_value, traceback)
+
+
+def read_rows(stream, fmt):
+    """
+    Yield ``(line_number, row)`` from a binary stream of CSV or JSON lines
+    without loading it into memory. Unparseable JSON lines yield the error
+    message in place of the row.
+    """
+    lines = codecs.iterdecode(stream, "utf-8")
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f"Invalid JSON: {exc}"
+            continue
+        yield number, row if isinstance(row, dict) else "Each line must be a JSON object"
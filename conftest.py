@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import caches
+
+from users.revocation import revoked_tokens
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Database changes roll back between tests; cached state must not outlive them."""
+    yield
+    for cache in caches.all(initialized_only=True):
+        cache.clear()
+    revoked_tokens.reset()
@@ -0,0 +1,30 @@
+# Gunicorn settings, read from the working directory by `gunicorn`.
+#
+# Workers serve the WSGI application, one request at a time per process,
+# which measured faster than ASGI (bench_catalog_load: 165 vs 90 req/s).
+# Set GUNICORN_APP=capstone_e_commerce.asgi:application and
+# GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker to serve the async
+# catalog views (common.asyncviews) instead; that only pays off when
+# workers would otherwise sit waiting on a remote database or slow clients.
+import os
+
+wsgi_app = os.environ.get("GUNICORN_APP", "capstone_e_commerce.wsgi:application")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks can't grow without bound
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server):
+    # capstone_e_commerce.asgi defaults to pooled, per-request connections;
+    # persistent ones are never reused by ASGI's per-request threads
+    if wsgi_app.endswith(".asgi:application") and os.environ.get("DATABASE_CONN_MAX_AGE", "0") != "0":
+        server.log.warning(
+            "Serving ASGI with DATABASE_CONN_MAX_AGE=%s: connections will pile up; "
+            "use DATABASE_CONN_MAX_AGE=0 with DATABASE_POOL=True", os.environ["DATABASE_CONN_MAX_AGE"],
+        )
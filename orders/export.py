@@ -0,0 +1,70 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import OrderItem
+
+# (column, lookup) for each exported value, one row per order line
+EXPORT_COLUMNS = [
+    ("order_id", "order_id"),
+    ("order_created_at", "order__created_at"),
+    ("order_status", "order__status"),
+    ("customer_email", "order__customer__email"),
+    ("item_id", "id"),
+    ("product_id", "product_id"),
+    ("product_slug", "product__slug"),
+    ("product_name", "product__name"),
+    ("quantity", "quantity"),
+    ("unit_price", "price"),
+]
+
+
+def seller_order_lines(seller, created_after=None, created_before=None, statuses=None):
+    """
+    The seller's order lines as plain tuples in ``EXPORT_COLUMNS`` order,
+    oldest order first. Filters apply to the order, not the line.
+    """
+    lines = OrderItem.objects.filter(product__seller=seller)
+    if created_after:
+        lines = lines.filter(order__created_at__gte=created_after)
+    if created_before:
+        lines = lines.filter(order__created_at__lt=created_before)
+    if statuses:
+        lines = lines.filter(order__status__in=statuses)
+    return lines.order_by("order__created_at", "order_id", "id").values_list(
+        *(lookup for _, lookup in EXPORT_COLUMNS)
+    )
+
+
+class _Line:
+    """File-like sink that hands back whatever ``csv.writer`` writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, chunk_size=2000):
+    """Yield a header and then ``rows`` as CSV, ``chunk_size`` rows per chunk."""
+    writer = csv.writer(_Line())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    yield from _chunked((writer.writerow(row) for row in rows), chunk_size)
+
+
+def stream_ndjson(rows, chunk_size=2000):
+    """Yield ``rows`` as one JSON object per line, ``chunk_size`` rows per chunk."""
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    yield from _chunked((encoder.encode(dict(zip(columns, row))) + "\n" for row in rows), chunk_size)
+
+
+def _chunked(lines, chunk_size):
+    # One write per chunk rather than per row keeps the WSGI overhead down
+    # while holding only ``chunk_size`` rows in memory at a time.
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
@@ -0,0 +1,132 @@
+import secrets
+import struct
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+
+from products.models import Product
+from .services import CART_INCREMENT, CART_REMOVE, MAX_CART_QUANTITY, apply_cart_operations, fold_cart_operations
+
+# One cart line: product id and quantity, little-endian so any server can read it
+LINE = struct.Struct("<QI")
+
+
+class InvalidCartToken(Exception):
+    """The cart token was not issued by this site."""
+
+
+class GuestCartFull(Exception):
+    def __init__(self, limit):
+        super().__init__(f"Guest carts hold at most {limit} products")
+
+
+class GuestCartStore:
+    """
+    Carts of visitors who have not logged in, held in a cache.
+
+    A guest cart is a random id signed into a token that the client keeps.
+    Its lines are stored as one compact blob under that id: 12 bytes per
+    line, packed product id and quantity, in the order products were added.
+    Every change stores the blob again with a fresh ``GUEST_CART_TTL``, so
+    abandoned carts are evicted by the cache on their own; the cache's
+    ``MAX_ENTRIES`` bounds memory.
+
+    On login the cart is folded into the customer's ``Cart`` rows with one
+    upsert (``merge``), after claiming the blob by deleting it so that two
+    concurrent logins cannot both merge it. Concurrent changes to the same
+    guest cart are last write wins.
+    """
+
+    key_prefix = "guestcart"
+    salt = "orders.guest_cart"
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, "GUEST_CART_CACHE_ALIAS", "default")
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def new_token(self):
+        return signing.Signer(salt=self.salt).sign(secrets.token_urlsafe(12))
+
+    def key(self, token):
+        try:
+            cart_id = signing.Signer(salt=self.salt).unsign(token)
+        except signing.BadSignature:
+            raise InvalidCartToken(token)
+        return f"{self.key_prefix}:{cart_id}"
+
+    @staticmethod
+    def encode(lines):
+        return b"".join(LINE.pack(product_id, quantity) for product_id, quantity in lines.items())
+
+    @staticmethod
+    def decode(blob):
+        return dict(LINE.iter_unpack(blob)) if blob else {}
+
+    def load(self, token):
+        """``{product_id: quantity}`` of the cart; empty once it has expired."""
+        return self.decode(self.backend.get(self.key(token)))
+
+    def save(self, token, lines):
+        key = self.key(token)
+        if lines:
+            self.backend.set(key, self.encode(lines), settings.GUEST_CART_TTL)
+        else:
+            self.backend.delete(key)
+
+    def apply(self, token, operations):
+        """
+        Apply ``(product_id, op, quantity)`` operations, as for ``Cart`` rows,
+        and return the lines. Nothing is stored if the cart would grow past
+        ``GUEST_CART_MAX_LINES``.
+        """
+        lines = self.load(token)
+        for product_id, (op, quantity) in fold_cart_operations(operations).items():
+            if op == CART_REMOVE:
+                lines.pop(product_id, None)
+            else:
+                base = lines.get(product_id, 0) if op == CART_INCREMENT else 0
+                lines[product_id] = min(base + quantity, MAX_CART_QUANTITY)
+        if len(lines) > settings.GUEST_CART_MAX_LINES:
+            raise GuestCartFull(settings.GUEST_CART_MAX_LINES)
+        self.save(token, lines)
+        return lines
+
+    def delete(self, token):
+        self.backend.delete(self.key(token))
+
+    def merge(self, token, user):
+        """
+        Add the guest cart's quantities to ``user``'s cart and drop the guest
+        cart. Products deleted since they were added are skipped, and summed
+        quantities are capped at ``MAX_CART_QUANTITY``. Returns the number of
+        lines merged; unknown or expired tokens, or a cart another login is
+        already merging, merge nothing.
+        """
+        try:
+            key = self.key(token)
+        except InvalidCartToken:
+            return 0
+        blob = self.backend.get(key)
+        # Only the request whose delete removed the blob merges it
+        if not blob or not self.backend.delete(key):
+            return 0
+        lines = self.decode(blob)
+        try:
+            existing = set(Product.objects.filter(pk__in=lines).order_by().values_list("pk", flat=True))
+            apply_cart_operations(user, [
+                (product_id, CART_INCREMENT, quantity)
+                for product_id, quantity in lines.items()
+                if product_id in existing
+            ])
+        except Exception:
+            # Give the cart back so the next login can merge it
+            self.backend.set(key, blob, settings.GUEST_CART_TTL)
+            raise
+        return len(existing)
+
+
+guest_carts = GuestCartStore()
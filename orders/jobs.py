@@ -0,0 +1,186 @@
+import logging
+import random
+import threading
+import traceback
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Job
+
+HANDLERS = {}
+
+logger = logging.getLogger(__name__)
+
+
+def handler(name):
+    """Register the decorated function to run jobs called ``name``, with the payload as keyword arguments."""
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(jobs, using=None):
+    """
+    Add ``(name, payload)`` jobs to the outbox in one insert. Call it inside
+    the transaction making the change the jobs are about, so that they are
+    stored if and only if it commits.
+    """
+    rows = []
+    for name, payload in jobs:
+        if name not in HANDLERS:
+            raise LookupError(f"No handler registered for job {name!r}")
+        rows.append(Job(name=name, payload=payload))
+    return Job.objects.using(using or router.db_for_write(Job)).bulk_create(rows)
+
+
+@dataclass
+class WorkerStats:
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class Worker:
+    """
+    Claim due jobs from the outbox in batches and run them.
+
+    On databases with row locks that can be skipped (PostgreSQL, MySQL 8)
+    a batch is picked with ``SELECT ... FOR UPDATE SKIP LOCKED``, so
+    concurrent workers take different jobs without waiting on each other.
+    Elsewhere (SQLite) a single ``UPDATE ... WHERE id IN (SELECT ... LIMIT)``
+    picks and claims the batch at once, which the database's one writer at a
+    time makes safe.
+
+    A claimed job is leased to the worker for ``lease`` seconds and counts
+    as an attempt. The lease is renewed as each job of the batch starts, so
+    it only has to cover one job, and a job whose lease ran out meanwhile
+    and was claimed by another worker is skipped. Jobs that succeed are
+    deleted, in one query per batch. An exception puts the job back with an
+    exponential, jittered delay, until ``max_attempts`` failures mark it
+    failed for good. Jobs whose worker died mid-lease are claimed again
+    once the lease runs out, so handlers must tolerate running more than
+    once.
+    """
+
+    # Longest wait, in seconds, between batches that fail with a database error
+    max_error_backoff = 60
+
+    def __init__(self, batch_size=10, lease=None, max_attempts=None, backoff=None, max_backoff=None):
+        self.batch_size = batch_size
+        self.lease = lease if lease is not None else settings.JOB_LEASE
+        self.max_attempts = max_attempts if max_attempts is not None else settings.JOB_MAX_ATTEMPTS
+        self.backoff = backoff if backoff is not None else settings.JOB_RETRY_BACKOFF
+        self.max_backoff = max_backoff if max_backoff is not None else settings.JOB_RETRY_BACKOFF_MAX
+        self.token = uuid.uuid4().hex
+        self.using = router.db_for_write(Job)
+        self.stats = WorkerStats()
+
+    def claim(self):
+        """Lease up to ``batch_size`` due jobs to this worker and return them."""
+        now = timezone.now()
+        jobs = Job.objects.using(self.using)
+        due = jobs.filter(
+            Q(status=Job.PENDING, run_after__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now)
+        ).order_by("run_after", "pk")
+        lease = {
+            "status": Job.RUNNING,
+            "claimed_by": self.token,
+            "locked_until": now + timedelta(seconds=self.lease),
+            "attempts": F("attempts") + 1,
+        }
+        if connections[self.using].features.has_select_for_update_skip_locked:
+            with transaction.atomic(using=self.using):
+                ids = list(due.select_for_update(skip_locked=True).values_list("pk", flat=True)[:self.batch_size])
+                claimed = jobs.filter(pk__in=ids).update(**lease)
+        else:
+            claimed = jobs.filter(pk__in=due.values("pk")[:self.batch_size]).update(**lease)
+        if not claimed:
+            return []
+        return list(jobs.filter(status=Job.RUNNING, claimed_by=self.token).order_by("run_after", "pk"))
+
+    def retry_delay(self, attempts):
+        """Seconds to wait after the ``attempts``-th failure: doubling, capped, with jitter."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1)
+
+    def execute(self, job):
+        """
+        Run ``job``; returns True if it succeeded, and reschedules or fails it
+        otherwise. Jobs another worker took over are not run.
+        """
+        mine = Job.objects.using(self.using).filter(pk=job.pk, claimed_by=self.token)
+        # The lease was taken for the whole batch; give this job a full one
+        if not mine.update(locked_until=timezone.now() + timedelta(seconds=self.lease)):
+            return False
+        try:
+            func = HANDLERS.get(job.name)
+            if func is None:
+                raise LookupError(f"No handler registered for job {job.name!r}")
+            func(**job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts >= self.max_attempts:
+                mine.update(status=Job.FAILED, locked_until=None, last_error=error)
+                self.stats.failed += 1
+            else:
+                run_after = timezone.now() + timedelta(seconds=self.retry_delay(job.attempts))
+                mine.update(status=Job.PENDING, locked_until=None, run_after=run_after, last_error=error)
+                self.stats.retried += 1
+            return False
+        return True
+
+    def run_once(self):
+        """Claim and run one batch; returns the number of jobs run."""
+        jobs = self.claim()
+        # Jobs that succeeded are deleted together at the end of the batch
+        done = [job.pk for job in jobs if self.execute(job)]
+        if done:
+            Job.objects.using(self.using).filter(pk__in=done, claimed_by=self.token).delete()
+            self.stats.succeeded += len(done)
+        return len(jobs)
+
+    def run(self, stop=None, poll_interval=1.0, drain=False, on_batch=None):
+        """
+        Run batches until ``stop`` (an event) is set, sleeping ``poll_interval``
+        seconds whenever nothing is due, or with ``drain`` until nothing is.
+        ``on_batch`` is called with the stats after every batch.
+
+        A database error (such as SQLite's "database is locked") is logged
+        and the batch tried again after a doubling delay, rather than ending
+        the worker; jobs it had claimed are reclaimed once their lease runs
+        out.
+        """
+        stop = stop or threading.Event()
+        errors = 0
+        while not stop.is_set():
+            try:
+                ran = self.run_once()
+            except DatabaseError:
+                errors += 1
+                delay = min(self.max_error_backoff, max(poll_interval, 0.1) * 2 ** (errors - 1))
+                logger.exception("Job worker %s hit a database error; retrying in %.1fs", self.token, delay)
+                connections[self.using].close_if_unusable_or_obsolete()
+                stop.wait(delay)
+                continue
+            errors = 0
+            if on_batch is not None:
+                on_batch(self.stats)
+            if not ran:
+                if drain:
+                    break
+                stop.wait(poll_interval)
+
+
+def queue_depth(using=None):
+    """``{status: count}`` of the jobs in the outbox, for monitoring."""
+    counts = dict.fromkeys([Job.PENDING, Job.RUNNING, Job.FAILED], 0)
+    rows = Job.objects.using(using or router.db_for_write(Job)).order_by().values("status")
+    counts.update(rows.annotate(count=Count("pk")).values_list("status", "count"))
+    return counts
@@ -0,0 +1,36 @@
+import time
+import tracemalloc
+
+from common.benchmarks import benchmark_database
+from orders.export import seller_order_lines, stream_csv, stream_ndjson
+from .bench_order_feed import Command as OrderFeedCommand
+
+
+class Command(OrderFeedCommand):
+    help = (
+        "Seed a throwaway database with orders and report the time, size and peak "
+        "Python memory of one seller's full CSV and NDJSON export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--sellers", type=int, default=2)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            _, seller = self.seed(options)
+            chunk_size = options["chunk_size"]
+            for name, writer in (("csv", stream_csv), ("ndjson", stream_ndjson)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                size = 0
+                for chunk in writer(seller_order_lines(seller).iterator(chunk_size=chunk_size), chunk_size):
+                    size += len(chunk)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"{name:<7} {size / 2**20:.1f}MiB in {elapsed:.2f}s, peak memory {peak / 2**20:.1f}MiB"
+                )
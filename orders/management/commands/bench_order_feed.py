@@ -0,0 +1,75 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from common.benchmarks import benchmark_database, summarize, timed
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+from products.models import Category, Product
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with orders and report p50/p99 latency of the "
+        "first page of the customer and seller order feeds, legacy versus planned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--sellers", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            customer, seller = self.seed(options)
+            page = options["page_size"]
+            feeds = {
+                # The legacy feeds get the same ordering so the pages match
+                "customer legacy": lambda: Order.objects.filter(customer=customer).order_by("-created_at", "-id"),
+                "customer planned": lambda: Order.objects.for_customer(customer),
+                "seller legacy": lambda: (
+                    Order.objects.filter(items__product__seller=seller).distinct().order_by("-created_at", "-id")
+                ),
+                "seller planned": lambda: Order.objects.for_seller(seller),
+            }
+            for name, feed in feeds.items():
+                stats = summarize(timed(lambda: OrderSerializer(feed()[:page], many=True).data, options["repeat"]))
+                self.stdout.write(
+                    f"{name:<17} p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+                    f"mean={stats['mean_ms']:.2f}ms"
+                )
+
+    def seed(self, options):
+        rng = random.Random(0)
+        customers = User.objects.bulk_create([
+            User(email=f"customer{i}@example.com", is_customer=True) for i in range(options["customers"])
+        ])
+        sellers = User.objects.bulk_create([
+            User(email=f"seller{i}@example.com", is_seller=True, is_customer=False)
+            for i in range(options["sellers"])
+        ])
+        category = Category.objects.create(name="Bench", slug="bench")
+        products = Product.objects.bulk_create([
+            Product(
+                category=category, seller=sellers[i % len(sellers)], name=f"Product {i}",
+                slug=f"product-{i}", price=i % 100 + 1, stock=1000,
+            )
+            for i in range(options["sellers"] * 10)
+        ])
+
+        batch = 5000
+        for start in range(0, options["orders"], batch):
+            orders = Order.objects.bulk_create([
+                Order(customer=rng.choice(customers))
+                for _ in range(min(batch, options["orders"] - start))
+            ])
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=rng.randint(1, 3), price=product.price)
+                for order in orders
+                for product in rng.sample(products, rng.randint(1, 3))
+            ])
+        self.stdout.write(f"Seeded {options['orders']} orders")
+        return customers[0], sellers[0]
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import renderers
+
+from common.benchmarks import benchmark_database, timed
+from common.compiled import CompiledSerializer
+from common.renderers import JSONRenderer
+from orders.models import Cart, Order, OrderItem, Wishlist
+from orders.serializers import CartSerializer, OrderSerializer, WishListSerializer
+from products.models import Category, Product
+from products.serializers import ProductSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and report objects/sec for the product, order, cart and "
+        "wishlist list serializers: DRF's serializer and JSON renderer versus the compiled "
+        "serializer and orjson renderer, fetching rows included. Checks that both produce "
+        "the same bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=500, help="Objects per serialized list")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            customer = self.seed(options["objects"])
+            cases = [
+                ("product", ProductSerializer, lambda: Product.objects.for_api()),
+                ("order", OrderSerializer, lambda: Order.objects.for_customer(customer)),
+                ("cart", CartSerializer, lambda: Cart.objects.filter(customer=customer)),
+                ("wishlist", WishListSerializer, lambda: Wishlist.objects.filter(customer=customer)),
+            ]
+            drf_renderer, fast_renderer = renderers.JSONRenderer(), JSONRenderer()
+            for name, serializer_class, queryset in cases:
+                compiled = CompiledSerializer(serializer_class)
+
+                def drf():
+                    return drf_renderer.render(serializer_class(queryset(), many=True).data)
+
+                def fast():
+                    rows = queryset()
+                    return fast_renderer.render(compiled.to_representation(compiled.values(rows), rows))
+
+                if drf() != fast():
+                    raise CommandError(f"{name}: compiled output differs from the serializer's")
+                count = queryset().count()
+                for label, func in (("drf", drf), ("compiled", fast)):
+                    rate = count * options["repeat"] / sum(timed(func, options["repeat"]))
+                    self.stdout.write(f"{name:<9} {label:<9} {rate:10.0f} objects/s")
+
+    def seed(self, count):
+        customer = User.objects.create_user(email="bench-customer@example.com", password=None)
+        seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+        category = Category.objects.create(name="Bench", slug="bench")
+        products = Product.objects.bulk_create([
+            Product(
+                category=category, seller=seller, name=f"Product {i}", slug=f"product-{i}",
+                description="A product for benchmarking. " * 5, price=i % 500 + 1, stock=10,
+            )
+            for i in range(count)
+        ])
+        orders = Order.objects.bulk_create([Order(customer=customer) for _ in range(count)])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=products[(i + j) % count], quantity=j + 1, price=products[i].price)
+            for i, order in enumerate(orders) for j in range(3)
+        ])
+        Cart.objects.bulk_create([Cart(customer=customer, product=product) for product in products])
+        Wishlist.objects.bulk_create([Wishlist(customer=customer, product=product) for product in products])
+        return customer
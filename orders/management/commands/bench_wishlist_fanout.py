@@ -0,0 +1,48 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from common.benchmarks import benchmark_database
+from orders.models import Wishlist, WishlistNotification
+from orders.notifications import WishlistNotifier
+from products.models import Category, Product
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with one product on many wishlists, restock it, and report "
+        "how long the notification fan-out takes and the peak Python memory it uses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wishlisters", type=int, default=1_000_000)
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            product = self.seed(options["wishlisters"])
+            product.stock = 10
+            product.save()
+
+            tracemalloc.start()
+            result = WishlistNotifier(chunk_size=options["chunk_size"], settle=0).run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"{result.notifications} notifications in {result.elapsed:.2f}s "
+                f"({result.notifications / result.elapsed:.0f}/s), peak Python memory {peak / 1024:.0f} KiB"
+            )
+            assert WishlistNotification.objects.count() == options["wishlisters"]
+
+    def seed(self, count):
+        seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+        category = Category.objects.create(name="Bench", slug="bench")
+        product = Product.objects.create(category=category, seller=seller, name="Bench", slug="bench", price=1)
+        for start in range(0, count, 10_000):
+            users = User.objects.bulk_create([
+                User(email=f"bench{i}@example.com", password="!") for i in range(start, min(start + 10_000, count))
+            ])
+            Wishlist.objects.bulk_create([Wishlist(customer=user, product=product) for user in users])
+        return product
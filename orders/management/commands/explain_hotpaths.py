@@ -0,0 +1,120 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from products.models import Category, Product
+from users.models import User
+
+# Plan lines that mean a whole table is read (SQLite and Postgres)
+FULL_SCAN_MARKERS = ("Seq Scan",)
+
+NO_CACHE = {
+    alias: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"} for alias in ("default", "catalog")
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Request each hot API endpoint in-process, capture the SQL it runs and print the "
+        "database's EXPLAIN plan for every statement. With --check, exit non-zero when a "
+        "statement reads a whole table or sorts without an index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--seller", help="Seller email (defaults to any seller)")
+        parser.add_argument("--customer", help="Customer email (defaults to any customer)")
+        parser.add_argument("--check", action="store_true", help="Fail on full scans and unindexed sorts")
+        parser.add_argument("--ignore", action="append", default=[], help="Table allowed to be scanned")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        seller = self.user(options["seller"], is_seller=True)
+        customer = self.user(options["customer"], is_seller=False)
+        product = Product.objects.order_by("-pk").first()
+        category = Category.objects.order_by("-pk").first()
+        if product is None or category is None:
+            raise CommandError("Need at least one product and category to explain against")
+
+        problems = []
+        for name, path, user, expected in self.hotpaths(product, category, seller, customer):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}: GET {path}"))
+            for sql in self.capture(connection, path, user):
+                plan = self.explain(connection, sql)
+                self.stdout.write(f"  {sql}")
+                for line in plan:
+                    self.stdout.write(f"    {line}")
+                problems += [
+                    f"{name}: {line}" for line in plan
+                    if not any(marker in line for marker in expected)
+                    and self.is_problem(connection, line, options["ignore"])
+                ]
+
+        if problems and options["check"]:
+            raise CommandError("Unindexed access paths:\n" + "\n".join(problems))
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+
+    def hotpaths(self, product, category, seller, customer):
+        """``(name, path, user, expected)``; ``expected`` plan lines are never reported."""
+        return [
+            ("product list", "/products/", None, ()),
+            ("product list by category", f"/products/?category={category.pk}", None, ()),
+            ("product list by price", "/products/?ordering=price", None, ()),
+            ("category by price", f"/products/?category={category.pk}&ordering=-price", None, ()),
+            # Matches are ordered by their search rank, which no index can hold
+            ("product search", f"/products/?search={product.name.split()[0]}", None, ("TEMP B-TREE",)),
+            ("product detail", f"/products/{product.pk}/", None, ()),
+            ("customer orders", "/orders/", customer, ()),
+            ("seller orders", "/orders/", seller, ()),
+            # Driven from the seller's products, whose lines are merged by one sort
+            ("seller order export", "/orders/export/", seller, ("TEMP B-TREE",)),
+            ("cart", "/orders/cart/", customer, ()),
+            ("wishlist", "/orders/wishlist/", customer, ()),
+        ]
+
+    def user(self, email, is_seller):
+        users = User.objects.filter(is_seller=is_seller)
+        user = users.filter(email=email).first() if email else users.order_by("pk").first()
+        if user is None:
+            raise CommandError(f"No {'seller' if is_seller else 'customer'} to request as")
+        return user
+
+    def capture(self, connection, path, user):
+        request = APIRequestFactory().get(path)
+        if user is not None:
+            force_authenticate(request, user=user)
+        match = resolve(path.split("?")[0])
+        view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+        # Responses must come from the database, not the catalog cache
+        with override_settings(CACHES=NO_CACHE), CaptureQueriesContext(connection) as queries:
+            response = view(request, *match.args, **match.kwargs)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+        if response.status_code != 200:
+            raise CommandError(f"GET {path} returned {response.status_code}")
+        return [
+            query["sql"] for query in queries.captured_queries
+            if not query["sql"].startswith(("SAVEPOINT", "RELEASE", "BEGIN", "COMMIT"))
+        ]
+
+    def explain(self, connection, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            rows = cursor.fetchall()
+        if connection.vendor == "sqlite":
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+    def is_problem(self, connection, line, ignore):
+        if any(table in line for table in ignore):
+            return False
+        if connection.vendor == "sqlite":
+            bare_scan = line.startswith("SCAN ") and " USING " not in line and "VIRTUAL TABLE" not in line
+            return bare_scan or "USE TEMP B-TREE FOR ORDER BY" in line
+        return any(marker in line for marker in FULL_SCAN_MARKERS)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from orders.notifications import WishlistNotifier
+
+
+class Command(BaseCommand):
+    help = (
+        "Write back-in-stock and price-drop notifications for wishlisted products from the "
+        "product change log, starting at the last watermark. Meant to run from cron; a run "
+        "that dies part way is safe to repeat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Changes read per batch")
+        parser.add_argument("--chunk-size", type=int, default=10_000, help="Customers notified per statement")
+        parser.add_argument(
+            "--settle-seconds", type=float, default=5,
+            help="Skip changes younger than this, so ones still committing are not passed over",
+        )
+
+    def handle(self, *args, **options):
+        notifier = WishlistNotifier(
+            batch_size=options["batch_size"], chunk_size=options["chunk_size"], settle=options["settle_seconds"],
+        )
+        result = notifier.run()
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {result.changes} changes into {result.notifications} notifications "
+            f"in {result.elapsed:.2f}s; watermark at {result.watermark}"
+        ))
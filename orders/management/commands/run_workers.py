@@ -0,0 +1,110 @@
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from orders.jobs import Worker, queue_depth
+
+
+def work(options, stop, totals):
+    """Body of a pool process; ``totals`` are shared succeeded/retried/failed counters."""
+    # Ctrl-C reaches the whole process group; only the parent reacts to it,
+    # by setting ``stop``, so a child never dies in the middle of a job
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    reported = [0, 0, 0]
+
+    def report(stats):
+        current = [stats.succeeded, stats.retried, stats.failed]
+        with totals.get_lock():
+            for i, value in enumerate(current):
+                totals[i] += value - reported[i]
+        reported[:] = current
+
+    try:
+        Worker(batch_size=options["batch_size"]).run(
+            stop, poll_interval=options["poll_interval"], drain=options["drain"], on_batch=report,
+        )
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the outbox in a pool of worker processes, printing "
+        "throughput every --metrics-interval seconds. Stops after the current batch on "
+        "SIGINT or SIGTERM; with --drain, as soon as no job is due."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument("--batch-size", type=int, default=10, help="Jobs claimed at a time by each worker")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when no job is due")
+        parser.add_argument("--metrics-interval", type=float, default=10.0)
+        parser.add_argument("--drain", action="store_true", help="Exit once no job is due")
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        totals = context.Array("q", 3)
+        previous = {
+            signum: signal.signal(signum, lambda *args: stop.set()) for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        self.started = self.last_report = time.monotonic()
+        self.last_done = 0
+        try:
+            if options["processes"] <= 1:
+                # In this process, without forking
+                Worker(batch_size=options["batch_size"]).run(
+                    stop, poll_interval=options["poll_interval"], drain=options["drain"],
+                    on_batch=lambda stats: self.tick(stats, totals, options["metrics_interval"]),
+                )
+            else:
+                self.run_pool(options, context, stop, totals)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.report(totals, final=True)
+
+    def run_pool(self, options, context, stop, totals):
+        # Children must open their own connections rather than share the parent's
+        connections.close_all()
+        processes = [
+            context.Process(target=work, args=(options, stop, totals), daemon=True)
+            for _ in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+        while alive := [process.sentinel for process in processes if process.is_alive()]:
+            wait(alive, timeout=options["metrics_interval"])
+            if time.monotonic() - self.last_report >= options["metrics_interval"]:
+                self.report(totals)
+        for process in processes:
+            process.join()
+
+    def tick(self, stats, totals, interval):
+        totals[:] = [stats.succeeded, stats.retried, stats.failed]
+        if time.monotonic() - self.last_report >= interval:
+            self.report(totals)
+
+    def report(self, totals, final=False):
+        now = time.monotonic()
+        succeeded, retried, failed = totals[:]
+        done = succeeded + retried + failed
+        if final:
+            elapsed = now - self.started
+            self.stdout.write(self.style.SUCCESS(
+                f"Ran {done} jobs in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f}/s): "
+                f"{succeeded} succeeded, {retried} to retry, {failed} failed"
+            ))
+            return
+        rate = (done - self.last_done) / (now - self.last_report)
+        depth = queue_depth()
+        self.stdout.write(
+            f"{rate:.1f} jobs/s; {succeeded} succeeded, {retried} retried, {failed} failed; "
+            f"{depth['pending']} pending, {depth['running']} running, {depth['failed']} failed in the outbox"
+        )
+        self.last_report, self.last_done = now, done
@@ -1,12 +1,36 @@
 from django.db import models
+from django.db.models import (
+    BooleanField, Count, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Prefetch, Q, Sum, Window,
+)
 from django.conf import settings
-from products.models import Product
+from django.utils import timezone
+from products.models import Product, ProductChange
 
 User = settings.AUTH_USER_MODEL
 
 
+class OrderQuerySet(models.QuerySet):
+    def for_customer(self, user):
+        """The customer's own orders with all of their items prefetched."""
+        return self.filter(customer=user).prefetch_related("items").order_by("-created_at", "-id")
+
+    def for_seller(self, user):
+        """
+        Orders containing at least one of the seller's products, with only the
+        seller's own items prefetched. An EXISTS subquery keeps each order to a
+        single row, avoiding a DISTINCT over the order/item/product join.
+        """
+        seller_items = OrderItem.objects.filter(product__seller=user)
+        return (
+            self.filter(Exists(seller_items.filter(order=OuterRef("pk"))))
+            .prefetch_related(Prefetch("items", queryset=seller_items))
+            .order_by("-created_at", "-id")
+        )
+
+
 class Order(models.Model):
-    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
+    # Indexed by order_customer_created_idx
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(
@@ -21,24 +45,89 @@ class Order(models.Model):
         default="pending",
     )
 
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Lets the seller feed walk orders newest-first and stop as soon as
+            # a page of EXISTS matches is found instead of sorting every order.
+            models.Index(fields=["-created_at", "-id"], name="order_created_idx"),
+            # The customer's feed, newest first
+            models.Index(fields=["customer", "-created_at", "-id"], name="order_customer_created_idx"),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.customer.username}"
 
 
 class OrderItem(models.Model):
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
-    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    # Both foreign keys are indexed by the composite indexes in Meta
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_index=False)
     quantity = models.PositiveIntegerField(default=1)
+    # Unit price captured at checkout so later price changes don't rewrite history
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Items of an order (prefetch, the seller EXISTS probe) without
+            # visiting the table to read the product
+            models.Index(fields=["order", "product"], name="orderitem_order_product_idx"),
+            # A seller's order lines (export), reached through their products
+            models.Index(fields=["product", "order"], name="orderitem_product_order_idx"),
+        ]
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
 
 
+class CartQuerySet(models.QuerySet):
+    def with_line_totals(self):
+        """
+        Annotate each line with its product's current price, the line total
+        and whether the product's stock falls short of the quantity.
+        """
+        return self.annotate(
+            unit_price=F("product__price"),
+            line_total=ExpressionWrapper(
+                F("quantity") * F("product__price"), output_field=DecimalField(max_digits=14, decimal_places=2)
+            ),
+            out_of_stock=ExpressionWrapper(Q(product__stock__lt=F("quantity")), output_field=BooleanField()),
+        )
+
+    @staticmethod
+    def summary_aggregates(default=0):
+        """Cart totals over lines annotated by ``with_line_totals``; sums of no lines are ``default``."""
+        return {
+            "line_count": Count("id"),
+            "item_count": Sum("quantity", default=default),
+            "total": Sum("line_total", default=default),
+            "out_of_stock_count": Count("id", filter=Q(out_of_stock=True)),
+        }
+
+    def summary(self):
+        """The cart's totals in one aggregate query."""
+        return self.with_line_totals().aggregate(**self.summary_aggregates())
+
+    def lines_with_summary(self):
+        """
+        The lines annotated by ``with_line_totals``, each also carrying the
+        cart's totals as window aggregates, so that one query returns both.
+        """
+        # No default: there are no rows to give one to, and COALESCE can't wrap a window
+        return self.with_line_totals().annotate(
+            **{name: Window(aggregate) for name, aggregate in self.summary_aggregates(default=None).items()}
+        )
+
+
 class Cart(models.Model):
-    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart')
+    # Indexed by the (customer, product) unique constraint
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart', db_index=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    objects = CartQuerySet.as_manager()
+
     class Meta:
         unique_together =("customer", "product")
 
@@ -47,11 +136,89 @@ class Cart(models.Model):
 
 
 class Wishlist(models.Model):
-    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wishlist')
+    # Indexed by the (customer, product) unique constraint
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wishlist', db_index=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
 
     class Meta:
         unique_together =("customer", "product")
+        indexes = [
+            # Who wishlisted a product, walked in customer order for the
+            # notification fan-out without visiting the table
+            models.Index(fields=["product", "customer"], name="wishlist_product_customer_idx"),
+        ]
 
     def __str__(self):
         return f"{self.product.name} in {self.customer.username}'s wishlist"
+
+
+class WishlistNotification(models.Model):
+    """
+    Outbox of notifications to customers about products on their wishlist,
+    written by ``orders.notifications`` and delivered separately.
+    """
+    BACK_IN_STOCK = "back_in_stock"
+    PRICE_DROP = "price_drop"
+
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="wishlist_notifications")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+", db_index=False)
+    # The change that triggered the notification; with the customer and
+    # kind it makes reprocessing a change write nothing new
+    change = models.ForeignKey(ProductChange, on_delete=models.CASCADE, related_name="+", db_index=False)
+    kind = models.CharField(
+        max_length=20, choices=[(BACK_IN_STOCK, "Back in stock"), (PRICE_DROP, "Price dropped")]
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["change", "customer", "kind"], name="wishlist_notification_once"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: product {self.product_id} for customer {self.customer_id}"
+
+
+class Watermark(models.Model):
+    """How far a named consumer has processed an append-only log, by id."""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+
+class Job(models.Model):
+    """
+    Outbox of background work, written in the same transaction as the change
+    that needs it and run by ``manage.py run_workers`` (see ``orders.jobs``).
+    Jobs are deleted once they succeed; failed ones are kept for inspection.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=[(PENDING, "Pending"), (RUNNING, "Running"), (FAILED, "Failed")], default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Set while a worker holds the job; a job still running after its lease
+    # expired belonged to a worker that died and is claimed again
+    claimed_by = models.CharField(max_length=32, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers look for due jobs of a status, oldest first
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,133 @@
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from products.models import ProductChange
+from .models import Watermark, Wishlist, WishlistNotification
+
+
+@dataclass
+class NotifyResult:
+    changes: int = 0
+    notifications: int = 0
+    watermark: int = 0
+    elapsed: float = 0.0
+
+
+class WishlistNotifier:
+    """
+    Turn logged product changes into wishlist notifications.
+
+    ``ProductChange`` rows are read in id order after the watermark, in
+    batches. Stock going from zero to some makes a "back in stock"
+    notification, a lower price a "price drop", for every customer with the
+    product on their wishlist (see ``transitions``).
+
+    The fan-out walks the ``(product, customer)`` wishlist index in chunks
+    of ``chunk_size`` customers, each written by a single ``INSERT ...
+    SELECT``, so customer ids never pass through Python and memory stays
+    flat however many customers wishlisted the product. Chunks commit on
+    their own; the notification's unique (change, customer, kind)
+    constraint makes rewriting a chunk harmless, so the watermark moves
+    once per batch and a crashed run is simply redone (delivery is at
+    least once).
+
+    Changes are only read once they are ``settle`` seconds old: ids are
+    assigned when a change is inserted, not when it commits, so a newer id
+    can become visible before an older one that is still in flight.
+    """
+
+    watermark_name = "wishlist_notifications"
+
+    def __init__(self, batch_size=1000, chunk_size=10_000, settle=5):
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.settle = settle
+
+    def run(self):
+        """Process every settled change after the watermark."""
+        result = NotifyResult()
+        start = time.perf_counter()
+        watermark, _ = Watermark.objects.get_or_create(name=self.watermark_name)
+        while True:
+            changes = list(
+                ProductChange.objects.filter(
+                    pk__gt=watermark.position, created_at__lte=timezone.now() - timedelta(seconds=self.settle)
+                ).order_by("pk")[:self.batch_size]
+            )
+            if not changes:
+                break
+            for product_id, change_id, kind in self.transitions(changes):
+                result.notifications += self.fan_out(product_id, change_id, kind)
+            result.changes += len(changes)
+            watermark.position = changes[-1].pk
+            watermark.save(update_fields=["position", "updated_at"])
+        result.watermark = watermark.position
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def transitions(changes):
+        """
+        ``(product_id, change id, kind)`` of the notifications ``changes`` call for.
+
+        A restock is judged on each change's own old and new stock, and only
+        the last restock of a product in the batch notifies, unless a later
+        change took the stock back to zero. A price drop compares the batch's
+        first old price with its last new one, so a price raised and lowered
+        again within the batch notifies nobody.
+        """
+        restocks, first_price, last = {}, {}, {}
+        for change in changes:
+            state = last.setdefault(change.product_id, {})
+            if change.old_stock is not None:
+                state["stock"] = change.new_stock
+                if change.old_stock == 0 and change.new_stock > 0:
+                    restocks[change.product_id] = change.pk
+            if change.old_price is not None:
+                first_price.setdefault(change.product_id, change.old_price)
+                state["price"] = change.new_price
+                state["price_change"] = change.pk
+
+        for product_id, change_id in restocks.items():
+            if last[product_id]["stock"] > 0:
+                yield product_id, change_id, WishlistNotification.BACK_IN_STOCK
+        for product_id, old_price in first_price.items():
+            if last[product_id]["price"] < old_price:
+                yield product_id, last[product_id]["price_change"], WishlistNotification.PRICE_DROP
+
+    def fan_out(self, product_id, change_id, kind):
+        """Notify everyone who wishlisted the product, a chunk at a time; returns the number written."""
+        using = router.db_for_write(WishlistNotification)
+        wishlist, notification = Wishlist._meta, WishlistNotification._meta
+        customer = wishlist.get_field("customer").column
+        columns = ", ".join(
+            notification.get_field(name).column for name in ("customer", "product", "change", "kind", "created_at")
+        )
+        connection = connections[using]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+        written = 0
+        after = 0
+        while after is not None:
+            # The last customer of this chunk, or None when the rest fits in it
+            upper = (
+                Wishlist.objects.using(using).filter(product_id=product_id, customer_id__gt=after)
+                .order_by("customer_id").values_list("customer_id", flat=True)[self.chunk_size - 1:self.chunk_size]
+                .first()
+            )
+            bound = f"AND {customer} <= %s" if upper is not None else ""
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {notification.db_table} ({columns}) "
+                    f"SELECT {customer}, %s, %s, %s, %s FROM {wishlist.db_table} "
+                    f"WHERE {wishlist.get_field('product').column} = %s AND {customer} > %s {bound} "
+                    f"ON CONFLICT DO NOTHING",
+                    [product_id, change_id, kind, now, product_id, after] + ([upper] if upper is not None else []),
+                )
+                written += max(cursor.rowcount, 0)
+            after = upper
+        return written
@@ -1,11 +1,17 @@
+from django.db import transaction
 from rest_framework import serializers
+from products.models import Product
+from products.stock import InsufficientStockError, reserve_stock
 from .models import Order, OrderItem, Cart, Wishlist
+from .services import CART_INCREMENT, CART_REMOVE, CART_SET, MAX_CART_QUANTITY
+from .tasks import enqueue_order_placed
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
-        fields = ["id", "product", "quantity"]
+        fields = ["id", "product", "quantity", "price"]
+        read_only_fields = ["price"]
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -18,9 +24,19 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         items_data = validated_data.pop("items")
-        order = Order.objects.create(**validated_data)
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        with transaction.atomic():
+            try:
+                reserve_stock([(item["product"].pk, item["quantity"]) for item in items_data])
+            except InsufficientStockError as exc:
+                raise serializers.ValidationError(
+                    {"items": f"Insufficient stock for products {exc.product_ids}"}
+                )
+            order = Order.objects.create(**validated_data)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, price=item["product"].price, **item)
+                for item in items_data
+            ])
+            enqueue_order_placed(order)
         return order
 
 
@@ -28,9 +44,75 @@ class CartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cart
         fields = ["id", "product", "quantity"]
+        extra_kwargs = {"quantity": {"max_value": MAX_CART_QUANTITY}}
+
+
+class CartOperationListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        product_ids = {operation["product"] for operation in attrs}
+        found = set(Product.objects.filter(pk__in=product_ids).order_by().values_list("pk", flat=True))
+        if missing := sorted(product_ids - found):
+            raise serializers.ValidationError(f"Unknown products {missing}")
+        return attrs
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """
+    One change to the cart. Products are checked for existence in a single
+    query for the whole list.
+    """
+    product = serializers.IntegerField(min_value=1)
+    op = serializers.ChoiceField(choices=[CART_SET, CART_INCREMENT, CART_REMOVE], default=CART_INCREMENT)
+    quantity = serializers.IntegerField(
+        min_value=0, max_value=MAX_CART_QUANTITY, default=1,
+        help_text="New quantity for set (0 removes), amount to add for increment",
+    )
+
+    class Meta:
+        list_serializer_class = CartOperationListSerializer
+
+    def validate(self, attrs):
+        if attrs["op"] == CART_INCREMENT and attrs["quantity"] < 1:
+            raise serializers.ValidationError({"quantity": "Increment by at least 1."})
+        return attrs
+
+
+class CartLineSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, help_text="Current product price")
+    line_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    out_of_stock = serializers.BooleanField(help_text="The product's stock is below the quantity")
+
+
+class CartSummarySerializer(serializers.Serializer):
+    line_count = serializers.IntegerField()
+    item_count = serializers.IntegerField(help_text="Sum of the quantities")
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    out_of_stock_count = serializers.IntegerField(help_text="Lines whose product's stock is below the quantity")
+    lines = CartLineSerializer(many=True, required=False, help_text="Only with ?expand=lines")
+
+
+class CartSummaryQuerySerializer(serializers.Serializer):
+    """Query parameters of the cart summary."""
+    expand = serializers.MultipleChoiceField(
+        choices=["lines"], required=False, help_text="lines: include every line with its total and stock flag"
+    )
 
 
 class WishListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Wishlist
         fields = ["id", "product"]
+
+
+class OrderExportQuerySerializer(serializers.Serializer):
+    """Query parameters of the seller order export."""
+    output = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+    created_after = serializers.DateTimeField(required=False, help_text="Orders created at or after this time")
+    created_before = serializers.DateTimeField(required=False, help_text="Orders created before this time")
+    status = serializers.MultipleChoiceField(
+        choices=Order._meta.get_field("status").choices, required=False,
+        help_text="Repeat to export several statuses",
+    )
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+
+from django.db import connections, router, transaction
+
+from common.utils import QueryCounter
+from products.stock import reserve_stock
+from .models import Order, OrderItem, Cart
+from .tasks import enqueue_order_placed
+
+CART_SET, CART_INCREMENT, CART_REMOVE = "set", "increment", "remove"
+# Cart quantities are clamped to this, well inside every database's integer
+MAX_CART_QUANTITY = 10_000
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be turned into an order."""
+
+
+class EmptyCartError(CheckoutError):
+    def __init__(self):
+        super().__init__("Cart is empty")
+
+
+@dataclass
+class CheckoutResult:
+    order: Order
+    line_count: int
+    query_count: int
+
+
+def checkout_cart(user):
+    """
+    Turn the user's cart into an order in a fixed number of queries.
+
+    One locked read of the cart joined to its products, one conditional stock
+    update, one order insert, one bulk insert of the order items, one insert
+    of the order's background jobs and one cart delete, all in a single
+    transaction so a failure leaves no partial order, half-emptied cart or
+    jobs for a missing order behind.
+    """
+    with QueryCounter() as queries, transaction.atomic():
+        lines = list(
+            Cart.objects.filter(customer=user)
+            .select_related("product")
+            .select_for_update(of=("self", "product"))
+            .only("id", "quantity", "product__id", "product__price")
+            .order_by("product_id")
+        )
+        if not lines:
+            raise EmptyCartError()
+
+        # Product rows are already locked in id order by the read above
+        reserve_stock([(line.product_id, line.quantity) for line in lines], lock=False)
+        order = Order.objects.create(customer=user)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=line.product_id,
+                quantity=line.quantity,
+                price=line.product.price,
+            )
+            for line in lines
+        ])
+        enqueue_order_placed(order)
+        Cart.objects.filter(pk__in=[line.pk for line in lines]).delete()
+
+    return CheckoutResult(order=order, line_count=len(lines), query_count=queries.count)
+
+
+def fold_cart_operations(operations):
+    """
+    Reduce ``(product_id, op, quantity)`` operations, applied in order, to at
+    most one per product: a set, an increment or a removal. Setting a
+    quantity of 0 removes the product.
+    """
+    folded = {}
+    for product_id, op, quantity in operations:
+        previous = folded.get(product_id)
+        if op == CART_INCREMENT and previous is not None:
+            previous_op, previous_quantity = previous
+            if previous_op == CART_REMOVE:
+                op = CART_SET
+            else:
+                op, quantity = previous_op, previous_quantity + quantity
+        if op == CART_SET and quantity == 0:
+            op = CART_REMOVE
+        folded[product_id] = (op, quantity if op != CART_REMOVE else 0)
+    return folded
+
+
+def apply_cart_operations(user, operations):
+    """
+    Apply cart operations (see ``fold_cart_operations``) in one transaction.
+
+    Sets and increments are written by at most two upserts on the
+    (customer, product) unique constraint, increments adding to the stored
+    quantity inside the database so concurrent ones are never lost, and
+    every removal by a single delete, so the query count doesn't depend on
+    the number of operations. Quantities are clamped to
+    ``MAX_CART_QUANTITY``. Products must exist; callers validate them.
+    """
+    folded = fold_cart_operations(operations)
+    removed = [product_id for product_id, (op, _) in folded.items() if op == CART_REMOVE]
+    using = router.db_for_write(Cart)
+
+    with transaction.atomic(using=using):
+        for op in (CART_SET, CART_INCREMENT):
+            lines = [
+                (product_id, min(quantity, MAX_CART_QUANTITY))
+                for product_id, (line_op, quantity) in folded.items()
+                if line_op == op
+            ]
+            if lines:
+                upsert_cart_lines(user, lines, increment=op == CART_INCREMENT, using=using)
+        if removed:
+            Cart.objects.using(using).filter(customer=user, product_id__in=removed).delete()
+
+
+def upsert_cart_lines(user, lines, increment, using):
+    """
+    Write ``(product_id, quantity)`` lines to the user's cart in one
+    ``INSERT ... ON CONFLICT``, replacing the stored quantities or, with
+    ``increment``, adding to them.
+    """
+    meta = Cart._meta
+    customer, product, quantity = (meta.get_field(name).column for name in ("customer", "product", "quantity"))
+    total = f"{meta.db_table}.{quantity} + excluded.{quantity}" if increment else f"excluded.{quantity}"
+    params = []
+    for product_id, line_quantity in lines:
+        params += [user.pk, product_id, line_quantity]
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {meta.db_table} ({customer}, {product}, {quantity}) "
+            f"VALUES {', '.join(['(%s, %s, %s)'] * len(lines))} "
+            f"ON CONFLICT ({customer}, {product}) DO UPDATE SET "
+            f"{quantity} = CASE WHEN {total} > %s THEN %s ELSE {total} END",
+            params + [MAX_CART_QUANTITY, MAX_CART_QUANTITY],
+        )
+
+
+def cart_summary(user, lines=False):
+    """
+    The user's cart totals (line count, item count, grand total at current
+    prices, lines short of stock), computed by the database in one query.
+    With ``lines``, each line's price, total and stock flag come back from
+    that same query under ``"lines"``.
+    """
+    cart = Cart.objects.filter(customer=user)
+    if not lines:
+        return cart.summary()
+
+    names = list(Cart.objects.summary_aggregates())
+    rows = list(
+        cart.lines_with_summary()
+        .order_by("id")
+        .values("id", "product", "quantity", "unit_price", "line_total", "out_of_stock", *names)
+    )
+    summary = {name: rows[0][name] for name in names} if rows else {name: 0 for name in names}
+    summary["lines"] = [{name: row[name] for name in row if name not in names} for row in rows]
+    return summary
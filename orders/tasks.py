@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.core.mail import send_mail, send_mass_mail
+
+from .jobs import enqueue, handler
+from .models import Order, OrderItem
+
+ORDER_CONFIRMATION = "orders.order_confirmation"
+SELLER_NOTIFICATION = "orders.seller_notification"
+
+
+def enqueue_order_placed(order):
+    """Queue the side effects of a new order; call inside the transaction creating it."""
+    payload = {"order_id": order.pk}
+    enqueue([(ORDER_CONFIRMATION, payload), (SELLER_NOTIFICATION, payload)])
+
+
+def describe(items):
+    return "\n".join(f"{item.quantity} x {item.product.name}" for item in items)
+
+
+@handler(ORDER_CONFIRMATION)
+def send_order_confirmation(order_id):
+    """Email the customer what they ordered."""
+    order = Order.objects.select_related("customer").filter(pk=order_id).first()
+    if order is None:
+        return
+    items = OrderItem.objects.filter(order=order).select_related("product").order_by("pk")
+    send_mail(
+        f"Order #{order.pk} received",
+        f"Thanks for your order. We have received:\n\n{describe(items)}\n",
+        None,
+        [order.customer.email],
+    )
+
+
+@handler(SELLER_NOTIFICATION)
+def notify_sellers(order_id):
+    """Email each seller with products in the order the items they have to ship."""
+    items = OrderItem.objects.filter(order_id=order_id).select_related("product__seller").order_by("pk")
+    by_seller = defaultdict(list)
+    for item in items:
+        by_seller[item.product.seller.email].append(item)
+    send_mass_mail([
+        (f"New order #{order_id}", f"Please ship:\n\n{describe(seller_items)}\n", None, [email])
+        for email, seller_items in by_seller.items()
+    ])
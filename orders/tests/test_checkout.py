@@ -0,0 +1,205 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from orders.models import Cart, Order, OrderItem
+from orders import services
+from orders.services import checkout_cart
+from products.models import Category, Product
+from users.models import User
+
+
+class CheckoutTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.url = reverse("cart-checkout")
+
+    def make_products(self, count, stock=10, start=0):
+        return Product.objects.bulk_create([
+            Product(
+                category=self.category,
+                seller=self.seller,
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                price=Decimal("9.99") + i,
+                stock=stock,
+            )
+            for i in range(start, start + count)
+        ])
+
+    def fill_cart(self, products, quantity=2):
+        Cart.objects.bulk_create([
+            Cart(customer=self.customer, product=product, quantity=quantity) for product in products
+        ])
+
+    def test_checkout_moves_cart_into_order(self):
+        products = self.make_products(3)
+        self.fill_cart(products)
+        self.client.force_authenticate(user=self.customer)
+
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data["order_id"])
+        items = OrderItem.objects.filter(order=order).order_by("product_id")
+        self.assertEqual([item.price for item in items], [p.price for p in products])
+        self.assertFalse(Cart.objects.filter(customer=self.customer).exists())
+        self.assertEqual(set(Product.objects.values_list("stock", flat=True)), {8})
+
+    def test_empty_cart(self):
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_insufficient_stock_rolls_back(self):
+        products = self.make_products(2, stock=1)
+        self.fill_cart(products, quantity=2)
+        self.client.force_authenticate(user=self.customer)
+
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Cart.objects.filter(customer=self.customer).count(), 2)
+        self.assertEqual(set(Product.objects.values_list("stock", flat=True)), {1})
+
+    def test_query_count_is_flat(self):
+        self.fill_cart(self.make_products(1))
+        small = checkout_cart(self.customer)
+
+        self.fill_cart(self.make_products(49, start=1))
+        large = checkout_cart(self.customer)
+
+        self.assertEqual(large.line_count, 49)
+        self.assertEqual(small.query_count, large.query_count)
+
+
+class CartBulkTests(APITestCase):
+    def setUp(self):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        self.products = Product.objects.bulk_create([
+            Product(category=category, seller=seller, name=f"Product {i}", slug=f"product-{i}", price=1, stock=5)
+            for i in range(40)
+        ])
+        self.client.force_authenticate(user=self.customer)
+
+    def cart(self):
+        return dict(Cart.objects.filter(customer=self.customer).values_list("product_id", "quantity"))
+
+    def test_operations_merge_into_the_cart(self):
+        first, second, third, fourth = (p.pk for p in self.products[:4])
+        Cart.objects.bulk_create([
+            Cart(customer=self.customer, product_id=first, quantity=2),
+            Cart(customer=self.customer, product_id=second, quantity=2),
+            Cart(customer=self.customer, product_id=third, quantity=2),
+        ])
+        response = self.client.post(reverse("cart-bulk"), [
+            {"product": first, "quantity": 3},
+            {"product": second, "op": "set", "quantity": 5},
+            {"product": third, "op": "remove"},
+            {"product": fourth, "op": "set", "quantity": 1},
+            {"product": fourth, "quantity": 2},
+        ], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.cart(), {first: 5, second: 5, fourth: 3})
+        self.assertEqual({line["product"]: line["quantity"] for line in response.data}, self.cart())
+
+    def test_query_count_is_flat(self):
+        Cart.objects.create(customer=self.customer, product=self.products[0], quantity=1)
+        url = reverse("cart-bulk")
+        with self.assertNumQueries(5):
+            self.client.post(url, [{"product": self.products[0].pk}, {"product": self.products[1].pk}], format="json")
+        with self.assertNumQueries(5):
+            self.client.post(url, [{"product": p.pk, "quantity": 2} for p in self.products], format="json")
+        self.assertEqual(self.cart()[self.products[0].pk], 4)
+
+    def test_increments_add_to_the_stored_quantity(self):
+        product = self.products[0]
+        Cart.objects.create(customer=self.customer, product=product, quantity=1)
+        raced = []
+
+        def concurrent(execute, sql, params, many, context):
+            # Another request increments the line just before this one writes
+            if sql.startswith("INSERT") and not raced:
+                raced.append(sql)
+                Cart.objects.filter(customer=self.customer, product=product).update(quantity=F("quantity") + 2)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(concurrent):
+            services.apply_cart_operations(self.customer, [(product.pk, services.CART_INCREMENT, 3)])
+        self.assertEqual(self.cart(), {product.pk: 6})
+
+    def test_quantities_are_capped(self):
+        url = reverse("cart-bulk")
+        response = self.client.post(url, [{"product": self.products[0].pk, "quantity": 2**31}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        maximum = services.MAX_CART_QUANTITY
+        for _ in range(2):
+            response = self.client.post(url, [{"product": self.products[0].pk, "quantity": maximum}], format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.cart(), {self.products[0].pk: maximum})
+
+    def test_unknown_products_reject_the_whole_batch(self):
+        response = self.client.post(
+            reverse("cart-bulk"), [{"product": self.products[0].pk}, {"product": 10**9}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.cart(), {})
+
+    def test_adding_a_product_twice_increments_it(self):
+        url = reverse("cart-list-create")
+        for _ in range(2):
+            response = self.client.post(url, {"product": self.products[0].pk, "quantity": 2}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["quantity"], 4)
+        self.assertEqual(self.cart(), {self.products[0].pk: 4})
+
+
+class CartSummaryTests(APITestCase):
+    def setUp(self):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        self.phone, self.case = Product.objects.bulk_create([
+            Product(category=category, seller=seller, name="Phone", slug="phone", price=Decimal("199.99"), stock=5),
+            Product(category=category, seller=seller, name="Case", slug="case", price=Decimal("9.95"), stock=1),
+        ])
+        self.client.force_authenticate(user=self.customer)
+        self.url = reverse("cart-summary")
+
+    def test_empty_cart(self):
+        response = self.client.get(self.url, {"expand": "lines"})
+        self.assertEqual(response.data, {
+            "line_count": 0, "item_count": 0, "total": "0.00", "out_of_stock_count": 0, "lines": [],
+        })
+        self.assertEqual(self.client.get(self.url).data["total"], "0.00")
+
+    def test_totals_and_lines_come_from_one_query(self):
+        Cart.objects.bulk_create([
+            Cart(customer=self.customer, product=self.phone, quantity=2),
+            Cart(customer=self.customer, product=self.case, quantity=3),
+        ])
+        expected = {"line_count": 2, "item_count": 5, "total": "429.83", "out_of_stock_count": 1}
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data, expected)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"expand": "lines"})
+        lines = response.data.pop("lines")
+        self.assertEqual(response.data, expected)
+        self.assertEqual(
+            [(line["product"], line["unit_price"], line["line_total"], line["out_of_stock"]) for line in lines],
+            [(self.phone.pk, "199.99", "399.98", False), (self.case.pk, "9.95", "29.85", True)],
+        )
@@ -0,0 +1,120 @@
+import time
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from orders import guest_cart as guest_carts_module
+from orders.guest_cart import GuestCartStore, guest_carts
+from orders.models import Cart
+from orders.services import MAX_CART_QUANTITY
+from products.models import Category, Product
+from users.models import User
+
+
+class GuestCartTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        cls.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        cls.products = Product.objects.bulk_create([
+            Product(category=category, seller=seller, name=f"Product {i}", slug=f"product-{i}", price=1, stock=5)
+            for i in range(5)
+        ])
+        cls.url = reverse("guest-cart")
+
+    def setUp(self):
+        guest_carts.backend.clear()
+
+    def add(self, operations, token=None):
+        headers = {"X-Cart-Token": token} if token else {}
+        return self.client.post(self.url, operations, format="json", headers=headers)
+
+    def test_guest_cart_round_trip(self):
+        first, second = self.products[0].pk, self.products[1].pk
+        response = self.add([{"product": first, "quantity": 2}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        token = response.data["token"]
+
+        response = self.add([{"product": first}, {"product": second, "op": "set", "quantity": 4}], token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, headers={"X-Cart-Token": token})
+        self.assertEqual(
+            response.data["items"], [{"product": first, "quantity": 3}, {"product": second, "quantity": 4}]
+        )
+        # Twelve bytes per line
+        self.assertEqual(len(guest_carts.backend.get(guest_carts.key(token))), 24)
+
+        self.client.delete(self.url, headers={"X-Cart-Token": token})
+        self.assertEqual(self.client.get(self.url, headers={"X-Cart-Token": token}).data["items"], [])
+
+    def test_forged_tokens_are_rejected(self):
+        token = self.add([{"product": self.products[0].pk}]).data["token"]
+        forged = token.rsplit(":", 1)[0] + ":forged"
+        self.assertEqual(self.client.get(self.url, headers={"X-Cart-Token": forged}).status_code, 400)
+        self.assertEqual(self.add([{"product": self.products[0].pk}], forged).status_code, 400)
+
+    def test_carts_expire(self):
+        token = self.add([{"product": self.products[0].pk}]).data["token"]
+        later = time.time() + guest_carts.backend.default_timeout + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(guest_carts.load(token), {})
+
+    @override_settings(GUEST_CART_MAX_LINES=2)
+    def test_cart_size_is_bounded(self):
+        response = self.add([{"product": product.pk} for product in self.products[:3]])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_merges_the_guest_cart(self):
+        Cart.objects.create(customer=self.customer, product=self.products[0], quantity=1)
+        token = self.add([{"product": p.pk, "quantity": 2} for p in self.products[:3]]).data["token"]
+        self.products[2].delete()
+
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": "cust@example.com", "password": "pass", "cart_token": token},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["cart_items_merged"], 2)
+        cart = dict(Cart.objects.filter(customer=self.customer).values_list("product_id", "quantity"))
+        self.assertEqual(cart, {self.products[0].pk: 3, self.products[1].pk: 2})
+        self.assertEqual(guest_carts.load(token), {})
+
+    def test_concurrent_logins_merge_once(self):
+        token = self.add([{"product": self.products[0].pk, "quantity": 2}]).data["token"]
+        apply = guest_carts_module.apply_cart_operations
+        merged = []
+
+        def login_meanwhile(user, operations):
+            if not merged:
+                merged.append(guest_carts.merge(token, user))
+            apply(user, operations)
+
+        with mock.patch.object(guest_carts_module, "apply_cart_operations", login_meanwhile):
+            self.assertEqual(guest_carts.merge(token, self.customer), 1)
+        self.assertEqual(merged, [0])
+        cart = dict(Cart.objects.filter(customer=self.customer).values_list("product_id", "quantity"))
+        self.assertEqual(cart, {self.products[0].pk: 2})
+
+    def test_merged_quantities_are_capped(self):
+        Cart.objects.create(customer=self.customer, product=self.products[0], quantity=MAX_CART_QUANTITY)
+        token = self.add([{"product": self.products[0].pk, "quantity": MAX_CART_QUANTITY}]).data["token"]
+        self.assertEqual(guest_carts.merge(token, self.customer), 1)
+        self.assertEqual(Cart.objects.get(customer=self.customer).quantity, MAX_CART_QUANTITY)
+
+    def test_failed_merges_keep_the_guest_cart(self):
+        token = self.add([{"product": self.products[0].pk}]).data["token"]
+        with mock.patch.object(guest_carts_module, "apply_cart_operations", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                guest_carts.merge(token, self.customer)
+        self.assertEqual(guest_carts.load(token), {self.products[0].pk: 1})
+
+    def test_merge_ignores_bad_tokens(self):
+        self.assertEqual(GuestCartStore().merge("not-a-token", self.customer), 0)
+        self.assertEqual(GuestCartStore().merge(guest_carts.new_token(), self.customer), 0)
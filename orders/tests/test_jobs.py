@@ -0,0 +1,192 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from orders.jobs import Worker, enqueue, handler, queue_depth
+from orders.models import Cart, Job, Order
+from orders.services import checkout_cart
+from orders.tasks import ORDER_CONFIRMATION, SELLER_NOTIFICATION
+from products.models import Category, Product
+from users.models import User
+
+calls = []
+
+
+@handler("tests.flaky")
+def flaky(fail_times=0, key="job"):
+    calls.append(key)
+    if calls.count(key) <= fail_times:
+        raise RuntimeError("boom")
+
+
+@handler("tests.lease")
+def record_lease(key):
+    calls.append(Job.objects.get(payload__key=key).locked_until)
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def make_due(self):
+        Job.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+
+    def test_jobs_run_once_and_are_deleted(self):
+        enqueue([("tests.flaky", {"key": str(i)}) for i in range(5)])
+        worker = Worker(batch_size=2)
+        self.assertEqual(worker.run_once(), 2)
+        Worker(batch_size=10).run(drain=True)
+        self.assertEqual(sorted(calls), ["0", "1", "2", "3", "4"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failures_back_off_then_fail_for_good(self):
+        enqueue([("tests.flaky", {"fail_times": 5})])
+        worker = Worker(max_attempts=3, backoff=10, max_backoff=15)
+
+        before = timezone.now()
+        worker.run_once()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertTrue(before + timedelta(seconds=5) <= job.run_after <= timezone.now() + timedelta(seconds=10))
+        self.assertEqual(worker.run_once(), 0)  # not due yet
+
+        self.make_due()
+        worker.run_once()
+        # Doubled, but capped
+        self.assertLessEqual(Job.objects.get().run_after, timezone.now() + timedelta(seconds=15))
+        self.make_due()
+        worker.run_once()
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        self.assertEqual((worker.stats.retried, worker.stats.failed), (2, 1))
+        self.make_due()
+        self.assertEqual(worker.run_once(), 0)
+
+    def test_retried_jobs_can_succeed(self):
+        enqueue([("tests.flaky", {"fail_times": 1})])
+        worker = Worker()
+        worker.run_once()
+        self.make_due()
+        worker.run_once()
+        self.assertEqual((worker.stats.retried, worker.stats.succeeded), (1, 1))
+        self.assertFalse(Job.objects.exists())
+
+    def test_workers_do_not_share_jobs(self):
+        enqueue([("tests.flaky", {"key": str(i)}) for i in range(4)])
+        first, second = Worker(batch_size=3), Worker(batch_size=3)
+        self.assertEqual(len(first.claim()), 3)
+        self.assertEqual([job.payload["key"] for job in second.claim()], ["3"])
+        self.assertEqual(second.claim(), [])
+
+    def test_jobs_of_dead_workers_are_reclaimed(self):
+        enqueue([("tests.flaky", {})])
+        Worker(lease=60).claim()
+        self.assertEqual(Worker().claim(), [])
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        job, = Worker().claim()
+        self.assertEqual(job.attempts, 2)
+
+    def test_leases_are_renewed_per_job(self):
+        enqueue([("tests.lease", {"key": str(i)}) for i in range(2)])
+        worker = Worker(batch_size=2, lease=60)
+        jobs = worker.claim()
+        # As if the batch had run past the lease it was claimed with
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        before = timezone.now()
+        self.assertTrue(all(worker.execute(job) for job in jobs))
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(lease > before + timedelta(seconds=30) for lease in calls))
+
+    def test_jobs_taken_over_are_not_run(self):
+        enqueue([("tests.flaky", {})])
+        first = Worker(lease=60)
+        job, = first.claim()
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        Worker().claim()
+        self.assertFalse(first.execute(job))
+        self.assertEqual(calls, [])
+
+    def test_database_errors_do_not_end_the_worker(self):
+        enqueue([("tests.flaky", {})])
+        worker = Worker()
+        run_once = worker.run_once
+        outcomes = [OperationalError("database is locked")]
+
+        def batch():
+            if outcomes:
+                raise outcomes.pop()
+            return run_once()
+
+        with mock.patch.object(worker, "run_once", side_effect=batch) as batches:
+            with self.assertLogs("orders.jobs", "ERROR"):
+                worker.run(poll_interval=0, drain=True)
+        self.assertEqual(batches.call_count, 3)
+        self.assertEqual(calls, ["job"])
+
+    def test_unknown_jobs(self):
+        with self.assertRaises(LookupError):
+            enqueue([("tests.missing", {})])
+        Job.objects.create(name="tests.missing")
+        Worker(max_attempts=1).run_once()
+        self.assertIn("LookupError", Job.objects.get(status=Job.FAILED).last_error)
+
+    def test_command_reports_throughput(self):
+        enqueue([("tests.flaky", {"key": str(i)}) for i in range(3)] + [("tests.flaky", {"fail_times": 1})])
+        Job.objects.create(name="tests.flaky", status=Job.FAILED)
+        out = io.StringIO()
+        call_command("run_workers", "--processes=1", "--drain", "--metrics-interval=0", stdout=out)
+        output = out.getvalue()
+        self.assertIn("3 succeeded, 1 retried, 0 failed; 1 pending, 0 running, 1 failed in the outbox", output)
+        self.assertIn("Ran 4 jobs", output)
+        self.assertEqual(queue_depth(), {Job.PENDING: 1, Job.RUNNING: 0, Job.FAILED: 1})
+
+
+class OrderJobTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        self.product = Product.objects.create(
+            category=category, seller=self.seller, name="Phone", slug="phone", price=10, stock=5,
+        )
+
+    def test_checkout_queues_and_workers_send_the_emails(self):
+        Cart.objects.create(customer=self.customer, product=self.product, quantity=2)
+        order = checkout_cart(self.customer).order
+        jobs = Job.objects.order_by("name")
+        self.assertEqual([(job.name, job.payload) for job in jobs], [
+            (ORDER_CONFIRMATION, {"order_id": order.pk}), (SELLER_NOTIFICATION, {"order_id": order.pk}),
+        ])
+        self.assertEqual(mail.outbox, [])
+
+        Worker().run(drain=True)
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ["cust@example.com", "seller@example.com"])
+        self.assertIn("2 x Phone", mail.outbox[0].body)
+        self.assertFalse(Job.objects.exists())
+
+    def test_created_orders_queue_jobs(self):
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post(
+            reverse("order-list-create"), {"items": [{"product": self.product.pk, "quantity": 1}]}, format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_failed_orders_queue_nothing(self):
+        Cart.objects.create(customer=self.customer, product=self.product, quantity=2)
+        with mock.patch("orders.services.Cart.objects.filter", side_effect=[
+            Cart.objects.filter(customer=self.customer), RuntimeError("cart delete failed"),
+        ]):
+            with self.assertRaises(RuntimeError):
+                checkout_cart(self.customer)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,112 @@
+import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers, serializers
+from rest_framework.test import APITestCase
+
+from common.compiled import CompiledSerializer
+from common.renderers import JSONRenderer
+from orders.models import Cart, Order, OrderItem, Wishlist
+from orders.serializers import CartSerializer, OrderSerializer, WishListSerializer
+from products.models import Category, Product
+from products.serializers import ProductSerializer
+from users.models import User
+
+
+class CompiledSerializerTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        cls.other_seller = User.objects.create_user(email="other@example.com", password="pass", is_seller=True)
+        cls.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Téléphones  ", slug="phones")
+        cls.products = Product.objects.bulk_create([
+            Product(
+                category=category, seller=cls.seller if i % 2 else cls.other_seller, name=f"Product {i} ✓",
+                slug=f"product-{i}", description='Quote " and \\ and\nnewline', price=Decimal("9.5") * i,
+            )
+            for i in range(6)
+        ])
+        orders = Order.objects.bulk_create([Order(customer=cls.customer, status="shipped") for _ in range(3)])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=i + 1, price=None if i == 2 else product.price)
+            for order in orders for i, product in enumerate(cls.products[:3])
+        ])
+        Order.objects.create(customer=cls.customer)  # no items
+        Cart.objects.bulk_create([Cart(customer=cls.customer, product=p, quantity=2) for p in cls.products[:4]])
+        Wishlist.objects.bulk_create([Wishlist(customer=cls.customer, product=p) for p in cls.products[2:]])
+
+    def assertCompiledMatches(self, serializer_class, queryset):
+        expected = serializer_class(queryset, many=True).data
+        compiled = CompiledSerializer(serializer_class)
+        data = compiled.to_representation(compiled.values(queryset), queryset)
+        self.assertEqual(data, expected)
+        self.assertEqual(JSONRenderer().render(data), renderers.JSONRenderer().render(expected))
+
+    def test_serializers_match(self):
+        self.assertCompiledMatches(ProductSerializer, Product.objects.for_api())
+        self.assertCompiledMatches(OrderSerializer, Order.objects.for_customer(self.customer))
+        self.assertCompiledMatches(OrderSerializer, Order.objects.for_seller(self.seller))
+        self.assertCompiledMatches(CartSerializer, Cart.objects.filter(customer=self.customer))
+        self.assertCompiledMatches(WishListSerializer, Wishlist.objects.filter(customer=self.customer))
+        self.assertCompiledMatches(OrderSerializer, Order.objects.none())
+
+    def test_list_endpoints_render_the_same_bytes(self):
+        self.client.force_authenticate(user=self.customer)
+        for url, params in [
+            (reverse("product-list-create"), {"page_size": 4, "ordering": "-price"}),
+            (reverse("order-list-create"), {"page_size": 2}),
+            (reverse("cart-list-create"), {}),
+            (reverse("wishlist-list-create"), {}),
+        ]:
+            response = self.client.get(url, params, HTTP_ACCEPT="application/json")
+            self.assertEqual(response.status_code, 200)
+            expected = renderers.JSONRenderer().render(response.data)
+            self.assertEqual(response.content, expected)
+            # Cursors built from compiled rows page through the same results
+            if response.data.get("next"):
+                following = self.client.get(response.data["next"], HTTP_ACCEPT="application/json")
+                self.assertEqual(following.status_code, 200)
+                self.assertTrue(following.data["results"])
+
+    def test_uncompilable_serializers_are_refused(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Product
+                fields = ["id", "label"]
+
+        class StringSerializer(serializers.ModelSerializer):
+            category = serializers.StringRelatedField()
+
+            class Meta:
+                model = Product
+                fields = ["id", "category"]
+
+        for serializer_class in (MethodSerializer, StringSerializer):
+            with self.assertRaises(ImproperlyConfigured):
+                CompiledSerializer(serializer_class)
+
+
+class JSONRendererTests(TestCase):
+    def test_output_matches_drf(self):
+        data = {
+            "text": "separators \u2028\u2029, \"quoted\", control \x01, é",
+            "when": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2024, 5, 1),
+            "amount": Decimal("12.50"),
+            "lazy": gettext_lazy("Not found."),
+            "nested": [1, None, True, {"a": []}],
+        }
+        self.assertEqual(JSONRenderer().render(data), renderers.JSONRenderer().render(data))
+
+    def test_falls_back_for_what_orjson_refuses(self):
+        for data in ({1: "int key"}, {"big": 2**70}):
+            self.assertEqual(JSONRenderer().render(data), renderers.JSONRenderer().render(data))
+        indented = JSONRenderer().render({"a": 1}, "application/json; indent=2")
+        self.assertEqual(indented, b'{\n  "a": 1\n}')
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+from users.models import User
+
+
+class SellerOrderExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        other_seller = User.objects.create_user(email="other@example.com", password="pass", is_seller=True)
+        cls.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        cls.phone = Product.objects.create(
+            category=category, seller=cls.seller, name="Phone", slug="phone", price=100, stock=10
+        )
+        case = Product.objects.create(
+            category=category, seller=other_seller, name="Case", slug="case", price=10, stock=10
+        )
+        cls.old = Order.objects.create(customer=cls.customer, status="delivered")
+        Order.objects.filter(pk=cls.old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        cls.new = Order.objects.create(customer=cls.customer)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=cls.old, product=cls.phone, quantity=1, price="90.00"),
+            OrderItem(order=cls.new, product=cls.phone, quantity=2, price="100.00"),
+            OrderItem(order=cls.new, product=case, quantity=1, price="10.00"),
+        ])
+        cls.url = reverse("order-export")
+
+    def export(self, **params):
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_contains_only_the_sellers_lines_oldest_first(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual([int(row["order_id"]) for row in rows], [self.old.pk, self.new.pk])
+        self.assertEqual({row["product_slug"] for row in rows}, {"phone"})
+        self.assertEqual(rows[1]["unit_price"], "100.00")
+        self.assertEqual(rows[1]["customer_email"], "cust@example.com")
+
+    def test_ndjson(self):
+        lines = [json.loads(line) for line in self.export(output="ndjson").splitlines()]
+        self.assertEqual([line["quantity"] for line in lines], [1, 2])
+        self.assertEqual(lines[0]["order_status"], "delivered")
+
+    def test_date_and_status_filters(self):
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        lines = self.export(output="ndjson", created_after=since).splitlines()
+        self.assertEqual([json.loads(line)["order_id"] for line in lines], [self.new.pk])
+
+        lines = self.export(output="ndjson", status=["delivered", "cancelled"]).splitlines()
+        self.assertEqual([json.loads(line)["order_id"] for line in lines], [self.old.pk])
+
+    def test_export_is_a_single_query(self):
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            b"".join(response.streaming_content)
+
+    def test_invalid_filter(self):
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(self.url, {"status": "lost"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_customers_cannot_export(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,66 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.testing import QueryScalingMixin
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+from users.models import User
+
+
+class OrderFeedTests(QueryScalingMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        cls.other_seller = User.objects.create_user(email="other@example.com", password="pass", is_seller=True)
+        cls.customer = User.objects.create_user(email="cust@example.com", password="pass", is_customer=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        cls.product = Product.objects.create(
+            category=category, seller=cls.seller, name="Phone", slug="phone", price=100, stock=10
+        )
+        cls.other_product = Product.objects.create(
+            category=category, seller=cls.other_seller, name="Case", slug="case", price=10, stock=10
+        )
+        orders = Order.objects.bulk_create([Order(customer=cls.customer) for _ in range(max(cls.page_sizes))])
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=order, product=cls.product, quantity=1) for order in orders]
+            + [OrderItem(order=order, product=cls.other_product, quantity=2) for order in orders]
+        )
+        cls.order = orders[0]
+        cls.url = reverse("order-list-create")
+
+    def test_customer_feed_query_count(self):
+        self.client.force_authenticate(user=self.customer)
+        self.assertQueriesConstant(self.url)
+
+    def test_seller_feed_query_count(self):
+        self.client.force_authenticate(user=self.seller)
+        self.assertQueriesConstant(self.url)
+
+    def test_seller_sees_only_their_items(self):
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.get(reverse("order-detail", args=[self.order.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["product"] for item in response.data["items"]], [self.product.pk])
+
+    def test_seller_without_sales_sees_nothing(self):
+        lonely = User.objects.create_user(email="lonely@example.com", password="pass", is_seller=True)
+        self.client.force_authenticate(user=lonely)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["results"], [])
+
+    def test_create_order_reserves_stock(self):
+        self.client.force_authenticate(user=self.customer)
+        data = {"items": [{"product": self.product.pk, "quantity": 3}]}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["items"][0]["price"], "100.00")
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 7)
+
+    def test_create_order_rejects_short_stock(self):
+        self.client.force_authenticate(user=self.customer)
+        data = {"items": [{"product": self.product.pk, "quantity": 11}]}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), max(self.page_sizes))
@@ -0,0 +1,35 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from orders.models import Cart, Order, OrderItem, Wishlist
+from products.models import Category, Product
+from products.search import rebuild_index
+from users.models import User
+
+
+class HotpathPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        customer = User.objects.create_user(email="cust@example.com", password="pass")
+        categories = [Category.objects.create(name=f"Category {i}", slug=f"category-{i}") for i in range(3)]
+        products = Product.objects.bulk_create([
+            Product(category=categories[i % 3], seller=seller, name=f"Desk {i}", slug=f"desk-{i}", price=i)
+            for i in range(30)
+        ])
+        rebuild_index()
+        orders = Order.objects.bulk_create([Order(customer=customer) for _ in range(10)])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=products[i], quantity=1, price=products[i].price)
+            for i, order in enumerate(orders)
+        ])
+        Cart.objects.create(customer=customer, product=products[0])
+        Wishlist.objects.create(customer=customer, product=products[0])
+
+    def test_hot_queries_use_indexes(self):
+        out = io.StringIO()
+        call_command("explain_hotpaths", check=True, stdout=out)
+        self.assertIn("USING INDEX product_category_created_idx", out.getvalue())
+        self.assertIn("USING INDEX order_customer_created_idx", out.getvalue())
@@ -0,0 +1,129 @@
+import io
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from common.utils import read_rows
+from orders.models import Cart, Watermark, Wishlist, WishlistNotification
+from orders.notifications import WishlistNotifier
+from orders.services import checkout_cart
+from products.importer import ProductImporter
+from products.models import Category, Product, ProductChange
+from users.models import User
+
+
+class WishlistNotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        category = Category.objects.create(name="Phones", slug="phones")
+        cls.phone = Product.objects.create(
+            seller=cls.seller, category=category, name="Phone", slug="phone", price=100, stock=0,
+        )
+        cls.other = Product.objects.create(
+            seller=cls.seller, category=category, name="Other", slug="other", price=10, stock=3,
+        )
+        cls.customers = User.objects.bulk_create([User(email=f"cust{i}@example.com") for i in range(7)])
+        Wishlist.objects.bulk_create([Wishlist(customer=c, product=cls.phone) for c in cls.customers])
+        Wishlist.objects.create(customer=cls.customers[0], product=cls.other)
+
+    def notify(self):
+        return WishlistNotifier(chunk_size=3, settle=0).run()
+
+    def test_saves_log_price_and_stock_changes(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.name = "Renamed"
+        phone.save()
+        self.assertFalse(ProductChange.objects.exists())
+
+        phone.stock = 4
+        phone.save()
+        phone.price = Decimal("90")
+        phone.save()
+        changes = list(
+            ProductChange.objects.order_by("pk").values_list("old_stock", "new_stock", "old_price", "new_price")
+        )
+        self.assertEqual(changes, [(0, 4, None, None), (None, None, Decimal("100"), Decimal("90"))])
+
+    def test_imports_log_changes(self):
+        stream = io.BytesIO(b'{"name": "Phone", "slug": "phone", "price": "80", "stock": 0, "category": "phones"}')
+        ProductImporter(self.seller).run(read_rows(stream, "jsonl"))
+        change = ProductChange.objects.get()
+        self.assertEqual((change.product_id, change.old_price, change.new_price), (self.phone.pk, 100, 80))
+        self.assertIsNone(change.old_stock)
+
+    def test_restock_and_price_drop_notify_every_wishlister(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock = 5
+        phone.price = Decimal("80")
+        phone.save()
+        other = Product.objects.get(pk=self.other.pk)
+        other.price = Decimal("12")
+        other.save()
+
+        result = self.notify()
+
+        self.assertEqual((result.changes, result.notifications), (2, 14))
+        for kind in (WishlistNotification.BACK_IN_STOCK, WishlistNotification.PRICE_DROP):
+            customers = set(WishlistNotification.objects.filter(kind=kind).values_list("customer_id", flat=True))
+            self.assertEqual(customers, {c.pk for c in self.customers})
+        self.assertFalse(WishlistNotification.objects.filter(product=self.other).exists())
+        self.assertEqual(Watermark.objects.get(name=WishlistNotifier.watermark_name).position, result.watermark)
+
+    def test_runs_resume_from_the_watermark(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock = 5
+        phone.save()
+        self.assertEqual(self.notify().notifications, 7)
+        self.assertEqual(self.notify().changes, 0)
+
+        # Redoing a change, as after a crash before the watermark moved, adds nothing
+        Watermark.objects.update(position=0)
+        self.assertEqual(self.notify().notifications, 0)
+        self.assertEqual(WishlistNotification.objects.count(), 7)
+
+    def test_changes_undone_within_a_batch_notify_nothing(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock = 5
+        phone.save()
+        phone.stock = 0
+        phone.price = Decimal("120")
+        phone.save()
+        phone.price = Decimal("100")
+        phone.save()
+        self.assertEqual(self.notify().notifications, 0)
+
+    def test_restock_after_checkout_sells_out(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock = 5
+        phone.save()
+        self.notify()
+        phone.stock = 3
+        phone.save()
+        Cart.objects.create(customer=self.customers[0], product=phone, quantity=3)
+        checkout_cart(self.customers[0])
+        phone.refresh_from_db()
+        phone.stock = 10
+        phone.save()
+
+        self.assertEqual(
+            list(ProductChange.objects.order_by("pk").values_list("old_stock", "new_stock"))[1:],
+            [(5, 3), (3, 0), (0, 10)],
+        )
+        self.assertEqual(self.notify().notifications, 7)
+
+    def test_unsettled_changes_wait(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock = 5
+        phone.save()
+        result = WishlistNotifier(settle=60).run()
+        self.assertEqual((result.changes, result.watermark), (0, 0))
+
+    def test_command(self):
+        phone = Product.objects.get(pk=self.phone.pk)
+        phone.stock = 1
+        phone.save()
+        out = io.StringIO()
+        call_command("notify_wishlists", "--settle-seconds=0", "--chunk-size=2", stdout=out)
+        self.assertIn("into 7 notifications", out.getvalue())
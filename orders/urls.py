@@ -7,16 +7,24 @@ from .views import (
     WishlistDetailView,
     WishlistListCreateView,
     CartCheckoutView,
+    CartBulkView,
+    CartSummaryView,
+    GuestCartView,
+    SellerOrderExportView,
 )
 
 urlpatterns = [
     #orders
     path("", OrderListCreateView.as_view(), name="order-list-create"),
     path("<int:pk>/", OrderDetailView.as_view(), name="order-detail"),
+    path("export/", SellerOrderExportView.as_view(), name="order-export"),
     # cart
     path("cart/", CartListCreateView.as_view(), name="cart-list-create"),
     path("cart/<int:pk>/", CartDetailView.as_view(), name="cart-detail"),
     path("cart/checkout/", CartCheckoutView.as_view(), name="cart-checkout"),
+    path("cart/bulk/", CartBulkView.as_view(), name="cart-bulk"),
+    path("cart/summary/", CartSummaryView.as_view(), name="cart-summary"),
+    path("guest-cart/", GuestCartView.as_view(), name="guest-cart"),
     #Wishlist
     path("wishlist/", WishlistListCreateView.as_view(), name="wishlist-list-create"),
     path("wishlist/<int:pk>/", WishlistDetailView.as_view(), name="wishlist-detail"),
@@ -1,9 +1,21 @@
 from rest_framework import generics, permissions, status
-from .models import Order, Cart, Wishlist, OrderItem
-from .serializers import OrderSerializer, CartSerializer, WishListSerializer
+from .models import Order, Cart, Wishlist
+from .serializers import (
+    OrderSerializer, CartSerializer, CartOperationSerializer, CartSummarySerializer, CartSummaryQuerySerializer,
+    WishListSerializer, OrderExportQuerySerializer,
+)
+from .guest_cart import GuestCartFull, InvalidCartToken, guest_carts
+from .services import CART_INCREMENT, apply_cart_operations, cart_summary, checkout_cart, EmptyCartError
+from .export import seller_order_lines, stream_csv, stream_ndjson
+from common.compiled import CompiledReadMixin
+from common.pagination import KeysetPagination
+from common.permissions import IsSeller
+from products.stock import InsufficientStockError
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -31,9 +43,11 @@ from drf_yasg import openapi
         },
     ),
 )
-class OrderListCreateView(generics.ListCreateAPIView):
+class OrderListCreateView(CompiledReadMixin, generics.ListCreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    read_from_replica = True
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -42,9 +56,9 @@ class OrderListCreateView(generics.ListCreateAPIView):
             return Order.objects.none()
 
         if getattr(user, "is_seller", False):
-            return Order.objects.filter(items__product__seller=user).distinct()
+            return Order.objects.for_seller(user)
         else:
-            return Order.objects.filter(customer=user)
+            return Order.objects.for_customer(user)
 
     def perform_create(self, serializer):
         serializer.save(customer=self.request.user)
@@ -97,6 +111,7 @@ class OrderListCreateView(generics.ListCreateAPIView):
 class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    read_from_replica = True
 
     def get_queryset(self):
         user = self.request.user
@@ -104,9 +119,9 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
             return Order.objects.none()
 
         if getattr(user, "is_seller", False):
-            return Order.objects.filter(items_product_seller=user).distinct()
+            return Order.objects.for_seller(user)
         else:
-            return Order.objects.filter(customer=user)
+            return Order.objects.for_customer(user)
 
 
 @method_decorator(
@@ -122,7 +137,7 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
 @method_decorator(
     name="post",
     decorator=swagger_auto_schema(
-        operation_description="Add a new item to cart",
+        operation_description="Add a new item to cart, or add to its quantity if it is already there",
         request_body=OrderSerializer,
         responses={
             201: openapi.Response("Item added successfully"),
@@ -131,13 +146,14 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         },
     ),
 )
-class CartListCreateView(generics.ListCreateAPIView):
+class CartListCreateView(CompiledReadMixin, generics.ListCreateAPIView):
     """
     get:
     Return a list of all cart items for the authenticated customer.
 
     post:
-    Add a new item to the authenticated customer's cart.
+    Add a new item to the authenticated customer's cart, or add to the
+    quantity of one already in it.
     """
     serializer_class = CartSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -149,7 +165,140 @@ class CartListCreateView(generics.ListCreateAPIView):
         return Cart.objects.filter(customer=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(customer=self.request.user)
+        # Adding a product that is already in the cart adds to its quantity
+        product, quantity = serializer.validated_data["product"], serializer.validated_data.get("quantity", 1)
+        apply_cart_operations(self.request.user, [(product.pk, CART_INCREMENT, quantity)])
+        serializer.instance = Cart.objects.get(customer=self.request.user, product=product)
+
+
+class CartBulkView(APIView):
+    """
+    Apply a list of cart operations at once, e.g. a guest cart replayed at
+    login, and return the resulting cart.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_operations = 500
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Set, increment or remove many cart items in one transaction. Operations apply in "
+            "order; the response is the whole cart afterwards."
+        ),
+        request_body=CartOperationSerializer(many=True),
+        responses={
+            200: CartSerializer(many=True),
+            400: openapi.Response("Bad request — validation error or unknown products"),
+            401: openapi.Response("Unauthorized"),
+        },
+    )
+    def post(self, request):
+        operations = CartOperationSerializer(data=request.data, many=True, max_length=self.max_operations)
+        operations.is_valid(raise_exception=True)
+        apply_cart_operations(
+            request.user, [(item["product"], item["op"], item["quantity"]) for item in operations.validated_data]
+        )
+        cart = Cart.objects.filter(customer=request.user).order_by("id")
+        return Response(CartSerializer(cart, many=True).data)
+
+
+class GuestCartView(APIView):
+    """
+    The cart of a visitor who hasn't logged in, identified by the signed
+    token in the ``X-Cart-Token`` header. The first POST without a token
+    starts a cart and returns its token. Logging in with ``cart_token``
+    moves the cart into the customer's.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    token_header = "X-Cart-Token"
+    token_parameter = openapi.Parameter(
+        "X-Cart-Token", openapi.IN_HEADER, type=openapi.TYPE_STRING, description="Guest cart token"
+    )
+
+    def cart_response(self, token, lines, status_code=status.HTTP_200_OK):
+        data = {
+            "token": token,
+            "items": [{"product": product_id, "quantity": quantity} for product_id, quantity in lines.items()],
+        }
+        return Response(data, status=status_code, headers={self.token_header: token})
+
+    def handle_exception(self, exc):
+        if isinstance(exc, InvalidCartToken):
+            return Response({"error": "Invalid cart token"}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(exc, GuestCartFull):
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
+
+    @swagger_auto_schema(
+        operation_description="Retrieve the guest cart; an expired cart is empty",
+        manual_parameters=[token_parameter],
+        responses={200: openapi.Response("Cart token and items"), 400: openapi.Response("Missing or invalid token")},
+    )
+    def get(self, request):
+        token = request.headers.get(self.token_header)
+        if not token:
+            raise InvalidCartToken(token)
+        return self.cart_response(token, guest_carts.load(token))
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Set, increment or remove guest cart items, as for the bulk cart endpoint. Without a "
+            "token, starts a new cart."
+        ),
+        manual_parameters=[token_parameter],
+        request_body=CartOperationSerializer(many=True),
+        responses={
+            200: openapi.Response("Cart token and items"),
+            201: openapi.Response("New cart's token and items"),
+            400: openapi.Response("Bad request — invalid token, unknown products or cart full"),
+        },
+    )
+    def post(self, request):
+        operations = CartOperationSerializer(data=request.data, many=True, max_length=CartBulkView.max_operations)
+        operations.is_valid(raise_exception=True)
+        token = request.headers.get(self.token_header)
+        status_code = status.HTTP_200_OK
+        if not token:
+            token, status_code = guest_carts.new_token(), status.HTTP_201_CREATED
+        lines = guest_carts.apply(
+            token, [(item["product"], item["op"], item["quantity"]) for item in operations.validated_data]
+        )
+        return self.cart_response(token, lines, status_code)
+
+    @swagger_auto_schema(
+        operation_description="Empty the guest cart",
+        manual_parameters=[token_parameter],
+        responses={204: openapi.Response("Cart emptied"), 400: openapi.Response("Missing or invalid token")},
+    )
+    def delete(self, request):
+        guest_carts.delete(request.headers.get(self.token_header) or "")
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CartSummaryView(APIView):
+    """
+    Totals of the customer's cart at current prices, with stock checks, so
+    clients don't fetch every product to add the cart up themselves.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Line count, item count, grand total and lines short of stock, computed in one query. "
+            "?expand=lines adds each line's price, total and stock flag from the same query."
+        ),
+        query_serializer=CartSummaryQuerySerializer,
+        responses={
+            200: CartSummarySerializer,
+            400: openapi.Response("Bad request — invalid expand value"),
+            401: openapi.Response("Unauthorized"),
+        },
+    )
+    def get(self, request):
+        query = CartSummaryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        summary = cart_summary(request.user, lines="lines" in query.validated_data.get("expand", ()))
+        return Response(CartSummarySerializer(summary).data)
 
 
 @method_decorator(
@@ -229,7 +378,7 @@ class CartDetailView(generics.RetrieveUpdateDestroyAPIView):
         },
     ),
 )
-class WishlistListCreateView(generics.ListCreateAPIView):
+class WishlistListCreateView(CompiledReadMixin, generics.ListCreateAPIView):
     serializer_class = WishListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -304,27 +453,68 @@ class CartCheckoutView(APIView):
 
     @swagger_auto_schema(
         operation_description="Checkout a cart",
+        responses={
+            201: openapi.Response("Checkout successful"),
+            400: openapi.Response("Cart is empty"),
+            401: openapi.Response("Unauthorized"),
+            409: openapi.Response("Insufficient stock for one or more products"),
+        },
     )
     def post(self, request):
-        user = request.user
-        cart_items = Cart.objects.filter(customer=user)
+        try:
+            result = checkout_cart(request.user)
+        except EmptyCartError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStockError as exc:
+            return Response(
+                {"error": str(exc), "products": exc.product_ids},
+                status=status.HTTP_409_CONFLICT,
+            )
 
-        if not cart_items.exists():
-            return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": "Checkout successful", "order_id": result.order.id}, status=status.HTTP_201_CREATED)
 
-        order = Order.objects.create(customer=user)
 
-        # Move cart items to order items
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                price=cart_item.product.price,
-            )
+class SellerOrderExportView(APIView):
+    """
+    Stream every order line of the seller's products as CSV or NDJSON.
 
-        # Clear cart
-        cart_items.delete()
+    Rows are read with a server-side cursor and written out in chunks, so
+    memory use stays flat however many lines the seller has.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsSeller]
+    chunk_size = 2000
+    formats = {
+        "csv": (stream_csv, "text/csv"),
+        "ndjson": (stream_ndjson, "application/x-ndjson"),
+    }
 
-        return Response({"message": "Checkout successful", "order_id": order.id}, status=status.HTTP_201_CREATED)
+    def perform_content_negotiation(self, request, force=False):
+        # Clients asking for text/csv must not get a 406; errors still render as JSON
+        return super().perform_content_negotiation(request, force=True)
 
+    @swagger_auto_schema(
+        operation_description="Export the seller's order lines",
+        query_serializer=OrderExportQuerySerializer,
+        responses={
+            200: openapi.Response("Streamed CSV or NDJSON, one row per order line"),
+            400: openapi.Response("Bad request — invalid filter"),
+            401: openapi.Response("Unauthorized"),
+            403: openapi.Response("Only sellers can export orders"),
+        },
+    )
+    def get(self, request):
+        query = OrderExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        rows = seller_order_lines(
+            request.user,
+            created_after=params.get("created_after"),
+            created_before=params.get("created_before"),
+            statuses=params.get("status"),
+        ).iterator(chunk_size=self.chunk_size)
+        writer, content_type = self.formats[params["output"]]
+        response = StreamingHttpResponse(writer(rows, self.chunk_size), content_type=content_type)
+        filename = f"orders-{timezone.now():%Y%m%d%H%M%S}.{params['output']}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,186 @@
+import hashlib
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from rest_framework.response import Response
+
+from common.routers import current_routing
+
+
+class CatalogCache:
+    """
+    Versioned read-through cache for catalog responses.
+
+    Entries are keyed by the normalized request (path, sorted query
+    parameters, host) plus the current values of the version counters the
+    response depends on, so invalidation is just bumping a counter; stale
+    entries are never read again and age out of the backend by LRU or TTL.
+
+    Counters:
+
+    - ``global``: everything, bumped when a category changes since category
+      names are embedded in every product.
+    - ``products``: any product list, bumped on every product change.
+    - ``category:<id>``: lists filtered to one category.
+    - ``product:<id>``: one product's detail.
+
+    Hit and miss counters are per process.
+    """
+
+    key_prefix = "catalog"
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, "CATALOG_CACHE_ALIAS", "default")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def version_key(self, name):
+        return f"{self.key_prefix}:version:{name}"
+
+    def versions(self, names):
+        keys = {self.version_key(name): name for name in names}
+        found = self.backend.get_many(list(keys))
+        missing = {key: self._initial_version() for key in keys if key not in found}
+        if missing:
+            self.backend.set_many(missing, timeout=None)
+            found.update(missing)
+        return [found[key] for key in keys]
+
+    async def aversions(self, names):
+        keys = {self.version_key(name): name for name in names}
+        found = await self.backend.aget_many(list(keys))
+        missing = {key: self._initial_version() for key in keys if key not in found}
+        if missing:
+            await self.backend.aset_many(missing, timeout=None)
+            found.update(missing)
+        return [found[key] for key in keys]
+
+    def bump(self, *names):
+        """Move the named counters to a new version, in one backend round trip."""
+        if names:
+            version = self._initial_version()
+            self.backend.set_many({self.version_key(name): version for name in names}, timeout=None)
+
+    @staticmethod
+    def _initial_version():
+        # Versions come from the clock rather than an increment so that a
+        # counter which was evicted never restarts at a value that older
+        # entries were stored under, and so many counters bump in one call.
+        return time.time_ns() // 1000
+
+    def request_key(self, request, dependencies, versions=None):
+        params = sorted(
+            (name, tuple(values)) for name, values in request.query_params.lists()
+        )
+        versions = versions or self.versions(dependencies)
+        raw = repr((request.get_host(), request.path, params, list(zip(dependencies, versions))))
+        return f"{self.key_prefix}:response:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def cached_response(self, request, dependencies, compute):
+        """Return the cached response data for ``request`` or compute, store and return it."""
+        versions = self.versions(dependencies)
+        key = self.request_key(request, dependencies, versions)
+        data = self.backend.get(key)
+        if data is not None:
+            self._count(hit=True)
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        self._count(hit=False)
+        response = compute()
+        if response.status_code == 200:
+            self.backend.set(key, response.data, self.store_timeout(versions))
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def acached_response(self, request, dependencies, compute):
+        """``cached_response`` for async views; ``compute`` is a coroutine function."""
+        versions = await self.aversions(dependencies)
+        key = self.request_key(request, dependencies, versions)
+        data = await self.backend.aget(key)
+        if data is not None:
+            self._count(hit=True)
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        self._count(hit=False)
+        response = await compute()
+        if response.status_code == 200:
+            await self.backend.aset(key, response.data, self.store_timeout(versions))
+        response["X-Cache"] = "MISS"
+        return response
+
+    def store_timeout(self, versions):
+        """
+        How long to keep a freshly computed response.
+
+        A response read from a replica within the replication lag of a bump
+        may predate the write it is keyed after, so it is only kept until
+        the replicas have caught up.
+        """
+        routing = current_routing()
+        lag = getattr(settings, "DATABASE_REPLICA_LAG", 0)
+        if routing is not None and routing.reads_from_replica and versions:
+            if max(versions) > self._initial_version() - lag * 1_000_000:
+                return lag
+        return DEFAULT_TIMEOUT
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": self.alias,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+
+catalog_cache = CatalogCache()
+
+
+class CatalogCacheMixin:
+    """
+    Serve safe list/retrieve requests through ``catalog_cache``.
+
+    Views declare what their responses depend on by overriding
+    ``get_cache_dependencies``. Async views are served through the cache
+    backend's async API.
+    """
+
+    def get_cache_dependencies(self, request):
+        return ["global"]
+
+    def list(self, request, *args, **kwargs):
+        return catalog_cache.cached_response(
+            request, self.get_cache_dependencies(request), partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return catalog_cache.cached_response(
+            request, self.get_cache_dependencies(request), partial(super().retrieve, request, *args, **kwargs)
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await catalog_cache.acached_response(
+            request, self.get_cache_dependencies(request), partial(super().alist, request, *args, **kwargs)
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await catalog_cache.acached_response(
+            request, self.get_cache_dependencies(request), partial(super().aretrieve, request, *args, **kwargs)
+        )
@@ -0,0 +1,37 @@
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .search import get_search_backend
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Relevance-ranked product search backed by the full-text index in
+    ``products.search`` instead of ``ILIKE '%term%'`` scans.
+
+    Matches are annotated with ``search_rank`` (lower is better) and ordered
+    by it, unless an ``OrderingFilter`` later in the chain applies its own
+    ordering. The backend ranks inside the queryset's own query, so matches
+    are never cut before the other filters (category, price...) apply.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    search_description = "Full-text search on name and description; words match as prefixes."
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "").strip()
+        if not text:
+            return queryset
+
+        return get_search_backend(queryset.db).filter(queryset, text).order_by("search_rank", "id")
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": self.search_description,
+                "schema": {"type": "string"},
+            },
+        ]
@@ -0,0 +1,265 @@
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.core.validators import validate_slug
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .cache import catalog_cache
+from .models import Category, Product, ProductChange
+from .search import get_search_backend
+
+CENT = Decimal("0.01")
+MAX_PRICE = Decimal("100000000")  # Product.price is max_digits=10, decimal_places=2
+MAX_STOCK = 2**31 - 1  # The largest PositiveIntegerField value on every database
+UPDATE_FIELDS = ["name", "description", "price", "stock", "category", "updated_at"]
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+class ProductImporter:
+    """
+    Upsert a seller's products by slug from a stream of rows.
+
+    Rows are validated and written in chunks: one category lookup, one
+    ownership lookup and one ``INSERT ... ON CONFLICT (slug) DO UPDATE`` per
+    chunk. Invalid rows are reported with their line number and skipped;
+    they never abort the rest of the import. Slugs owned by another seller
+    are rejected rather than taken over.
+
+    The upsert bypasses model signals, so the search index, catalog cache
+    and product change log are updated here once per chunk.
+    """
+
+    chunk_size = 1000
+    max_reported_errors = 1000
+
+    def __init__(self, seller, chunk_size=None):
+        self.seller = seller
+        self.chunk_size = chunk_size or self.chunk_size
+
+    def run(self, rows):
+        result = ImportResult()
+        start = time.perf_counter()
+        chunk = []
+        for line, row in rows:
+            result.rows += 1
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk, result)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def import_chunk(self, chunk, result):
+        valid = {}
+        for line, row in chunk:
+            if isinstance(row, str):
+                self.fail(result, line, {"non_field_errors": [row]})
+                continue
+            data, errors = self.clean(row)
+            if errors:
+                self.fail(result, line, errors)
+                continue
+            if data["slug"] in valid:
+                # The last row for a slug wins, as it would across chunks
+                self.fail(result, valid[data["slug"]][0], {"slug": ["Superseded by a later row with this slug."]})
+            valid[data["slug"]] = (line, data)
+
+        if not valid:
+            return
+        categories = self.resolve_categories(data for _, data in valid.values())
+        rows = []
+        try:
+            with transaction.atomic():
+                # Read and lock the products being replaced inside the upsert's
+                # transaction, so their owner and the old values logged as
+                # changes cannot move underneath it
+                existing = {
+                    slug: (seller_id, category_id, pk, {"price": price, "stock": stock})
+                    for slug, seller_id, category_id, pk, price, stock in Product.objects.select_for_update()
+                    .filter(slug__in=list(valid)).order_by("pk")
+                    .values_list("slug", "seller_id", "category_id", "pk", "price", "stock")
+                }
+                for slug, (line, data) in valid.items():
+                    data["category_id"] = categories.get(data.pop("category"))
+                    if data["category_id"] is None:
+                        self.fail(result, line, {"category": ["Unknown category."]})
+                    elif existing.get(slug, (self.seller.pk,))[0] != self.seller.pk:
+                        self.fail(result, line, {"slug": ["A product with this slug belongs to another seller."]})
+                    else:
+                        rows.append((line, data))
+                if not rows:
+                    return
+                written = self.upsert([data for _, data in rows])
+                # Slugs another seller created since they were looked up
+                for line, data in rows:
+                    if data["slug"] not in written:
+                        self.fail(result, line, {"slug": ["A product with this slug belongs to another seller."]})
+                rows = [(line, data) for line, data in rows if data["slug"] in written]
+                get_search_backend().index(list(written.values()))
+                self.log_changes(rows, existing)
+        except DatabaseError as exc:
+            for line, _ in rows:
+                self.fail(result, line, {"non_field_errors": [f"Database error: {exc}"]})
+            return
+
+        updated = sum(1 for _, data in rows if data["slug"] in existing)
+        result.updated += updated
+        result.created += len(rows) - updated
+        # Products that moved category invalidate their old category too.
+        # New products have no cached detail to invalidate.
+        categories = {data["category_id"] for _, data in rows}
+        replaced = [existing[data["slug"]] for _, data in rows if data["slug"] in existing]
+        catalog_cache.bump(
+            "products",
+            *(f"category:{category_id}" for category_id in categories.union(old[1] for old in replaced)),
+            *(f"product:{old[2]}" for old in replaced),
+        )
+
+    def log_changes(self, rows, existing):
+        """Log the price and stock changes of updated products, as the save signal does."""
+        changes = [
+            ProductChange.between(existing[data["slug"]][2], existing[data["slug"]][3], data)
+            for _, data in rows
+            if data["slug"] in existing
+        ]
+        ProductChange.objects.bulk_create([change for change in changes if change is not None])
+
+    def upsert(self, rows):
+        """
+        Insert or update ``rows`` by slug in one statement and return
+        ``{slug: id}`` of those written. The update is guarded by seller, so a
+        slug another seller took meanwhile is left alone and missing from the
+        result.
+        """
+        connection = connections[DEFAULT_DB_ALIAS]
+        meta = Product._meta
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        columns = ["name", "slug", "description", "price", "stock", "category_id"]
+        seller = meta.get_field("seller").column
+        updates = ", ".join(
+            f"{meta.get_field(name).column} = excluded.{meta.get_field(name).column}" for name in UPDATE_FIELDS
+        )
+        if connection.vendor == "sqlite":
+            # Compiling one placeholder per value dominates the statement's
+            # cost; SQLite reads the whole chunk from a single JSON parameter
+            # instead, as the search index does.
+            extract = ", ".join("json_extract(value, %s)" for _ in columns)
+            source = f"SELECT {extract}, %s, %s, %s FROM json_each(%s) WHERE true"
+            params = [f"$.{name}" for name in columns] + [self.seller.pk, now, now, json.dumps([
+                {**data, "price": str(data["price"])} for data in rows
+            ])]
+        else:
+            source, params = self.values_source(rows, columns, now)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {meta.db_table} ({', '.join(columns)}, {seller}, created_at, updated_at) {source} "
+                f"ON CONFLICT (slug) DO UPDATE SET {updates} "
+                f"WHERE {meta.db_table}.{seller} = excluded.{seller} RETURNING slug, id",
+                params,
+            )
+            return dict(cursor.fetchall())
+
+    def values_source(self, rows, columns, now):
+        """A ``VALUES`` list of ``rows`` for the upsert, and its parameters."""
+        placeholders = "(" + ", ".join(["%s"] * (len(columns) + 3)) + ")"
+        params = []
+        for data in rows:
+            params += [data[name] for name in columns] + [self.seller.pk, now, now]
+        return "VALUES " + ", ".join([placeholders] * len(rows)), params
+
+    def resolve_categories(self, rows):
+        """Map each row's category reference (an id or a slug) to a category id in one query."""
+        refs = {data["category"] for data in rows}
+        ids = {ref for ref in refs if isinstance(ref, int)}
+        slugs = refs - ids
+        found = {}
+        for pk, slug in Category.objects.filter(Q(pk__in=ids) | Q(slug__in=slugs)).values_list("pk", "slug"):
+            found[pk] = pk
+            found[slug] = pk
+        return found
+
+    def clean(self, row):
+        errors = {}
+        data = {}
+
+        name = str(row.get("name") or "").strip()
+        if not name:
+            errors["name"] = ["This field is required."]
+        elif len(name) > 200:
+            errors["name"] = ["Ensure this field has no more than 200 characters."]
+        data["name"] = name
+
+        slug = str(row.get("slug") or "").strip() or slugify(name)[:220]
+        try:
+            validate_slug(slug)
+        except ValidationError as exc:
+            errors["slug"] = exc.messages
+        if len(slug) > 220:
+            errors["slug"] = ["Ensure this field has no more than 220 characters."]
+        data["slug"] = slug
+
+        data["description"] = str(row.get("description") or "")
+
+        try:
+            price = Decimal(str(row.get("price", "")).strip())
+            if not price.is_finite() or price < 0 or price >= MAX_PRICE or price != price.quantize(CENT):
+                raise InvalidOperation
+            data["price"] = price
+        except InvalidOperation:
+            errors["price"] = ["A non-negative amount below 100000000 with at most 2 decimal places is required."]
+
+        stock = row.get("stock") or 0
+        try:
+            data["stock"] = int(stock)
+            if not 0 <= data["stock"] <= MAX_STOCK:
+                raise ValueError
+        except (TypeError, ValueError, OverflowError):
+            errors["stock"] = [f"A non-negative integer no greater than {MAX_STOCK} is required."]
+
+        category = row.get("category_id") or row.get("category")
+        if isinstance(category, str) and category.strip().isdigit():
+            category = int(category)
+        if isinstance(category, str):
+            category = category.strip()
+        if category in (None, ""):
+            errors["category"] = ["Either category_id or a category slug is required."]
+        elif isinstance(category, bool) or not isinstance(category, (int, str)):
+            errors["category"] = ["A category id or slug is required."]
+        data["category"] = category
+
+        return data, errors
+
+    def fail(self, result, line, errors):
+        result.failed += 1
+        if len(result.errors) < self.max_reported_errors:
+            result.errors.append({"line": line, "errors": errors})
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.benchmarks import benchmark_database, summarize
+from products.models import Category, Product
+from users.models import User
+
+READ_CHUNK = 4096
+
+SERVERS = [
+    # name, application, worker class, extra environment
+    ("wsgi sync", "capstone_e_commerce.wsgi:application", "sync", {"DATABASE_CONN_MAX_AGE": "60"}),
+    # Under ASGI queries run in per-request threads, so connections don't persist
+    ("asgi uvicorn", "capstone_e_commerce.asgi:application", "uvicorn_worker.UvicornWorker",
+     {"DATABASE_CONN_MAX_AGE": "0"}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the catalog reads (product list, product detail, category list) under "
+        "gunicorn, once with synchronous WSGI workers and once with uvicorn ASGI workers, "
+        "each with as many workers as fit in the same memory budget. Clients download "
+        "responses slowly, as clients on poor connections do. Linux only (reads /proc)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--memory-mb", type=int, default=400, help="Memory budget for all workers")
+        parser.add_argument("--clients", type=int, default=64, help="Concurrent clients")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per server")
+        parser.add_argument("--client-kbps", type=int, default=256, help="Download speed of each client")
+        parser.add_argument("--products", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with benchmark_database() as connection:
+            first_product, category = self.seed(options["products"])
+            paths = [
+                "/products/?page_size=100",
+                f"/products/?category={category}&page_size=100",
+                *(f"/products/{first_product + i}/" for i in range(0, options["products"], 97)),
+                "/products/categories/",
+            ]
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{connection.settings_dict['NAME']}",
+                "DATABASE_REPLICA_URLS": "",
+                "DEBUG": "False",
+            }
+            for name, app, worker_class, extra in SERVERS:
+                server_env = {**env, **extra, "GUNICORN_APP": app, "GUNICORN_WORKER_CLASS": worker_class}
+                with self.server(server_env, workers=1) as (port, pids):
+                    asyncio.run(self.load(port, paths, clients=4, duration=2, rate=0))
+                    worker_mb = max(self.rss_mb(pid) for pid in pids)
+                workers = max(1, int(options["memory_mb"] // worker_mb))
+                with self.server(server_env, workers=workers) as (port, pids):
+                    asyncio.run(self.load(port, paths, clients=4, duration=1, rate=0))
+                    results = asyncio.run(self.load(
+                        port, paths, options["clients"], options["duration"], options["client_kbps"] * 1024
+                    ))
+                    total_mb = sum(self.rss_mb(pid) for pid in pids)
+                self.report(name, workers, total_mb, results, options["duration"])
+
+    def seed(self, count):
+        seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Category {i}", slug=f"category-{i}") for i in range(20)]
+        )
+        products = Product.objects.bulk_create([
+            Product(
+                category=categories[i % len(categories)], seller=seller, name=f"Product {i}",
+                slug=f"product-{i}", description="A product for load testing. " * 5, price=i % 500 + 1, stock=10,
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        return products[0].pk, categories[0].pk
+
+    @contextmanager
+    def server(self, env, workers):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        env = {**env, "GUNICORN_WORKERS": str(workers), "GUNICORN_BIND": f"127.0.0.1:{port}"}
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--log-level", "warning"],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        try:
+            self.wait_until_serving(process, port, workers)
+            yield port, self.children(process.pid)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def wait_until_serving(self, process, port, workers):
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"gunicorn exited: {process.stderr.read().decode()[-2000:]}")
+            if len(self.children(process.pid)) == workers:
+                try:
+                    status = asyncio.run(self.request(port, "/products/categories/", 0))
+                    if status == 200:
+                        return
+                except OSError:
+                    pass
+            time.sleep(0.2)
+        raise CommandError("gunicorn did not start serving within 60 seconds")
+
+    @staticmethod
+    def children(pid):
+        pids = []
+        for task in Path(f"/proc/{pid}/task").iterdir():
+            pids += [int(child) for child in (task / "children").read_text().split()]
+        return pids
+
+    @staticmethod
+    def rss_mb(pid):
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+        return 0.0
+
+    async def load(self, port, paths, clients, duration, rate):
+        deadline = time.monotonic() + duration
+        results = {"latencies": [], "errors": 0}
+
+        async def client(offset):
+            index = offset
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    status = await self.request(port, paths[index % len(paths)], rate)
+                except OSError:
+                    status = None
+                if status == 200:
+                    results["latencies"].append(time.perf_counter() - start)
+                else:
+                    results["errors"] += 1
+                index += 1
+
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        return results
+
+    @staticmethod
+    async def request(port, path, rate):
+        """GET ``path`` and read the response at ``rate`` bytes per second (0 for full speed)."""
+        sock = socket.socket()
+        if rate:
+            # A small receive window so the server, not the kernel, holds the unread response
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, READ_CHUNK)
+        sock.setblocking(False)
+        await asyncio.wait_for(asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port)), 30)
+        reader, writer = await asyncio.open_connection(sock=sock, limit=READ_CHUNK)
+        try:
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept: application/json\r\n"
+                f"Connection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            response = b""
+            while chunk := await asyncio.wait_for(reader.read(READ_CHUNK), 30):
+                response += chunk
+                if rate:
+                    await asyncio.sleep(len(chunk) / rate)
+        finally:
+            writer.close()
+        return int(response[9:12]) if response[:5] == b"HTTP/" else None
+
+    def report(self, name, workers, total_mb, results, duration):
+        stats = summarize(results["latencies"])
+        self.stdout.write(
+            f"{name:<13} {workers:>2} workers {total_mb:6.0f}MiB  "
+            f"{stats['n'] / duration:7.0f} req/s  p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms  "
+            f"{results['errors']} errors"
+        )
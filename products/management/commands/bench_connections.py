@@ -0,0 +1,102 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.benchmarks import benchmark_database, summarize
+from products.models import Category, Product
+from users.models import User
+
+NO_CACHE = {
+    alias: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"} for alias in ("default", "catalog")
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the per-request cost of opening database connections on a throwaway copy of "
+        "the configured database: a new connection per request, persistent connections with "
+        "health checks, and (PostgreSQL with psycopg 3) a connection pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--max-age", type=int, default=60, help="CONN_MAX_AGE for persistent connections")
+        parser.add_argument("--pool-size", type=int, default=4)
+
+    def handle(self, *args, **options):
+        with benchmark_database(), override_settings(CACHES=NO_CACHE):
+            seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+            category = Category.objects.create(name="Bench", slug="bench")
+            product = Product.objects.create(
+                category=category, seller=seller, name="Item", slug="item", price=1, stock=1
+            )
+            url = reverse("product-detail", args=[product.pk])
+
+            settings_dict = connection.settings_dict
+            modes = [
+                ("new connection", {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}, None),
+                ("persistent", {"CONN_MAX_AGE": options["max_age"], "CONN_HEALTH_CHECKS": True}, None),
+            ]
+            if connection.vendor == "postgresql":
+                pool = {"min_size": options["pool_size"], "max_size": options["pool_size"]}
+                modes.append(("pool", {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}, pool))
+
+            saved = {key: settings_dict[key] for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+            saved_pool = settings_dict["OPTIONS"].pop("pool", None)
+            try:
+                for name, overrides, pool in modes:
+                    connection.close()
+                    settings_dict.update(overrides)
+                    if pool:
+                        settings_dict["OPTIONS"]["pool"] = pool
+                    try:
+                        self.run(name, url, options["requests"])
+                    except Exception as exc:  # e.g. pooling without psycopg 3
+                        self.stdout.write(self.style.WARNING(f"{name:<15} skipped: {exc}"))
+                    finally:
+                        settings_dict["OPTIONS"].pop("pool", None)
+                        connection.close()
+                        if pool:
+                            connection.close_pool()
+            finally:
+                settings_dict.update(saved)
+                if saved_pool is not None:
+                    settings_dict["OPTIONS"]["pool"] = saved_pool
+
+    def run(self, name, url, count):
+        client = APIClient()
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        for _ in range(50):
+            self.request(client, url)
+        connection_created.connect(count_connection)
+        try:
+            samples = []
+            for _ in range(count):
+                start = time.perf_counter()
+                self.request(client, url)
+                samples.append(time.perf_counter() - start)
+        finally:
+            connection_created.disconnect(count_connection)
+
+        stats = summarize(samples)
+        self.stdout.write(
+            f"{name:<15} {count / sum(samples):.0f} req/s  p50={stats['p50_ms']:.2f}ms "
+            f"p99={stats['p99_ms']:.2f}ms  {len(opened)} connections opened"
+        )
+
+    def request(self, client, url):
+        # The test client skips the close_old_connections() that the WSGI
+        # and ASGI handlers run around every request, so run it here.
+        close_old_connections()
+        response = client.get(url)
+        close_old_connections()
+        assert response.status_code == 200, response.status_code
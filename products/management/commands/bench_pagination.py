@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common.benchmarks import benchmark_database, summarize, timed
+from common.pagination import KeysetPagination
+from products.models import Category, Product
+from products.serializers import ProductSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway catalog and compare first-page and deep-page latency of "
+        "page-number (COUNT + OFFSET) and keyset pagination."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--deep-page", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=30)
+
+    def handle(self, *args, **options):
+        page_size, deep_page = options["page_size"], options["deep_page"]
+        factory = APIRequestFactory()
+
+        with benchmark_database():
+            self.seed(page_size * deep_page)
+            queryset = Product.objects.for_api()
+
+            # Position of the last row before the deep page, as a cursor would carry it
+            offset = page_size * (deep_page - 1) - 1
+            paginator = KeysetPagination()
+            paginator.keys = paginator.get_keys(queryset)
+            paginator.base_url = "http://testserver/products/"
+            deep_cursor = paginator.encode_cursor(
+                paginator.get_position(queryset.order_by("-created_at", "-id")[offset]), backwards=False
+            ).split("cursor=")[1]
+
+            cases = {
+                "page-number page 1": (PageNumberPagination, {"page": 1}),
+                f"page-number page {deep_page}": (PageNumberPagination, {"page": deep_page}),
+                "keyset page 1": (KeysetPagination, {}),
+                f"keyset page {deep_page}": (KeysetPagination, {"cursor": deep_cursor}),
+            }
+            for name, (pagination_class, params) in cases.items():
+                request = Request(factory.get("/products/", params))
+
+                def fetch():
+                    pager = pagination_class()
+                    pager.page_size = page_size
+                    page = pager.paginate_queryset(queryset, request)
+                    return pager.get_paginated_response(ProductSerializer(page, many=True).data)
+
+                stats = summarize(timed(fetch, options["repeat"]))
+                self.stdout.write(
+                    f"{name:<24} p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+                )
+
+    def seed(self, count):
+        seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+        category = Category.objects.create(name="Bench", slug="bench")
+        batch = 5000
+        for start in range(0, count, batch):
+            Product.objects.bulk_create([
+                Product(category=category, seller=seller, name=f"Product {i}", slug=f"product-{i}", price=1)
+                for i in range(start, min(start + batch, count))
+            ])
+        self.stdout.write(f"Seeded {count} products")
@@ -0,0 +1,57 @@
+import itertools
+import random
+import string
+
+from django.core.management.base import BaseCommand
+
+from common.benchmarks import benchmark_database, summarize, timed
+from products.models import Category, Product
+from products.search import get_search_backend, rebuild_index
+from users.models import User
+
+WORDS = (
+    "phone laptop cable charger wireless bluetooth speaker headphones case cover glass "
+    "screen protector stand mount adapter battery portable fast usb type lightning "
+    "keyboard mouse gaming office desk lamp smart watch band fitness tracker camera lens"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway catalog, build the full-text index and time ranked prefix searches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1_000_000)
+        parser.add_argument("--vocabulary", type=int, default=50_000)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        with benchmark_database():
+            seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+            category = Category.objects.create(name="Bench", slug="bench")
+            batch = 10_000
+            # A realistic catalog vocabulary is large and Zipf-distributed, so
+            # most words match a small slice of the catalog.
+            synthetic = [
+                "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+                for _ in range(options["vocabulary"])
+            ]
+            # Real product words sit a little below the stopword-like head
+            vocabulary = synthetic[:200] + WORDS + synthetic[200:]
+            weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+            for start in range(0, options["products"], batch):
+                Product.objects.bulk_create([
+                    Product(
+                        category=category, seller=seller, slug=f"product-{i}", price=1,
+                        name=" ".join(rng.choices(vocabulary, cum_weights=weights, k=3)),
+                        description=" ".join(rng.choices(vocabulary, cum_weights=weights, k=20)),
+                    )
+                    for i in range(start, min(start + batch, options["products"]))
+                ])
+            rebuild_index()
+            self.stdout.write(f"Indexed {options['products']} products")
+
+            backend = get_search_backend()
+            for text in ("phone", "wire", "usb charger", "gaming mouse", "fitness tracker band"):
+                stats = summarize(timed(lambda: backend.search(text, limit=50), options["repeat"]))
+                self.stdout.write(f"{text!r:<20} p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms")
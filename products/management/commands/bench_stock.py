@@ -0,0 +1,87 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from common.benchmarks import benchmark_database
+from products.models import Category, Product
+from products.stock import InsufficientStockError, reserve_stock
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a single product with concurrent stock reservations on a throwaway "
+        "database and check that it is never oversold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--stock", type=int, default=1000)
+        parser.add_argument("--attempts", type=int, default=200, help="Reservations per thread")
+        parser.add_argument("--quantity", type=int, default=1)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+            category = Category.objects.create(name="Bench", slug="bench")
+            product = Product.objects.create(
+                category=category, seller=seller, name="Hot SKU", slug="hot-sku",
+                price="1.00", stock=options["stock"],
+            )
+            connection.close()
+
+            results = [None] * options["threads"]
+            barrier = threading.Barrier(options["threads"])
+            workers = [
+                threading.Thread(
+                    target=self.worker,
+                    args=(product.pk, options["attempts"], options["quantity"], barrier, results, i),
+                )
+                for i in range(options["threads"])
+            ]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+            reserved = sum(r["reserved"] for r in results)
+            rejected = sum(r["rejected"] for r in results)
+            retries = sum(r["retries"] for r in results)
+            remaining = Product.objects.values_list("stock", flat=True).get(pk=product.pk)
+
+        self.stdout.write(
+            f"threads={options['threads']} attempts={reserved + rejected} "
+            f"reserved={reserved} rejected={rejected} lock_retries={retries}"
+        )
+        self.stdout.write(
+            f"elapsed={elapsed:.2f}s throughput={(reserved + rejected) / elapsed:.0f} reservations/s"
+        )
+        sold = reserved * options["quantity"]
+        if remaining < 0 or sold + remaining != options["stock"]:
+            raise CommandError(f"Oversold: sold={sold} remaining={remaining} initial={options['stock']}")
+        self.stdout.write(self.style.SUCCESS(f"No overselling: sold={sold} remaining={remaining}"))
+
+    def worker(self, product_id, attempts, quantity, barrier, results, index):
+        counts = {"reserved": 0, "rejected": 0, "retries": 0}
+        barrier.wait()
+        try:
+            for _ in range(attempts):
+                while True:
+                    try:
+                        with transaction.atomic():
+                            reserve_stock([(product_id, quantity)])
+                        counts["reserved"] += 1
+                    except InsufficientStockError:
+                        counts["rejected"] += 1
+                    except OperationalError:
+                        # SQLite reports a busy database instead of waiting forever
+                        counts["retries"] += 1
+                        continue
+                    break
+        finally:
+            connection.close()
+            results[index] = counts
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.utils import read_rows
+from products.importer import ProductImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Create or update a seller's products by slug from a CSV or JSON lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON lines file, or - for stdin")
+        parser.add_argument("--seller", required=True, help="Email of the seller who owns the products")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=ProductImporter.chunk_size)
+
+    def handle(self, *args, **options):
+        try:
+            seller = User.objects.get(email=options["seller"], is_seller=True)
+        except User.DoesNotExist:
+            raise CommandError(f"No seller with email {options['seller']!r}")
+
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        importer = ProductImporter(seller, chunk_size=options["chunk_size"])
+        if path == "-":
+            result = importer.run(read_rows(sys.stdin.buffer, fmt))
+        else:
+            with Path(path).open("rb") as stream:
+                result = importer.run(read_rows(stream, fmt))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows} rows: {result.created} created, {result.updated} updated, "
+            f"{result.failed} failed in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s)"
+        ))
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# The index as it stood when this migration was written; products.search
+# may change later, so this migration keeps its own copy of the SQL.
+INSTALL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products_product_fts USING fts5("
+        "name, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+        "DELETE FROM products_product_fts",
+        "INSERT INTO products_product_fts (rowid, name, description) "
+        "SELECT id, name, description FROM {product}",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS products_product_search ("
+        "product_id bigint PRIMARY KEY REFERENCES {product} (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS products_product_search_document_idx "
+        "ON products_product_search USING gin (document)",
+        "INSERT INTO products_product_search (product_id, document) "
+        "SELECT id, setweight(to_tsvector('simple', name), 'A') "
+        "|| setweight(to_tsvector('simple', coalesce(description, '')), 'B') "
+        "FROM {product} "
+        "ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+    ],
+}
+
+UNINSTALL = {
+    "sqlite": ["DROP TABLE IF EXISTS products_product_fts"],
+    "postgresql": ["DROP TABLE IF EXISTS products_product_search"],
+}
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        product = apps.get_model("products", "Product")._meta.db_table
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql.format(product=product))
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_product_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(INSTALL), run(UNINSTALL)),
+    ]
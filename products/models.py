@@ -4,6 +4,7 @@ from django.conf import settings
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=120, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = 'Categories'
@@ -12,8 +13,21 @@ class Category(models.Model):
         return self.name
 
 
+class ProductQuerySet(models.QuerySet):
+    def for_api(self):
+        """
+        Load exactly what ProductSerializer renders: the product columns, the
+        seller id for permission checks and the category in the same query.
+        """
+        return self.select_related("category").only(
+            "id", "name", "description", "price", "created_at", "updated_at", "seller",
+            "category__id", "category__name", "category__slug",
+        )
+
+
 class Product(models.Model):
-    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="products")
+    # Indexed by the composite indexes below, which lead with the category
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="products", db_index=False)
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="products")
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=220, unique=True)
@@ -23,8 +37,72 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    loaded_values = {}
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Backs keyset pagination of the catalog on (created_at, id)
+            models.Index(fields=["-created_at", "-id"], name="product_created_idx"),
+            # The same list filtered to one category
+            models.Index(fields=["category", "-created_at", "-id"], name="product_category_created_idx"),
+            # ?ordering=price, with and without a category filter
+            models.Index(fields=["price", "id"], name="product_price_idx"),
+            models.Index(fields=["category", "price", "id"], name="product_category_price_idx"),
+            # Covers the conditional GET validators, MAX(updated_at) and
+            # COUNT(*), for the whole catalog and for one category
+            models.Index(fields=["category", "updated_at"], name="product_category_updated_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the values as loaded so save signals can tell what changed
+        instance.loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # The refreshed values are what is now stored, as in from_db
+        if fields is None:
+            names = [field.attname for field in self._meta.concrete_fields]
+        else:
+            names = [self._meta.get_field(name).attname for name in fields]
+        deferred = self.get_deferred_fields()
+        self.loaded_values = {
+            **self.loaded_values, **{name: getattr(self, name) for name in names if name not in deferred}
+        }
 
     def __str__(self):
         return self.name
+
+
+class ProductChange(models.Model):
+    """
+    A change to a product's price or stock, logged for consumers (such as
+    wishlist notifications) that follow the log by id from a watermark.
+    Only the fields that changed are filled in.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="changes")
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    old_stock = models.PositiveIntegerField(null=True)
+    new_stock = models.PositiveIntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def between(cls, product_id, old, new):
+        """
+        The change from ``old`` to ``new`` values (dicts that may hold
+        ``price`` and ``stock``), or None if neither changed.
+        """
+        change = cls(product_id=product_id)
+        for field in ("price", "stock"):
+            if field in old and field in new and old[field] != new[field]:
+                setattr(change, f"old_{field}", old[field])
+                setattr(change, f"new_{field}", new[field])
+        if change.old_price is None and change.old_stock is None:
+            return None
+        return change
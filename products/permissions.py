@@ -12,7 +12,7 @@ class IsSellerOrReadOnly(permissions.BasePermission):
         return (
             request.user.is_authenticated
             and getattr(request.user, "is_seller", False)
-            and obj.seller == request.user
+            and obj.seller_id == request.user.pk
         )
 
     def has_permission(self, request, view):
@@ -0,0 +1,261 @@
+import json
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Product
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return [word.lower() for word in WORD_RE.findall(text or "")]
+
+
+class SearchBackend:
+    """
+    Keeps a full-text index of product names and descriptions and answers
+    ranked, prefix-matching queries against it.
+
+    Every backend exposes the same API so the search filter, the signal
+    handlers and the rebuild command don't care which database is in use.
+    """
+
+    vendor = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        """Create the index structures."""
+
+    def uninstall(self):
+        """Drop the index structures."""
+
+    def index(self, product_ids):
+        """(Re)index the given products from their current rows."""
+        raise NotImplementedError
+
+    def remove(self, product_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, text, limit):
+        """Ids of the best matching products, best first."""
+        raise NotImplementedError
+
+    def filter(self, queryset, text):
+        """
+        Narrow ``queryset`` to the products matching ``text``, annotated with
+        ``search_rank`` (lower is better), so that ranking happens in the same
+        query as the queryset's own filters.
+        """
+        raise NotImplementedError
+
+    def product_id(self, queryset):
+        """The quoted id column of ``queryset``'s table, for correlated subqueries."""
+        quote = self.connection.ops.quote_name
+        return f"{quote(queryset.model._meta.db_table)}.{quote(queryset.model._meta.pk.column)}"
+
+    def execute(self, sql, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            if cursor.description:
+                return cursor.fetchall()
+        return None
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """SQLite FTS5 inverted index ranked with BM25, product name weighted above description."""
+
+    vendor = "sqlite"
+    table = "products_product_fts"
+
+    def install(self):
+        self.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            "name, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+
+    def uninstall(self):
+        self.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, product_ids):
+        ids = list(product_ids)
+        if not ids:
+            return
+        self.remove(ids)
+        self.execute(
+            f"INSERT INTO {self.table} (rowid, name, description) "
+            f"SELECT id, name, description FROM products_product "
+            f"WHERE id IN (SELECT value FROM json_each(%s))",
+            [json.dumps(ids)],
+        )
+
+    def remove(self, product_ids):
+        # Ids are passed as one JSON array to stay clear of SQLite's bound parameter limit
+        ids = list(product_ids)
+        if ids:
+            self.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN (SELECT value FROM json_each(%s))",
+                [json.dumps(ids)],
+            )
+
+    def clear(self):
+        self.execute(f"DELETE FROM {self.table}")
+
+    @staticmethod
+    def match(terms):
+        # Every term must match, each as a prefix so partially typed words hit
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, text, limit):
+        terms = tokenize(text)
+        if not terms:
+            return []
+        match = self.match(terms)
+        rows = self.execute(
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+            f"ORDER BY bm25({self.table}, 10.0, 1.0) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in rows]
+
+    def filter(self, queryset, text):
+        terms = tokenize(text)
+        if not terms:
+            return queryset.none()
+        match = self.match(terms)
+        matches = RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match])
+        rank = RawSQL(
+            f"SELECT bm25({self.table}, 10.0, 1.0) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND rowid = {self.product_id(queryset)}",
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+
+class PostgresFTSBackend(SearchBackend):
+    """Postgres ``tsvector`` index with a GIN index, ranked with ``ts_rank``."""
+
+    vendor = "postgresql"
+    table = "products_product_search"
+    config = "simple"
+
+    def install(self):
+        self.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "product_id bigint PRIMARY KEY REFERENCES products_product (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        self.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_document_idx ON {self.table} USING gin (document)"
+        )
+
+    def uninstall(self):
+        self.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, product_ids):
+        ids = list(product_ids)
+        if not ids:
+            return
+        self.execute(
+            f"INSERT INTO {self.table} (product_id, document) "
+            f"SELECT id, setweight(to_tsvector(%s, name), 'A') "
+            f"|| setweight(to_tsvector(%s, coalesce(description, '')), 'B') "
+            f"FROM products_product WHERE id = ANY(%s) "
+            f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+            [self.config, self.config, ids],
+        )
+
+    def remove(self, product_ids):
+        ids = list(product_ids)
+        if ids:
+            self.execute(f"DELETE FROM {self.table} WHERE product_id = ANY(%s)", [ids])
+
+    def clear(self):
+        self.execute(f"TRUNCATE {self.table}")
+
+    @staticmethod
+    def query(terms):
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def search(self, text, limit):
+        terms = tokenize(text)
+        if not terms:
+            return []
+        query = self.query(terms)
+        rows = self.execute(
+            f"SELECT product_id FROM {self.table}, to_tsquery(%s, %s) query "
+            f"WHERE document @@ query ORDER BY ts_rank(document, query) DESC, product_id DESC LIMIT %s",
+            [self.config, query, limit],
+        )
+        return [row[0] for row in rows]
+
+    def filter(self, queryset, text):
+        terms = tokenize(text)
+        if not terms:
+            return queryset.none()
+        params = [self.config, self.query(terms)]
+        matches = RawSQL(f"SELECT product_id FROM {self.table} WHERE document @@ to_tsquery(%s, %s)", params)
+        rank = RawSQL(
+            f"SELECT -ts_rank(document, to_tsquery(%s, %s)) FROM {self.table} "
+            f"WHERE product_id = {self.product_id(queryset)}",
+            params,
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+
+class LikeBackend(SearchBackend):
+    """Unindexed fallback for other databases: substring match on name or description."""
+
+    def index(self, product_ids):
+        pass
+
+    def remove(self, product_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, text, limit):
+        queryset = self.filter(Product.objects.using(self.connection.alias), text)
+        return list(queryset.values_list("pk", flat=True)[:limit])
+
+    def filter(self, queryset, text):
+        condition = Q()
+        for term in tokenize(text):
+            condition &= Q(name__icontains=term) | Q(description__icontains=term)
+        return queryset.filter(condition).annotate(search_rank=Value(0.0))
+
+
+BACKENDS = {backend.vendor: backend for backend in (SQLiteFTSBackend, PostgresFTSBackend)}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    return BACKENDS.get(connection.vendor, LikeBackend)(connection)
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS, chunk_size=5000):
+    """Reindex every product, one chunk of ids at a time. Returns the number indexed."""
+    backend = get_search_backend(using)
+    backend.clear()
+    ids = Product.objects.using(using).order_by("pk").values_list("pk", flat=True)
+    total = 0
+    chunk = []
+    for pk in ids.iterator(chunk_size=chunk_size):
+        chunk.append(pk)
+        if len(chunk) == chunk_size:
+            backend.index(chunk)
+            total += len(chunk)
+            chunk = []
+    backend.index(chunk)
+    return total + len(chunk)
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Category, Product, ProductChange
+from .cache import catalog_cache
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, using, **kwargs):
+    get_search_backend(using).index([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, using, **kwargs):
+    get_search_backend(using).remove([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    categories = {instance.category_id, instance.loaded_values.get("category_id")}
+    catalog_cache.bump(
+        "products",
+        f"product:{instance.pk}",
+        *(f"category:{category}" for category in categories if category is not None),
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    catalog_cache.bump("global")
+
+
+@receiver(post_save, sender=Product)
+def log_product_change(sender, instance, created, using, **kwargs):
+    new = {"price": instance.price, "stock": instance.stock}
+    change = None if created else ProductChange.between(instance.pk, instance.loaded_values, new)
+    if change is not None:
+        change.save(using=using)
+    # A later save of this instance is compared with what is now stored
+    instance.loaded_values = {**instance.loaded_values, **new}
@@ -0,0 +1,76 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+
+from .models import Product, ProductChange
+
+
+class InsufficientStockError(Exception):
+    """Raised when one or more products cannot cover the requested quantity."""
+
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__("Insufficient stock")
+
+
+class _ShortLine(Exception):
+    pass
+
+
+def _totals(lines):
+    totals = Counter()
+    for product_id, quantity in lines:
+        totals[product_id] += quantity
+    return totals
+
+
+def reserve_stock(lines, lock=True):
+    """
+    Decrement stock for every ``(product_id, quantity)`` line of an order.
+
+    All lines are applied with a single conditional ``UPDATE ... WHERE
+    stock >= quantity``, so a product can never go below zero even without
+    row locks. When ``lock`` is true the product rows are first locked in
+    primary key order, which keeps two orders touching the same products
+    from deadlocking each other; pass ``lock=False`` if the caller already
+    holds those locks. If any line is short nothing is decremented and
+    ``InsufficientStockError`` lists the offending products. Otherwise the
+    decrements are added to the product change log with one more read and
+    one bulk insert.
+    """
+    totals = _totals(lines)
+    if not totals:
+        return
+
+    with transaction.atomic():
+        if lock:
+            list(
+                Product.objects.select_for_update()
+                .filter(pk__in=totals)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+
+        enough = reduce(or_, (Q(pk=pk, stock__gte=qty) for pk, qty in totals.items()))
+        try:
+            with transaction.atomic():
+                updated = Product.objects.filter(enough).update(
+                    stock=Case(*[When(pk=pk, then=F("stock") - qty) for pk, qty in totals.items()])
+                )
+                if updated != len(totals):
+                    raise _ShortLine
+        except _ShortLine:
+            # Stock is read back after the partial update has been rolled
+            # back, so the report reflects real levels.
+            available = dict(Product.objects.filter(pk__in=totals).values_list("pk", "stock"))
+            raise InsufficientStockError(
+                pk for pk, qty in totals.items() if available.get(pk, 0) < qty
+            ) from None
+
+        ProductChange.objects.bulk_create([
+            ProductChange(product_id=pk, old_stock=stock + totals[pk], new_stock=stock)
+            for pk, stock in Product.objects.filter(pk__in=totals).order_by().values_list("pk", "stock")
+        ])
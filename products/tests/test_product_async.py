@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from products.models import Category, Product
+from products.views import CategoryListCreateView, ProductDetailView, ProductListCreateView
+from users.models import User
+from users.tokens import UserRefreshToken
+
+
+class AsyncCatalogReadTests(TestCase):
+    """Catalog reads served on the event loop, through the ASGI handler."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        cls.phones = Category.objects.create(name="Phones", slug="phones")
+        cls.books = Category.objects.create(name="Books", slug="books")
+        Product.objects.bulk_create([
+            Product(
+                category=cls.phones if i % 2 else cls.books, seller=cls.seller,
+                name=f"Product {i}", slug=f"product-{i}", price=i + 1,
+            )
+            for i in range(15)
+        ])
+        cls.product = Product.objects.order_by("pk").first()
+
+    def sync_response(self, view_class, path, params=None, **kwargs):
+        """The same request answered by the regular synchronous DRF view."""
+        response = view_class.as_view()(APIRequestFactory().get(path, params), **kwargs)
+        response.render()
+        return json.loads(response.content)
+
+    async def test_product_list_matches_the_sync_view(self):
+        url = reverse("product-list-create")
+        for params in ({}, {"category": self.phones.pk, "ordering": "-price"}, {"search": "product"}):
+            response = await self.async_client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(self.sync_response)(ProductListCreateView, url, params)
+            self.assertEqual(response.json(), expected)
+
+    async def test_pages_follow_cursors(self):
+        url = reverse("product-list-create")
+        response = await self.async_client.get(url, {"page_size": 10, "count": "true"})
+        first = response.json()
+        self.assertEqual(first["count"], 15)
+        response = await self.async_client.get(first["next"])
+        self.assertEqual(len(response.json()["results"]), 5)
+        self.assertIsNone(response.json()["next"])
+
+    async def test_product_detail_and_404(self):
+        url = reverse("product-detail", args=[self.product.pk])
+        response = await self.async_client.get(url)
+        expected = await sync_to_async(self.sync_response)(ProductDetailView, url, pk=self.product.pk)
+        self.assertEqual(response.json(), expected)
+
+        missing = await self.async_client.get(reverse("product-detail", args=[10**9]))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_category_list_pages_by_number(self):
+        url = reverse("category-list-create")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.json(), await sync_to_async(self.sync_response)(CategoryListCreateView, url))
+        self.assertEqual((await self.async_client.get(url, {"page": 9})).status_code, 404)
+
+    async def test_conditional_get_and_head(self):
+        url = reverse("product-detail", args=[self.product.pk])
+        etag = (await self.async_client.get(url))["ETag"]
+        response = await self.async_client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        response = await self.async_client.head(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+
+    async def test_authenticated_reads_and_sync_writes(self):
+        token = await sync_to_async(lambda: str(UserRefreshToken.for_user(self.seller).access_token))()
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await self.async_client.get(reverse("product-list-create"), headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.post(
+            reverse("category-list-create"), {"name": "Games", "slug": "games"},
+            content_type="application/json", headers=headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Category.objects.filter(slug="games").aexists())
+
+        bad = await self.async_client.get(reverse("product-list-create"), headers={"Authorization": "Bearer nope"})
+        self.assertEqual(bad.status_code, 401)
+
+
+class AsyncViewMountTests(TestCase):
+    @override_settings(ASYNC_VIEWS=False)
+    def test_wsgi_deployments_get_the_sync_view(self):
+        view = ProductListCreateView.as_async_view()
+        self.assertFalse(asyncio.iscoroutinefunction(view))
+        self.assertIs(view.cls, ProductListCreateView)
+
+    def test_asgi_deployments_get_the_async_view(self):
+        self.assertTrue(asyncio.iscoroutinefunction(ProductListCreateView.as_async_view()))
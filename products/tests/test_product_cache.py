@@ -0,0 +1,79 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from products.cache import catalog_cache
+from products.models import Category, Product
+from users.models import User
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.phones = Category.objects.create(name="Phones", slug="phones")
+        self.books = Category.objects.create(name="Books", slug="books")
+        self.phone = Product.objects.create(
+            category=self.phones, seller=self.seller, name="Phone", slug="phone", price=100
+        )
+        self.book = Product.objects.create(
+            category=self.books, seller=self.seller, name="Book", slug="book", price=10
+        )
+        self.list_url = reverse("product-list-create")
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_repeat_read_is_served_from_cache(self):
+        self.assertEqual(self.get(self.list_url)["X-Cache"], "MISS")
+        # Only the conditional GET validators touch the database
+        with self.assertNumQueries(1):
+            response = self.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_query_parameters_are_normalized(self):
+        self.get(self.list_url, {"ordering": "price", "category": self.phones.pk})
+        response = self.client.get(f"{self.list_url}?category={self.phones.pk}&ordering=price")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_product_change_invalidates_only_its_category(self):
+        phones = {"category": self.phones.pk}
+        books = {"category": self.books.pk}
+        self.get(self.list_url, phones)
+        self.get(self.list_url, books)
+
+        self.phone.name = "Smartphone"
+        self.phone.save()
+
+        response = self.get(self.list_url, phones)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["name"], "Smartphone")
+        self.assertEqual(self.get(self.list_url, books)["X-Cache"], "HIT")
+
+    def test_moving_a_product_invalidates_both_categories(self):
+        self.get(self.list_url, {"category": self.books.pk})
+        phone = Product.objects.for_api().get(pk=self.phone.pk)
+        phone.category = self.books
+        phone.save()
+        response = self.get(self.list_url, {"category": self.books.pk})
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_category_rename_invalidates_product_detail(self):
+        url = reverse("product-detail", args=[self.phone.pk])
+        self.get(url)
+        self.phones.name = "Mobile"
+        self.phones.save()
+        self.assertEqual(self.get(url).data["category"]["name"], "Mobile")
+
+    def test_stats_count_hits_and_misses(self):
+        before = catalog_cache.stats()
+        self.get(reverse("category-list-create"))
+        self.get(reverse("category-list-create"))
+        after = catalog_cache.stats()
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+        admin = User.objects.create_superuser(email="admin@example.com", password="pass")
+        self.client.force_authenticate(user=admin)
+        self.assertIn("hit_ratio", self.get(reverse("catalog-cache-stats")).data)
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from products.models import Category, Product
+from products.search import get_search_backend
+from users.models import User
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.category = Category.objects.create(name="Phones", slug="phones")
+        self.product = Product.objects.create(
+            category=self.category, seller=seller, name="Phone", slug="phone", price=100
+        )
+        self.list_url = reverse("product-list-create")
+        self.detail_url = reverse("product-detail", args=[self.product.pk])
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_list_etag_changes_on_update_and_delete(self):
+        first = self.client.get(self.list_url)["ETag"]
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first).status_code, 304)
+
+        Product.objects.filter(pk=self.product.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        second = self.client.get(self.list_url)["ETag"]
+        self.assertNotEqual(first, second)
+
+        self.product.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=second)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_query(self):
+        plain = self.client.get(self.list_url)["ETag"]
+        ordered = self.client.get(self.list_url, {"ordering": "price"})["ETag"]
+        self.assertNotEqual(plain, ordered)
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.detail_url)
+        last_modified = response["Last-Modified"]
+        self.assertEqual(
+            self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304
+        )
+        earlier = http_date((self.product.updated_at - timedelta(days=1)).timestamp())
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=earlier).status_code, 200)
+
+    def test_category_list_uses_category_updated_at(self):
+        url = reverse("category-list-create")
+        etag = self.client.get(url)["ETag"]
+        self.category.name = "Mobile"
+        self.category.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_product_etags_change_when_the_category_does(self):
+        etags = {url: self.client.get(url)["ETag"] for url in (self.list_url, self.detail_url)}
+        Category.objects.filter(pk=self.category.pk).update(
+            name="Mobile", updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_filters_once(self):
+        search = get_search_backend().filter
+        with mock.patch.object(type(get_search_backend()), "filter", side_effect=search) as backend:
+            response = self.client.get(self.list_url, {"search": "phone"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(backend.call_count, 1)
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.product.pk])
+
+    def test_missing_product_is_404(self):
+        response = self.client.get(reverse("product-detail", args=[self.product.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,171 @@
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from products.cache import catalog_cache
+from common.utils import read_rows
+from products.importer import ProductImporter
+from products.models import Category, Product
+from products.search import get_search_backend
+from users.models import User
+
+
+def jsonl(*rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+class ProductImporterTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.phones = Category.objects.create(name="Phones", slug="phones")
+        self.books = Category.objects.create(name="Books", slug="books")
+
+    def run_import(self, *rows, chunk_size=None):
+        return ProductImporter(self.seller, chunk_size=chunk_size).run(read_rows(io.BytesIO(jsonl(*rows)), "jsonl"))
+
+    def test_upserts_by_slug(self):
+        result = self.run_import(
+            {"name": "Phone", "price": "100", "stock": 5, "category": "phones"},
+            {"name": "Book", "slug": "book", "price": "9.99", "category_id": self.books.pk},
+        )
+        self.assertEqual((result.created, result.updated, result.failed), (2, 0, 0))
+        phone = Product.objects.get(slug="phone")
+        self.assertEqual((phone.category, phone.stock, phone.seller), (self.phones, 5, self.seller))
+
+        result = self.run_import({"name": "Phone 2", "slug": "phone", "price": "80", "category": "books"})
+        self.assertEqual((result.created, result.updated), (0, 1))
+        phone.refresh_from_db()
+        self.assertEqual((phone.name, phone.price, phone.category), ("Phone 2", Decimal("80"), self.books))
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_invalid_rows_are_reported_without_aborting(self):
+        stream = io.BytesIO(b'{"name": "Phone", "price": "1", "category": "phones"}\nnot json\n'
+                            b'{"name": "Free", "price": "-1", "category": "phones"}\n'
+                            b'{"name": "Lost", "price": "1", "category": "nowhere"}\n')
+        result = ProductImporter(self.seller).run(read_rows(stream, "jsonl"))
+        self.assertEqual((result.rows, result.created, result.failed), (4, 1, 3))
+        self.assertEqual([error["line"] for error in result.errors], [2, 3, 4])
+        self.assertIn("price", result.errors[1]["errors"])
+        self.assertIn("category", result.errors[2]["errors"])
+
+    def test_malformed_categories_and_stock_fail_their_row_only(self):
+        result = self.run_import(
+            {"name": "A", "price": "1", "category": [self.phones.pk]},
+            {"name": "B", "price": "1", "category": {"slug": "phones"}},
+            {"name": "C", "price": "1", "category_id": True},
+            {"name": "D", "price": "1", "stock": 10**20, "category": "phones"},
+            {"name": "E", "price": "1", "stock": 3, "category": "phones"},
+        )
+        self.assertEqual((result.created, result.failed), (1, 4))
+        self.assertEqual([list(error["errors"]) for error in result.errors], [["category"]] * 3 + [["stock"]])
+        self.assertEqual(Product.objects.get().slug, "e")
+
+    def test_other_sellers_slugs_are_rejected(self):
+        other = User.objects.create_user(email="other@example.com", password="pass", is_seller=True)
+        Product.objects.create(seller=other, category=self.phones, name="Phone", slug="phone", price=1)
+        result = self.run_import({"name": "Mine", "slug": "phone", "price": "2", "category": "phones"})
+        self.assertEqual((result.updated, result.failed), (0, 1))
+        self.assertEqual(Product.objects.get(slug="phone").name, "Phone")
+
+    def test_slugs_taken_during_the_import_are_not_taken_over(self):
+        other = User.objects.create_user(email="other@example.com", password="pass", is_seller=True)
+        upsert = ProductImporter.upsert
+
+        def race(importer, rows):
+            # Another seller creates the slug after the ownership lookup
+            Product.objects.create(seller=other, category=self.phones, name="Theirs", slug="phone", price=1)
+            return upsert(importer, rows)
+
+        with mock.patch.object(ProductImporter, "upsert", race):
+            result = self.run_import(
+                {"name": "Mine", "slug": "phone", "price": "2", "category": "phones"},
+                {"name": "Case", "price": "3", "category": "phones"},
+            )
+        self.assertEqual((result.created, result.updated, result.failed), (1, 0, 1))
+        self.assertEqual(result.errors[0]["line"], 1)
+        self.assertEqual(Product.objects.get(slug="phone").seller, other)
+
+    def test_values_upsert_used_by_other_databases(self):
+        Product.objects.create(seller=self.seller, category=self.phones, name="Phone", slug="phone", price=1)
+        other = User.objects.create_user(email="other@example.com", password="pass", is_seller=True)
+        Product.objects.create(seller=other, category=self.phones, name="Theirs", slug="theirs", price=1)
+        importer = ProductImporter(self.seller)
+        with mock.patch.object(connections["default"], "vendor", "postgresql"):
+            written = importer.upsert([
+                {"name": name, "slug": slug, "description": "", "price": Decimal("5.50"), "stock": 2,
+                 "category_id": self.books.pk}
+                for name, slug in [("Phone 2", "phone"), ("Book", "book"), ("Mine", "theirs")]
+            ])
+        self.assertEqual(set(written), {"phone", "book"})
+        phone = Product.objects.get(slug="phone")
+        self.assertEqual((phone.pk, phone.name, phone.price, phone.category), (written["phone"], "Phone 2",
+                                                                               Decimal("5.50"), self.books))
+        self.assertEqual(Product.objects.get(slug="theirs").name, "Theirs")
+
+    def test_queries_per_chunk_are_constant(self):
+        rows = [{"name": f"Item {i}", "price": "1", "category": "phones"} for i in range(50)]
+        # Category lookup, ownership lookup, savepoint, upsert, index remove+insert, release
+        with self.assertNumQueries(7):
+            result = self.run_import(*rows)
+        self.assertEqual(result.created, 50)
+
+    def test_updates_search_index_and_cache(self):
+        version = catalog_cache.versions([f"category:{self.phones.pk}"])[0]
+        self.run_import({"name": "Walnut desk", "price": "1", "category": "phones"})
+        product = Product.objects.get(slug="walnut-desk")
+        self.assertEqual(get_search_backend().search("walnut", 10), [product.pk])
+        self.assertNotEqual(catalog_cache.versions([f"category:{self.phones.pk}"])[0], version)
+
+    def test_management_command_reads_csv(self):
+        path = self.tmp_csv("name,slug,price,stock,category\nPhone,phone,10.50,3,phones\n")
+        out = io.StringIO()
+        call_command("import_products", path, seller=self.seller.email, stdout=out)
+        self.assertIn("1 created", out.getvalue())
+        self.assertEqual(Product.objects.get(slug="phone").price, Decimal("10.50"))
+
+    def tmp_csv(self, content):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        self.addCleanup(os.unlink, handle.name)
+        with handle:
+            handle.write(content)
+        return handle.name
+
+
+class ProductBulkImportViewTests(APITestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.customer = User.objects.create_user(email="customer@example.com", password="pass")
+        Category.objects.create(name="Phones", slug="phones")
+        self.url = reverse("product-bulk-import")
+
+    def test_seller_can_import_csv_and_jsonl(self):
+        self.client.force_authenticate(self.seller)
+        response = self.client.generic(
+            "POST", self.url, b"name,price,category\nPhone,10,phones\n", content_type="text/csv"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 1)
+
+        response = self.client.generic(
+            "POST", self.url, jsonl({"name": "Phone", "price": "12", "category": "phones"}, {"name": ""}),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual((response.data["updated"], response.data["failed"]), (1, 1))
+
+    def test_unsupported_content_type(self):
+        self.client.force_authenticate(self.seller)
+        response = self.client.post(self.url, {"name": "Phone"}, format="json")
+        self.assertEqual(response.status_code, 415)
+
+    def test_customer_cannot_import(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.generic("POST", self.url, b"name\n", content_type="text/csv")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,58 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from products.models import Category, Product
+from users.models import User
+
+
+class KeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        # Every third product shares a price so the id tiebreaker is exercised
+        Product.objects.bulk_create([
+            Product(category=category, seller=seller, name=f"Product {i}", slug=f"product-{i}", price=i // 3 + 1)
+            for i in range(25)
+        ])
+        cls.url = reverse("product-list-create")
+
+    def walk(self, url, params=None):
+        ids, pages = [], []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            ids += [product["id"] for product in response.data["results"]]
+            if not response.data["next"]:
+                return ids, pages
+            response = self.client.get(response.data["next"])
+
+    def test_walks_newest_first_without_gaps(self):
+        ids, pages = self.walk(self.url)
+        expected = list(Product.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]["previous"])
+        self.assertNotIn("count", pages[0])
+
+    def test_ordering_filter_becomes_the_key(self):
+        ids, _ = self.walk(self.url, {"ordering": "-price", "page_size": 4})
+        expected = list(Product.objects.order_by("-price", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get(self.url, {"page_size": 5}).data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNone(back["previous"])
+
+    def test_count_is_opt_in(self):
+        response = self.client.get(self.url, {"count": "true"})
+        self.assertEqual(response.data["count"], 25)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
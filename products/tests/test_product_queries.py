@@ -0,0 +1,47 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from common.testing import QueryScalingMixin
+from products.models import Category, Product
+from products.search import rebuild_index
+from users.models import User
+
+
+class ProductQueryCountTests(QueryScalingMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        categories = Category.objects.bulk_create([
+            Category(name=f"Category {i}", slug=f"category-{i}") for i in range(10)
+        ])
+        Category.objects.bulk_create([
+            Category(name=f"Extra {i}", slug=f"extra-{i}") for i in range(490)
+        ])
+        Product.objects.bulk_create([
+            Product(
+                category=categories[i % len(categories)],
+                seller=seller,
+                name=f"Product {i}",
+                slug=f"product-{i}",
+                price=i + 1,
+                stock=i,
+            )
+            for i in range(max(cls.page_sizes))
+        ])
+        rebuild_index()
+        cls.product = Product.objects.first()
+
+    def test_product_list(self):
+        self.assertQueriesConstant(reverse("product-list-create"))
+
+    def test_product_list_ordered_and_searched(self):
+        self.assertQueriesConstant(reverse("product-list-create"), ordering="price", search="Product")
+
+    def test_category_list(self):
+        self.assertQueriesConstant(reverse("category-list-create"))
+
+    def test_product_detail(self):
+        # One query for the conditional GET validators, one for the product
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("product-detail", args=[self.product.pk]))
+        self.assertEqual(response.data["category"]["id"], self.product.category_id)
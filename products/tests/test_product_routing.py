@@ -0,0 +1,173 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.db import build_databases
+from common.middleware import ReadReplicaMiddleware
+from common.routers import ReplicaRouter, replica_reads, request_routing
+from orders.models import Cart, Order
+from products.cache import catalog_cache
+from products.models import Category, Product
+from users.models import User
+
+REPLICATED = build_databases(
+    "sqlite:///primary.sqlite3", replica_urls=["sqlite:///replica.sqlite3", "sqlite:///replica2.sqlite3"]
+)
+
+
+class BuildDatabasesTests(SimpleTestCase):
+    def test_persistent_connections_with_health_checks(self):
+        databases = build_databases("sqlite:///db.sqlite3", conn_max_age=60)
+        self.assertEqual(list(databases), ["default"])
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 60)
+        self.assertTrue(databases["default"]["CONN_HEALTH_CHECKS"])
+
+    def test_pool_replaces_persistent_connections_on_postgres(self):
+        databases = build_databases(
+            "postgres://shop:secret@db:5432/shop", conn_max_age=60, pool={"min_size": 2, "max_size": 8}
+        )
+        self.assertEqual(databases["default"]["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 0)
+        self.assertEqual(databases["default"]["OPTIONS"]["pool"], {"min_size": 2, "max_size": 8})
+
+    def test_pool_is_ignored_on_sqlite(self):
+        databases = build_databases("sqlite:///db.sqlite3", conn_max_age=60, pool={"max_size": 8})
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 60)
+        self.assertNotIn("pool", databases["default"].get("OPTIONS", {}))
+
+    def test_replicas_are_numbered(self):
+        self.assertEqual(list(REPLICATED), ["default", "replica_1", "replica_2"])
+        self.assertEqual(REPLICATED["replica_1"]["NAME"], "replica.sqlite3")
+
+
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        # DATABASES can't be overridden in tests, so point the router at replicas directly
+        with mock.patch("common.routers.settings", DATABASES=REPLICATED, REPLICA_APPS=["products"]):
+            self.router = ReplicaRouter()
+
+    def test_replicated_app_reads_go_to_a_replica_when_opted_in(self):
+        with mock.patch.object(connections["default"], "in_atomic_block", False):
+            with replica_reads():
+                self.assertIn(self.router.db_for_read(Product), ["replica_1", "replica_2"])
+            self.assertEqual(self.router.db_for_read(Product), "default")
+
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        self.assertTrue(connections["default"].in_atomic_block)
+        self.assertEqual(self.router.db_for_read(Product), "default")
+
+    def test_other_apps_and_writes_use_the_primary(self):
+        with mock.patch.object(connections["default"], "in_atomic_block", False), replica_reads():
+            self.assertEqual(self.router.db_for_read(Order), "default")
+        self.assertEqual(self.router.db_for_write(Product), "default")
+
+    def test_no_replicas_means_no_routing(self):
+        with mock.patch("common.routers.settings", DATABASES=build_databases("sqlite:///db.sqlite3")):
+            self.assertIsNone(ReplicaRouter().db_for_read(Product))
+
+
+class ReadReplicaRoutingTests(TransactionTestCase):
+    """Requests against two SQLite databases: the primary and a replica that lags behind it."""
+
+    databases = {"default", "replica_1"}
+
+    def setUp(self):
+        self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        self.phones = Category.objects.create(name="Phones", slug="phones")
+        Category.objects.using("replica_1").create(pk=self.phones.pk, name="Phones (lagging)", slug="phones")
+        self.client = APIClient()
+        self.url = reverse("category-list-create")
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [category["name"] for category in response.data["results"]]
+
+    def test_catalog_reads_come_from_a_replica(self):
+        self.assertEqual(self.names(self.client.get(self.url)), ["Phones (lagging)"])
+
+    def test_views_without_opt_in_read_from_the_primary(self):
+        product = Product.objects.create(
+            category=self.phones, seller=self.seller, name="Phone", slug="phone", price=100
+        )
+        Cart.objects.create(customer=self.seller, product=product)
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(reverse("cart-list-create"))
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_a_write_pins_the_user_to_the_primary(self):
+        self.client.force_authenticate(self.seller)
+        response = self.client.post(self.url, {"name": "Books", "slug": "books"})
+        self.assertEqual(response.status_code, 201)
+        # Bearer token clients never send cookies back, so none is relied on
+        self.assertNotIn(ReadReplicaMiddleware.cookie_name, response.cookies)
+
+        self.assertEqual(sorted(self.names(self.client.get(self.url))), ["Books", "Phones"])
+
+        # Other users still read the replica; other parameters so the
+        # response just cached from the primary isn't reused
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email="other@example.com", password="pass"))
+        self.assertEqual(self.names(other.get(self.url, {"page": 1})), ["Phones (lagging)"])
+
+        caches[settings.DATABASE_PIN_CACHE_ALIAS].clear()
+        self.assertEqual(self.names(self.client.get(self.url, {"page": 1, "unused": 1})), ["Phones (lagging)"])
+
+    def test_anonymous_writes_pin_with_a_cookie(self):
+        request = RequestFactory().post("/")
+        request.user = AnonymousUser()
+        middleware = ReadReplicaMiddleware(lambda request: HttpResponse())
+        with middleware.routing(request) as routing:
+            routing.wrote = True
+        response = middleware.pin(request, routing, HttpResponse())
+        cookie = response.cookies[ReadReplicaMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], settings.DATABASE_REPLICA_LAG)
+
+        request = RequestFactory().get("/", HTTP_COOKIE=f"{ReadReplicaMiddleware.cookie_name}=1")
+        with middleware.routing(request) as routing:
+            routing.use_replica = True
+            self.assertFalse(routing.reads_from_replica)
+
+    def test_customers_see_their_new_orders(self):
+        customer = User.objects.create_user(email="cust@example.com", password="pass")
+        product = Product.objects.create(
+            category=self.phones, seller=self.seller, name="Phone", slug="phone", price=100, stock=5
+        )
+        self.client.force_authenticate(customer)
+        response = self.client.post(
+            reverse("order-list-create"), {"items": [{"product": product.pk, "quantity": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+
+        # A later request from the same user, without cookies, as an API client makes it
+        client = APIClient()
+        client.force_authenticate(customer)
+        response = client.get(reverse("order-list-create"))
+        self.assertEqual([order["id"] for order in response.data["results"]], [Order.objects.get().pk])
+
+        caches[settings.DATABASE_PIN_CACHE_ALIAS].clear()
+        self.assertEqual(client.get(reverse("order-list-create")).data["results"], [])
+
+    def test_reads_after_a_write_in_the_same_request_use_the_primary(self):
+        with request_routing() as routing:
+            routing.use_replica = True
+            self.assertEqual(Category.objects.get().name, "Phones (lagging)")
+            Category.objects.create(name="Books", slug="books")
+            self.assertEqual(Category.objects.count(), 2)
+
+    def test_replica_responses_are_cached_briefly_after_a_change(self):
+        just_bumped = catalog_cache._initial_version()
+        long_ago = just_bumped - 3600 * 1_000_000
+        with request_routing() as routing:
+            routing.use_replica = True
+            self.assertEqual(catalog_cache.store_timeout([long_ago, just_bumped]), settings.DATABASE_REPLICA_LAG)
+            self.assertEqual(catalog_cache.store_timeout([long_ago]), DEFAULT_TIMEOUT)
+            routing.pinned = True
+            self.assertEqual(catalog_cache.store_timeout([just_bumped]), DEFAULT_TIMEOUT)
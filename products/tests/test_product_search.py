@@ -0,0 +1,69 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from products.models import Category, Product
+from products.search import get_search_backend, rebuild_index
+from users.models import User
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        seller = self.seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        category = self.category = Category.objects.create(name="Electronics", slug="electronics")
+        self.make = lambda name, description="": Product.objects.create(
+            category=category, seller=seller, name=name, slug=name.lower().replace(" ", "-"),
+            description=description, price=10,
+        )
+        self.url = reverse("product-list-create")
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {"search": text, **params})
+        self.assertEqual(response.status_code, 200)
+        return [product["name"] for product in response.data["results"]]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.make("Charging Cable", "Works with any phone")
+        self.make("Phone Stand", "Aluminium desk stand")
+        self.make("Desk Lamp", "Warm light")
+        self.assertEqual(self.search("phone"), ["Phone Stand", "Charging Cable"])
+
+    def test_prefix_and_all_terms(self):
+        self.make("Wireless Charger")
+        self.make("Wireless Mouse")
+        self.assertEqual(self.search("wire char"), ["Wireless Charger"])
+
+    def test_index_follows_saves_and_deletes(self):
+        product = self.make("Old Name")
+        product.name = "Brand New Name"
+        product.save()
+        self.assertEqual(self.search("old"), [])
+        self.assertEqual(self.search("brand"), ["Brand New Name"])
+
+        product.delete()
+        self.assertEqual(get_search_backend().search("brand", limit=10), [])
+
+    def test_ordering_param_overrides_rank(self):
+        self.make("Phone Case", "cheap")
+        pricey = self.make("Phone Charger")
+        Product.objects.filter(pk=pricey.pk).update(price=99)
+        self.assertEqual(self.search("phone", ordering="-price"), ["Phone Charger", "Phone Case"])
+
+    def test_results_page_in_rank_order(self):
+        for i in range(3):
+            self.make(f"Phone {i}")
+        first = self.client.get(self.url, {"search": "phone", "page_size": 2}).data
+        second = self.client.get(first["next"]).data
+        names = [p["name"] for p in first["results"] + second["results"]]
+        self.assertEqual(sorted(names), ["Phone 0", "Phone 1", "Phone 2"])
+        self.assertIsNone(second["next"])
+
+    def test_matches_outside_the_best_ranked_still_filter_by_category(self):
+        books = Category.objects.create(name="Books", slug="books")
+        Product.objects.bulk_create(
+            Product(category=books, seller=self.seller, name=f"Phone Book {i}", slug=f"phone-book-{i}", price=1)
+            for i in range(1500)
+        )
+        rebuild_index()
+        self.make("Charging Cable", "Works with any phone")
+        response = self.client.get(self.url, {"search": "phone", "category": self.category.pk})
+        self.assertEqual([p["name"] for p in response.data["results"]], ["Charging Cable"])
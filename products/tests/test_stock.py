@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from products.models import Category, Product
+from products.stock import InsufficientStockError, reserve_stock
+from users.models import User
+
+
+class ReserveStockTests(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user(email="seller@example.com", password="pass", is_seller=True)
+        category = Category.objects.create(name="Electronics", slug="electronics")
+        self.phone = Product.objects.create(
+            category=category, seller=seller, name="Phone", slug="phone", price=100, stock=5
+        )
+        self.laptop = Product.objects.create(
+            category=category, seller=seller, name="Laptop", slug="laptop", price=900, stock=3
+        )
+
+    def stock(self):
+        return dict(Product.objects.values_list("slug", "stock"))
+
+    def test_reserve_decrements_every_line(self):
+        reserve_stock([(self.phone.pk, 2), (self.laptop.pk, 1), (self.phone.pk, 1)])
+        self.assertEqual(self.stock(), {"phone": 2, "laptop": 2})
+
+    def test_short_line_rolls_back_whole_order(self):
+        with self.assertRaises(InsufficientStockError) as ctx:
+            reserve_stock([(self.phone.pk, 5), (self.laptop.pk, 4)])
+        self.assertEqual(ctx.exception.product_ids, [self.laptop.pk])
+        self.assertEqual(self.stock(), {"phone": 5, "laptop": 3})
+
+    def test_exact_stock_can_be_reserved(self):
+        reserve_stock([(self.laptop.pk, 3)])
+        with self.assertRaises(InsufficientStockError):
+            reserve_stock([(self.laptop.pk, 1)])
+        self.assertEqual(self.stock()["laptop"], 0)
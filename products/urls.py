@@ -4,11 +4,15 @@ from .views import (
     CategoryDetailView,
     ProductListCreateView,
     ProductDetailView,
+    CatalogCacheStatsView,
+    ProductBulkImportView,
 )
 
 urlpatterns = [
-    path("categories/", CategoryListCreateView.as_view(), name="category-list-create"),
+    path("categories/", CategoryListCreateView.as_async_view(), name="category-list-create"),
     path("categories/<int:pk>/", CategoryDetailView.as_view(), name="category-detail"),
-    path("", ProductListCreateView.as_view(), name="product-list-create"),
-    path("<int:pk>/", ProductDetailView.as_view(), name="product-detail"),
+    path("", ProductListCreateView.as_async_view(), name="product-list-create"),
+    path("<int:pk>/", ProductDetailView.as_async_view(), name="product-detail"),
+    path("bulk/", ProductBulkImportView.as_view(), name="product-bulk-import"),
+    path("cache/stats/", CatalogCacheStatsView.as_view(), name="catalog-cache-stats"),
 ]
@@ -1,7 +1,17 @@
-from rest_framework import generics, filters
+from rest_framework import generics, filters, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from .models import Category, Product
 from .serializers import CategorySerializer, ProductSerializer
 from .permissions import IsSellerOrReadOnly
+from .filters import FullTextSearchFilter
+from .cache import CatalogCacheMixin, catalog_cache
+from .importer import ProductImporter
+from common.pagination import KeysetPagination
+from common.asyncviews import AsyncReadMixin
+from common.compiled import CompiledReadMixin
+from common.conditional import ConditionalGetMixin
+from common.utils import read_rows
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
@@ -30,10 +40,12 @@ from drf_yasg import openapi
         }
     )
 )
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryListCreateView(ConditionalGetMixin, CatalogCacheMixin, AsyncReadMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsSellerOrReadOnly]
+    read_from_replica = True
+    async_actions = {"get": "alist"}
 
 
 @method_decorator(
@@ -73,10 +85,11 @@ class CategoryListCreateView(generics.ListCreateAPIView):
         }
     )
 )
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsSellerOrReadOnly]
+    read_from_replica = True
 
 
 @method_decorator(
@@ -101,16 +114,29 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
         }
     )
 )
-class ProductListCreateView(generics.ListCreateAPIView):
-    queryset = Product.objects.all()
+class ProductListCreateView(
+    ConditionalGetMixin, CatalogCacheMixin, CompiledReadMixin, AsyncReadMixin, generics.ListCreateAPIView
+):
+    queryset = Product.objects.for_api()
     serializer_class = ProductSerializer
     permission_classes = [IsSellerOrReadOnly]
+    read_from_replica = True
+    async_actions = {"get": "alist"}
+    pagination_class = KeysetPagination
+    # Products embed their category's name and slug
+    related_modified_fields = ("category__updated_at",)
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ["category"] # Filter by category id
-    search_fields = ["name", "description"] # Search by name or description
     ordering_fields = ["price", "created_at"]
 
+    def get_cache_dependencies(self, request):
+        # A list narrowed to one category only changes with that category
+        category = request.query_params.getlist("category")
+        if len(category) == 1 and category[0].isdigit():
+            return ["global", f"category:{category[0]}"]
+        return ["global", "products"]
+
     def perform_create(self, serializer):
         serializer.save(seller=self.request.user)
 
@@ -151,7 +177,65 @@ class ProductListCreateView(generics.ListCreateAPIView):
         }
     )
 )
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Product.objects.all()
+class ProductDetailView(
+    ConditionalGetMixin, CatalogCacheMixin, AsyncReadMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    queryset = Product.objects.for_api()
     serializer_class = ProductSerializer
     permission_classes = [IsSellerOrReadOnly]
+    read_from_replica = True
+    async_actions = {"get": "aretrieve"}
+    related_modified_fields = ("category__updated_at",)
+
+    def get_cache_dependencies(self, request):
+        return ["global", f"product:{self.kwargs['pk']}"]
+
+
+class CatalogCacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Catalog cache hit/miss counters for this server process",
+        responses={
+            200: openapi.Response("Cache statistics"),
+            403: openapi.Response("User not permitted"),
+        },
+    )
+    def get(self, request):
+        return Response(catalog_cache.stats())
+
+
+class ProductBulkImportView(APIView):
+    """
+    Create or update many of the seller's products in one request.
+
+    The body is streamed as CSV (``text/csv``) or JSON lines
+    (``application/x-ndjson``), one product per row, and upserted by slug.
+    """
+    permission_classes = [IsSellerOrReadOnly]
+    content_types = {
+        "text/csv": "csv",
+        "application/x-ndjson": "jsonl",
+        "application/jsonl": "jsonl",
+    }
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Bulk create/update products by slug from a CSV or JSON lines body. Columns: name, slug "
+            "(optional, derived from name), description, price, stock, and category_id or category (slug)."
+        ),
+        responses={
+            200: openapi.Response("Import summary with per-row errors"),
+            403: openapi.Response("User not permitted"),
+            415: openapi.Response("Unsupported content type"),
+        },
+    )
+    def post(self, request):
+        fmt = self.content_types.get(request.content_type.split(";")[0].strip())
+        if fmt is None:
+            return Response(
+                {"error": f"Send text/csv or application/x-ndjson, not {request.content_type!r}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        result = ProductImporter(request.user).run(read_rows(request.stream, fmt))
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
@@ -0,0 +1,49 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .revocation import revoked_tokens
+from .tokens import SESSION_CLAIM, USER_CLAIMS
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds ``request.user`` from the access token's
+    claims instead of loading the user row on every request.
+
+    The user only has its id and the role flags in ``USER_CLAIMS``; every
+    other field is deferred and loaded, all at once, the first time a view
+    reads one. Tokens are checked against the in-process blacklist copy, so
+    logging out revokes both the refresh token and the access tokens minted
+    from it. Tokens issued before the role claims existed fall back to the
+    database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if revoked_tokens.is_revoked(
+            validated_token.get(api_settings.JTI_CLAIM), validated_token.get(SESSION_CLAIM)
+        ):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return self.user_from_claims(validated_token)
+
+    def user_from_claims(self, token):
+        opts = self.user_model._meta
+        pk_field = opts.get_field(api_settings.USER_ID_FIELD)
+        claims = {
+            pk_field.attname: pk_field.to_python(token[api_settings.USER_ID_CLAIM]),
+            **{claim: token[claim] for claim in USER_CLAIMS},
+        }
+        # from_db expects the loaded values in concrete field order
+        names = [field.attname for field in opts.concrete_fields if field.attname in claims]
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, names, [claims[name] for name in names])
+        user._loaded_from_token = True
+        return user
@@ -0,0 +1,99 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the cost taken from ``PASSWORD_PBKDF2_ITERATIONS``.
+    Stored hashes with a different count are rehashed on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ups in progress, please retry shortly."
+    default_code = "hashing_busy"
+
+
+class PasswordHashPool:
+    """
+    Hash passwords in a bounded pool of worker processes.
+
+    Request workers hand the CPU-bound hashing over and wait for the result,
+    so a burst of sign-ups uses at most ``PASSWORD_HASH_WORKERS`` cores and
+    the rest of the API keeps being served. At most
+    ``PASSWORD_HASH_MAX_PENDING`` hashes are queued; past that, callers wait
+    up to ``PASSWORD_HASH_TIMEOUT`` seconds for a slot and then get
+    ``HashingBusy`` rather than piling up. With no workers configured,
+    passwords are hashed inline.
+
+    The pool is started lazily in each process, so it is never shared
+    across a forking server's workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+
+    @property
+    def workers(self):
+        return settings.PASSWORD_HASH_WORKERS
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=django.setup)
+                self._slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+                self._pid = os.getpid()
+            return self._executor
+
+    def hash(self, password):
+        if not self.workers:
+            return make_password(password)
+        executor = self.executor()
+        slots = self._slots
+        if not slots.acquire(timeout=settings.PASSWORD_HASH_TIMEOUT):
+            raise HashingBusy()
+        try:
+            future = executor.submit(make_password, password)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the hash is done or cancelled, not just until
+        # this caller gives up on it, so the queue really stays bounded
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingBusy()
+
+    def hash_many(self, passwords, chunksize=64):
+        """Hash a batch of passwords across all workers, in order."""
+        if not self.workers:
+            return [make_password(password) for password in passwords]
+        return list(self.executor().map(make_password, passwords, chunksize=chunksize))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool()
@@ -0,0 +1,59 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from common.benchmarks import benchmark_database
+from orders.models import Cart
+from orders.views import CartListCreateView
+from products.models import Category, Product
+from users.authentication import ClaimsJWTAuthentication
+from users.models import User
+from users.tokens import UserRefreshToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Report requests/sec and queries per request of GET /orders/cart/ on a throwaway "
+        "database, authenticating with a user query per request versus token claims."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--cart-lines", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            user = User.objects.create_user(email="bench@example.com", password=None)
+            seller = User.objects.create_user(email="bench-seller@example.com", password=None, is_seller=True)
+            category = Category.objects.create(name="Bench", slug="bench")
+            for i in range(options["cart_lines"]):
+                product = Product.objects.create(
+                    category=category, seller=seller, name=f"Item {i}", slug=f"item-{i}", price=1
+                )
+                Cart.objects.create(customer=user, product=product)
+
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {UserRefreshToken.for_user(user).access_token}")
+            url = reverse("cart-list-create")
+            for name, authenticator in (("user query", JWTAuthentication), ("token claims", ClaimsJWTAuthentication)):
+                with mock.patch.object(CartListCreateView, "authentication_classes", [authenticator]):
+                    self.run(name, client, url, options["requests"])
+
+    def run(self, name, client, url, count):
+        for _ in range(50):
+            client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(count):
+                response = client.get(url)
+            elapsed = time.perf_counter() - start
+        assert response.status_code == 200, response.status_code
+        self.stdout.write(
+            f"{name:<13} {count / elapsed:.0f} req/s, {len(queries) / count:.1f} queries/request"
+        )
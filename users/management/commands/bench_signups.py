@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from common.benchmarks import benchmark_database, summarize
+from users.hashing import password_hash_pool
+from users.serializers import RegisterSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Register users concurrently on a throwaway database and report sign-ups/sec "
+        "per core, hashing inline versus in the process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--signups", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent requests")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing processes")
+        parser.add_argument("--hasher", choices=sorted(settings.PASSWORD_HASHER_CLASSES), default="pbkdf2")
+        parser.add_argument("--iterations", type=int, default=settings.PASSWORD_PBKDF2_ITERATIONS)
+
+    def handle(self, *args, **options):
+        hasher = settings.PASSWORD_HASHER_CLASSES[options["hasher"]]
+        with benchmark_database():
+            for name, workers in (("inline", 0), ("pool", options["workers"])):
+                with override_settings(
+                    PASSWORD_HASHERS=[hasher],
+                    PASSWORD_PBKDF2_ITERATIONS=options["iterations"],
+                    PASSWORD_HASH_WORKERS=workers,
+                ):
+                    rate, latency = self.run(name, options["signups"], options["threads"])
+                    password_hash_pool.shutdown()
+                # Inline hashing can use every core from the request threads
+                per_core = rate / (workers or os.cpu_count() or 1)
+                self.stdout.write(
+                    f"{name:<7} {rate:.1f} signups/s ({per_core:.1f}/s per hashing core), "
+                    f"p50={latency['p50_ms']:.0f}ms p99={latency['p99_ms']:.0f}ms"
+                )
+
+    def run(self, name, count, threads):
+        samples = []
+        lock = threading.Lock()
+        counter = iter(range(count))
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        index = next(counter, None)
+                    if index is None:
+                        return
+                    start = time.perf_counter()
+                    serializer = RegisterSerializer(data={
+                        "email": f"{name}-{index}@example.com", "password": "correct horse battery",
+                    })
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save(is_customer=True, is_seller=False)
+                    with lock:
+                        samples.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return count / (time.perf_counter() - start), summarize(samples)
@@ -0,0 +1,59 @@
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from common.benchmarks import benchmark_database, summarize, timed
+from users.models import User
+from users.revocation import revoked_tokens
+from users.serializers import TokenRefreshSerializer
+from users.tokens import UserRefreshToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Grow the token tables on a throwaway database and report p50/p99 token refresh "
+        "latency at each size, querying the blacklist versus the revocation filter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000", help="Outstanding token counts to test")
+        parser.add_argument("--repeat", type=int, default=300)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            user = User.objects.create_user(email="bench@example.com", password=None)
+            token = str(UserRefreshToken.for_user(user))
+            seeded = 0
+            for size in sorted(int(size) for size in options["sizes"].split(",")):
+                self.seed(user, size - seeded)
+                seeded = size
+                revoked_tokens.reset()
+                for name, serializer in (
+                    ("blacklist query", jwt_serializers.TokenRefreshSerializer),
+                    ("filter", TokenRefreshSerializer),
+                ):
+                    stats = summarize(timed(lambda: self.refresh(serializer, token), options["repeat"]))
+                    self.stdout.write(
+                        f"{size:>9} tokens  {name:<16} p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+                    )
+
+    def refresh(self, serializer_class, token):
+        serializer = serializer_class(data={"refresh": token})
+        serializer.is_valid(raise_exception=True)
+
+    def seed(self, user, count, batch=20000):
+        # Half of the seeded tokens are blacklisted, as after many logouts
+        now = timezone.now()
+        for start in range(0, count, batch):
+            outstanding = OutstandingToken.objects.bulk_create([
+                OutstandingToken(
+                    user=user, jti=uuid.uuid4().hex, token="", created_at=now,
+                    expires_at=now + timedelta(days=1),
+                )
+                for _ in range(min(batch, count - start))
+            ])
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in outstanding[::2]])
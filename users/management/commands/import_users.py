@@ -0,0 +1,77 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.core.validators import validate_email
+
+from common.utils import read_rows
+from users.models import User
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users and their profiles from a CSV or JSON lines file of email, password, "
+        "first_name, last_name and is_seller. Existing emails are skipped. Passwords are hashed "
+        "across PASSWORD_HASH_WORKERS processes; rows without one get an unusable password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON lines file, or - for stdin")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--max-errors", type=int, default=100, help="Invalid rows to print")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        self.failed = 0
+        self.max_errors = options["max_errors"]
+
+        start = time.perf_counter()
+        if path == "-":
+            created, skipped = self.run(sys.stdin.buffer, fmt, options["chunk_size"])
+        else:
+            with Path(path).open("rb") as stream:
+                created, skipped = self.run(stream, fmt, options["chunk_size"])
+        elapsed = time.perf_counter() - start
+
+        rows = created + skipped + self.failed
+        self.stdout.write(self.style.SUCCESS(
+            f"{rows} rows: {created} created, {skipped} skipped (existing email), {self.failed} failed "
+            f"in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
+
+    def run(self, stream, fmt, chunk_size):
+        return User.objects.bulk_create_users(
+            self.users(read_rows(stream, fmt)), chunk_size=chunk_size, skip_existing=True
+        )
+
+    def users(self, rows):
+        for line, row in rows:
+            if isinstance(row, str):
+                self.fail(line, row)
+                continue
+            email = str(row.get("email") or "").strip()
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.fail(line, f"Invalid email {email!r}")
+                continue
+            is_seller = str(row.get("is_seller") or "").strip().lower() in TRUE_VALUES
+            user = User(
+                email=email,
+                first_name=str(row.get("first_name") or "")[:100],
+                last_name=str(row.get("last_name") or "")[:100],
+                is_seller=is_seller,
+                is_customer=not is_seller,
+            )
+            yield user, row.get("password") or None
+
+    def fail(self, line, message):
+        self.failed += 1
+        if self.failed <= self.max_errors:
+            self.stderr.write(f"line {line}: {message}")
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding tokens, and their blacklist entries, in small batches. "
+        "Meant to run from cron; unlike flushexpiredtokens it never holds one huge delete open."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by("id")
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(expired.filter(id__gt=last_id).values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            # Blacklist rows go with their token as a single fast cascade
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            total += len(ids)
+            last_id = ids[-1]
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} expired tokens"))
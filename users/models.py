@@ -1,16 +1,86 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser, BaseUserManager, PermissionsMixin
 
+from .hashing import password_hash_pool
+
+# Marks users given to bulk_create_users without a raw password to hash
+_KEEP_PASSWORD = object()
+
+
 class UserManager(BaseUserManager):
-    def create_user(self, email, password=None, **extra_fields):
+    def create_user(self, email, password=None, password_hash=None, **extra_fields):
+        """
+        Create a user from a raw ``password``, or from a ``password_hash``
+        already made with ``make_password`` (e.g. by ``users.hashing``).
+        """
         if not email:
             raise ValueError("Users must have an email address")
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
-        user.set_password(password)
-        user.save(using=self._db)
+        if password_hash is not None:
+            user.password = password_hash
+        else:
+            user.set_password(password)
+        # The user and its profile are created together or not at all
+        with transaction.atomic(using=self._db):
+            user._profile_created = True
+            user.save(using=self._db)
+            UserProfile.objects.using(self._db).create(user=user)
         return user
 
+    def bulk_create_users(self, users, chunk_size=1000, skip_existing=False):
+        """
+        Insert unsaved users together with their profiles, ``chunk_size``
+        at a time, each chunk in its own transaction with one bulk insert
+        of users and one of profiles. ``post_save`` is not sent for them.
+
+        ``users`` may be any iterable, consumed lazily, of unsaved users
+        whose password is already set, or of ``(user, raw_password)`` pairs
+        whose passwords are then hashed in parallel by the hashing pool.
+        With ``skip_existing``, users whose email is taken (or repeated
+        within the chunk) are left out after one lookup per chunk.
+
+        Returns the number of users created and skipped.
+        """
+        created = skipped = 0
+        chunk = []
+        for item in users:
+            chunk.append(item if isinstance(item, tuple) else (item, _KEEP_PASSWORD))
+            if len(chunk) >= chunk_size:
+                created, skipped = self._create_chunk(chunk, skip_existing, created, skipped)
+                chunk = []
+        if chunk:
+            created, skipped = self._create_chunk(chunk, skip_existing, created, skipped)
+        return created, skipped
+
+    def _create_chunk(self, chunk, skip_existing, created, skipped):
+        for user, _ in chunk:
+            user.email = self.normalize_email(user.email)
+        if skip_existing:
+            taken = set(
+                self.using(self._db).filter(email__in=[user.email for user, _ in chunk])
+                .values_list("email", flat=True)
+            )
+            fresh = []
+            for user, password in chunk:
+                if user.email not in taken:
+                    taken.add(user.email)
+                    fresh.append((user, password))
+            skipped += len(chunk) - len(fresh)
+            chunk = fresh
+        if not chunk:
+            return created, skipped
+
+        to_hash = [(user, password) for user, password in chunk if password is not _KEEP_PASSWORD]
+        for (user, _), encoded in zip(to_hash, password_hash_pool.hash_many([password for _, password in to_hash])):
+            user.password = encoded
+
+        users = [user for user, _ in chunk]
+        with transaction.atomic(using=self._db):
+            self.bulk_create(users)
+            UserProfile.objects.using(self._db).bulk_create([UserProfile(user=user) for user in users])
+        return created + len(users), skipped
+
     def create_superuser(self, email, password=None, **extra_fields):
         extra_fields.setdefault("is_staff", True)
         extra_fields.setdefault("is_superuser", True)
@@ -38,6 +108,14 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # A user built from token claims (see users.authentication) defers
+        # everything but its role flags; the first deferred field read loads
+        # all of them in one query rather than one query per field.
+        if fields is not None and getattr(self, "_loaded_from_token", False):
+            fields = {*fields, *self.get_deferred_fields()}
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
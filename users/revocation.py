@@ -0,0 +1,115 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class BloomFilter:
+    """
+    Set membership for strings in a fixed number of bits. Never gives a
+    false negative; gives false positives at about ``error_rate`` once
+    ``capacity`` items have been added.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def full(self):
+        return self.count > self.capacity
+
+
+class RevokedTokens:
+    """
+    In-process Bloom filter of the blacklisted token JTIs.
+
+    Authentication and token refresh check every token against it instead
+    of querying the blacklist. Only the rare hits, real or false positive,
+    are confirmed with a query. The filter takes a couple of bytes per
+    blacklisted token, so tens of millions of rows fit in a few tens of MiB.
+
+    The filter is synced at most every ``interval`` seconds, or on demand.
+    Each sync only reads blacklist rows above the highest id seen so far, so
+    its cost does not grow with the table. When the filter fills up it is
+    rebuilt at twice the size of the blacklist, which also drops tokens
+    purged since the last rebuild. Tokens blacklisted by this process are
+    added immediately; other processes see them after their next sync.
+    """
+
+    def __init__(self, interval=None, capacity=None, error_rate=0.001):
+        self.interval = interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bloom = None
+            self.high_water = 0
+            self.synced_at = None
+
+    def add(self, jti):
+        with self._lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+    def is_revoked(self, *jtis, fresh=False):
+        """
+        Whether any of ``jtis`` is blacklisted. ``fresh`` syncs first, so
+        tokens blacklisted by other processes are seen immediately.
+        """
+        self.sync(force=fresh)
+        bloom = self.bloom
+        candidates = [jti for jti in jtis if jti and jti in bloom]
+        if not candidates:
+            return False
+        return BlacklistedToken.objects.filter(token__jti__in=candidates).exists()
+
+    def sync(self, force=False):
+        interval = self.interval if self.interval is not None else settings.JWT_REVOCATION_SYNC_INTERVAL
+        now = time.monotonic()
+        if not force and self.synced_at is not None and now - self.synced_at < interval:
+            return
+        with self._lock:
+            bloom, high_water = self.bloom, self.high_water
+            if bloom is None or bloom.full:
+                # Built on the side: threads that skip the sync keep checking
+                # the old filter until the new one holds every token
+                initial = self.capacity or settings.JWT_REVOCATION_CAPACITY
+                bloom = BloomFilter(max(initial, 2 * BlacklistedToken.objects.count()), self.error_rate)
+                high_water = 0
+            rows = (
+                BlacklistedToken.objects.filter(id__gt=high_water)
+                .order_by("id").values_list("id", "token__jti")
+            )
+            for pk, jti in rows.iterator(chunk_size=10000):
+                bloom.add(jti)
+                high_water = pk
+            self.bloom, self.high_water = bloom, high_water
+            self.synced_at = now
+
+
+revoked_tokens = RevokedTokens()
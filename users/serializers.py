@@ -1,6 +1,12 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
+from orders.guest_cart import guest_carts
+from .hashing import password_hash_pool
 from .models import UserProfile
+from .tokens import USER_CLAIMS, UserRefreshToken
 
 User = get_user_model()
 
@@ -22,9 +28,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'password', 'first_name', 'last_name']
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            email=validated_data["email"], password=validated_data["password"]
-        )
+        # Hashing is CPU bound, so it runs in the bounded hashing pool
+        password_hash = password_hash_pool.hash(validated_data.pop("password"))
+        user = User.objects.create_user(password_hash=password_hash, **validated_data)
         return user
 
 
@@ -32,3 +38,53 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = ["address", "phone_number"]
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Login that mints tokens carrying the user's role claims, and moves the
+    guest cart given by ``cart_token`` into the user's cart.
+    """
+    token_class = UserRefreshToken
+    cart_token = serializers.CharField(
+        required=False, write_only=True, help_text="Token of a guest cart to add to the user's cart"
+    )
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if attrs.get("cart_token"):
+            data["cart_items_merged"] = guest_carts.merge(attrs["cart_token"], self.user)
+        return data
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh that re-reads the user's role flags into the new tokens rather
+    than copying them from the refresh token, with the same single user
+    query simplejwt makes for its active check.
+    """
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        for claim in USER_CLAIMS:
+            refresh[claim] = getattr(user, claim)
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class TokenBlacklistSerializer(jwt_serializers.TokenBlacklistSerializer):
+    token_class = UserRefreshToken
@@ -1,16 +1,25 @@
 from django.db.models.signals import post_save, post_migrate
 from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 from .models import User, UserProfile
+from .revocation import revoked_tokens
 from django.contrib.auth import get_user_model
 from django.conf import settings
 import os
 
 @receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
-    if created:
+def create_user_profile(sender, instance, created, **kwargs):
+    # UserManager.create_user makes the profile itself; this covers users
+    # created any other way. Later saves never touch the profile.
+    if created and not getattr(instance, "_profile_created", False):
         UserProfile.objects.create(user=instance)
-    else:
-        instance.profile.save()
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def revoke_blacklisted_token(sender, instance, created, **kwargs):
+    # Other processes pick it up on their next sync
+    if created:
+        revoked_tokens.add(instance.token.jti)
 
 
 @receiver(post_migrate)
@@ -0,0 +1,169 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users.authentication import ClaimsJWTAuthentication
+from users.models import User
+from users.revocation import BloomFilter, RevokedTokens, revoked_tokens
+from users.tokens import UserRefreshToken
+
+
+class ClaimsJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="seller@example.com", password="pass", is_seller=True, first_name="Ada"
+        )
+        self.cart_url = reverse("cart-list-create")
+
+    def login(self):
+        response = self.client.post(
+            reverse("token_obtain_pair"), {"email": "seller@example.com", "password": "pass"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_login_tokens_carry_role_claims(self):
+        tokens = self.login()
+        access = AccessToken(tokens["access"])
+        self.assertEqual(
+            (access["is_seller"], access["is_customer"], access["is_active"], access["is_staff"]),
+            (True, True, True, False),
+        )
+        self.assertEqual(access["sid"], RefreshToken(tokens["refresh"])["jti"])
+
+    def test_refresh_rereads_role_claims(self):
+        refresh = self.login()["refresh"]
+        User.objects.filter(pk=self.user.pk).update(is_seller=False, is_staff=True)
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data["access"])
+        self.assertEqual((access["is_seller"], access["is_staff"]), (False, True))
+        self.assertEqual(access["sid"], RefreshToken(refresh)["jti"])
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_requests_do_not_query_the_user(self):
+        access = self.login()["access"]
+        revoked_tokens.sync(force=True)
+        with self.assertNumQueries(0):
+            user = self.authenticate(access)
+        self.assertEqual((user.pk, user.is_seller), (self.user.pk, True))
+
+        # The rest of the row is loaded on demand, in one query
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.first_name), ("seller@example.com", "Ada"))
+
+    def test_logout_revokes_access_tokens(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.assertEqual(self.client.get(self.cart_url).status_code, 200)
+
+        self.client.post(reverse("logout"), {"refresh": tokens["refresh"]}, format="json")
+        self.assertEqual(self.client.get(self.cart_url).status_code, 401)
+
+    def test_blacklist_from_other_processes_is_synced(self):
+        tokens = self.login()
+        revoked_tokens.sync(force=True)
+        # Written without signals, as another process would appear to this one
+        outstanding = OutstandingToken.objects.get(jti=RefreshToken(tokens["refresh"])["jti"])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        self.assertEqual(self.authenticate(tokens["access"]).pk, self.user.pk)
+
+        revoked_tokens.sync(force=True)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(tokens["access"])
+
+    def test_inactive_claim_is_rejected(self):
+        refresh = UserRefreshToken.for_user(self.user)
+        refresh["is_active"] = False
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        self.assertEqual(self.client.get(self.cart_url).status_code, 401)
+
+    def test_tokens_without_claims_load_the_user(self):
+        access = RefreshToken.for_user(self.user).access_token
+        revoked_tokens.sync(force=True)
+        with self.assertNumQueries(1):
+            user = self.authenticate(access)
+        self.assertEqual(user.email, "seller@example.com")
+
+
+class TokenBlacklistTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="cust@example.com", password="pass")
+
+    def refresh(self, token):
+        return self.client.post(reverse("token_refresh"), {"refresh": str(token)}, format="json")
+
+    def test_refresh_checks_the_filter_not_the_blacklist(self):
+        token = UserRefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+        # One incremental sync and the user's active check
+        with self.assertNumQueries(2):
+            self.assertEqual(self.refresh(token).status_code, 200)
+
+    def test_refresh_sees_tokens_blacklisted_elsewhere_immediately(self):
+        token = UserRefreshToken.for_user(self.user)
+        self.refresh(token)
+        outstanding = OutstandingToken.objects.get(jti=token["jti"])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_logout_then_refresh(self):
+        token = UserRefreshToken.for_user(self.user)
+        self.assertEqual(self.client.post(reverse("logout"), {"refresh": str(token)}, format="json").status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_filter_grows_past_its_capacity(self):
+        filter = RevokedTokens(interval=0, capacity=4)
+        tokens = [UserRefreshToken.for_user(self.user) for _ in range(10)]
+        for token in tokens:
+            token.blacklist()
+        self.assertTrue(all(filter.is_revoked(token["jti"]) for token in tokens))
+        self.assertGreaterEqual(filter.bloom.capacity, 10)
+        self.assertFalse(filter.is_revoked(UserRefreshToken.for_user(self.user)["jti"]))
+
+    def test_rebuilds_do_not_expose_an_empty_filter(self):
+        filter = RevokedTokens(interval=60, capacity=2)
+        revoked = UserRefreshToken.for_user(self.user)
+        revoked.blacklist()
+        filter.sync(force=True)
+        for _ in range(3):
+            UserRefreshToken.for_user(self.user).blacklist()
+        filter.sync(force=True)
+        self.assertTrue(filter.bloom.full)
+
+        # Another thread checking while the full filter is rebuilt
+        seen = []
+        original_add = BloomFilter.add
+
+        def add(bloom, jti):
+            seen.append(filter.is_revoked(revoked["jti"]))
+            original_add(bloom, jti)
+
+        with mock.patch.object(BloomFilter, "add", add):
+            filter.sync(force=True)
+        self.assertEqual(seen, [True] * 4)
+        self.assertTrue(filter.is_revoked(revoked["jti"]))
+
+    def test_purge_deletes_expired_tokens_in_batches(self):
+        expired = UserRefreshToken.for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired["jti"]).update(expires_at=timezone.now() - timedelta(days=1))
+        live = UserRefreshToken.for_user(self.user)
+        call_command("purge_tokens", batch_size=1, stdout=io.StringIO())
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [live["jti"]])
+        self.assertFalse(BlacklistedToken.objects.exists())
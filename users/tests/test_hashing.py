@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import Future
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.hashing import HashingBusy, PasswordHashPool
+from users.models import User
+
+PBKDF2 = ["users.hashing.PBKDF2PasswordHasher"]
+
+
+class PasswordHasherTests(TestCase):
+    @override_settings(PASSWORD_HASHERS=PBKDF2, PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_pbkdf2_cost_comes_from_settings(self):
+        encoded = make_password("secret")
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$1000$"))
+        self.assertFalse(get_hasher().must_update(encoded))
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertTrue(get_hasher().must_update(encoded))
+
+    @override_settings(PASSWORD_HASHERS=PBKDF2, PASSWORD_PBKDF2_ITERATIONS=1000, PASSWORD_HASH_WORKERS=2)
+    def test_pool_hashes_in_worker_processes(self):
+        pool = PasswordHashPool()
+        self.addCleanup(pool.shutdown)
+        self.assertTrue(check_password("one", pool.hash("one")))
+        hashes = pool.hash_many(["a", "b", "c"])
+        self.assertEqual([check_password(raw, encoded) for raw, encoded in zip("abc", hashes)], [True] * 3)
+        self.assertFalse(check_password("b", hashes[0]))
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_TIMEOUT=0)
+    def test_full_pool_refuses_instead_of_queueing(self):
+        pool = PasswordHashPool()
+        self.addCleanup(pool.shutdown)
+        pool.executor()
+        pool._slots.acquire()
+        with self.assertRaises(HashingBusy):
+            pool.hash("secret")
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=2, PASSWORD_HASH_TIMEOUT=0)
+    def test_timed_out_hashes_keep_their_slot_until_done(self):
+        pool = PasswordHashPool()
+        executor = mock.Mock()
+        queued, running = Future(), Future()
+        running.set_running_or_notify_cancel()
+        executor.submit.side_effect = [queued, running]
+        with mock.patch.object(pool, "executor", return_value=executor):
+            pool._slots = threading.BoundedSemaphore(2)
+            for _ in range(2):
+                with self.assertRaises(HashingBusy):
+                    pool.hash("secret")
+        # The queued hash was cancelled and gave its slot back; the running one keeps it
+        self.assertTrue(queued.cancelled())
+        self.assertTrue(pool._slots.acquire(blocking=False))
+        self.assertFalse(pool._slots.acquire(blocking=False))
+        running.set_result("hash")
+        self.assertTrue(pool._slots.acquire(blocking=False))
+
+
+class RegistrationTests(APITestCase):
+    def test_seller_registration_hashes_and_keeps_the_role(self):
+        response = self.client.post(
+            reverse("register-seller"), {"email": "shop@example.com", "password": "strongpass123"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email="shop@example.com")
+        self.assertTrue(user.is_seller)
+        self.assertFalse(user.is_customer)
+        self.assertTrue(user.check_password("strongpass123"))
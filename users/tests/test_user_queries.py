@@ -0,0 +1,78 @@
+import io
+import os
+import tempfile
+
+from django.contrib.auth.models import update_last_login
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from users.models import User, UserProfile
+from users.revocation import revoked_tokens
+
+
+class UserQueryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="cust@example.com", password="pass")
+
+    def test_create_user_makes_the_profile(self):
+        # Savepoint, user insert, profile insert, release
+        with self.assertNumQueries(4):
+            user = User.objects.create_user(email="new@example.com", password="pass")
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+    def test_bulk_create_users_makes_profiles(self):
+        users = [User(email=f"user{i}@example.com") for i in range(20)]
+        with self.assertNumQueries(4):
+            User.objects.bulk_create_users(users)
+        self.assertEqual(UserProfile.objects.filter(user__in=users).count(), 20)
+
+    def test_user_save_does_not_touch_the_profile(self):
+        with self.assertNumQueries(1):
+            update_last_login(None, self.user)
+
+    def test_login_query_count(self):
+        # User lookup and the outstanding refresh token insert
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse("token_obtain_pair"), {"email": "cust@example.com", "password": "pass"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        revoked_tokens.sync(force=True)
+        # Profile lookup and update; the user comes from the token
+        with self.assertNumQueries(2):
+            response = self.client.patch(reverse("profile"), {"address": "1 Main St"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UserProfile.objects.get(user=self.user).address, "1 Main St")
+
+
+class BulkUserImportTests(TestCase):
+    def test_bulk_create_users_hashes_and_skips_existing_emails(self):
+        User.objects.create_user(email="taken@example.com", password="pass")
+        users = [
+            (User(email="new@EXAMPLE.com"), "secret"),
+            (User(email="taken@example.com"), "other"),
+            (User(email="new@example.com"), "again"),
+            (User(email="nopass@example.com"), None),
+        ]
+        created, skipped = User.objects.bulk_create_users(users, chunk_size=2, skip_existing=True)
+        self.assertEqual((created, skipped), (2, 2))
+        self.assertTrue(User.objects.get(email="new@example.com").check_password("secret"))
+        self.assertFalse(User.objects.get(email="nopass@example.com").has_usable_password())
+        self.assertEqual(UserProfile.objects.count(), 3)
+
+    def test_import_users_command(self):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        self.addCleanup(os.unlink, handle.name)
+        with handle:
+            handle.write("email,password,first_name,is_seller\na@example.com,pw,Ann,\nnot-an-email,pw,,\n"
+                         "b@example.com,pw,Bo,true\na@example.com,pw,Ann,\n")
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_users", handle.name, stdout=out, stderr=err)
+        self.assertIn("2 created, 1 skipped (existing email), 1 failed", out.getvalue())
+        self.assertIn("line 3", err.getvalue())
+        self.assertTrue(User.objects.get(email="b@example.com").is_seller)
+        self.assertTrue(User.objects.get(email="a@example.com").check_password("pw"))
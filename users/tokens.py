@@ -0,0 +1,38 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .revocation import revoked_tokens
+
+# User flags copied into every token so requests can be authorized without a user query
+USER_CLAIMS = ("is_active", "is_customer", "is_seller", "is_staff")
+
+# Access tokens carry the jti of the refresh token they were minted from, so
+# blacklisting the refresh token on logout revokes them too.
+SESSION_CLAIM = "sid"
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's role flags, which its access tokens
+    inherit. Its blacklist check goes through the in-process revocation
+    filter instead of querying the blacklist tables.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        access[SESSION_CLAIM] = self[api_settings.JTI_CLAIM]
+        return access
+
+    def check_blacklist(self):
+        if revoked_tokens.is_revoked(self.payload[api_settings.JTI_CLAIM], fresh=True):
+            raise TokenError(_("Token is blacklisted"))
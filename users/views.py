@@ -1,6 +1,6 @@
 from rest_framework import generics, status, permissions
-from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import RegisterSerializer, UserProfileSerializer
+from .tokens import UserRefreshToken
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
@@ -26,7 +26,7 @@ class BaseRegisterView(generics.CreateAPIView):
         else:
             user = serializer.save(is_customer=True, is_seller=False)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response({
             "user": serializer.data,
             "refresh": str(refresh),